@@ -7,8 +7,8 @@ Main Flask application setup for the Pharmacy API.
 # from apscheduler.schedulers.background import BackgroundScheduler
 from dotenv import load_dotenv
 from flask import Flask, abort, request, g
-from flask_bcrypt import Bcrypt
 from flask_cors import CORS
+from sqlalchemy.exc import SQLAlchemyError
 from typing import Any
 import logging
 import os
@@ -16,9 +16,18 @@ import sys
 import traceback
 
 from api.v1.auth.session_db_auth import SessionDBAuth
+from api.v1.cli import jobs_cli, maintenance_cli
+from api.v1.utils.compression import compress_response
+from api.v1.utils.instrumentation import (
+    listen_for_statements, record_request_stats, start_request_stats
+)
+from api.v1.utils.json_provider import FastJSONProvider
+from api.v1.utils.metrics import metrics_endpoint, record_request_metrics
+from api.v1.utils.product_index import product_index
 from api.v1.utils.error_handlers import (
     bad_request, unauthorized, forbidden, not_found, method_not_allowed,
-    conflict_error, server_error
+    conflict_error, payload_too_large, too_many_requests, server_error,
+    service_unavailable
 )
 from api.v1.views import app_views
 from models import storage
@@ -26,7 +35,6 @@ from models import storage
 
 load_dotenv()
 logger = logging.getLogger(__name__)
-bcrypt = Bcrypt()
 auth = SessionDBAuth()
 
 
@@ -40,7 +48,8 @@ def check_authentication():
     if not auth.require_auth(
         request.path,
         [
-            "/api/v1/register/", "/api/v1/auth_session/login/"
+            "/api/v1/register/", "/api/v1/auth_session/login/",
+            "/metrics/",
         ]
     ):
         return
@@ -58,18 +67,38 @@ def close_db(exception: BaseException | None) -> None:
     """
     storage.close()
 
+def warm_product_index() -> None:
+    """
+    Builds the product index up front so the first barcode scan or
+    autocomplete keystroke does not pay for it.
+    """
+    try:
+        product_index.refresh(force=True)
+    except SQLAlchemyError:
+        logger.warning(
+            "Product index warm-up failed; it will be built on first use",
+            exc_info=True,
+        )
+    finally:
+        storage.close()
+
 def create_app(config_name: str | None=None) -> Flask:
     """
     Creates and configures the Flask application instance.
     """
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     if config_name == "test":
         app.config.from_mapping(TESTING=True)
     else:
         app.config.from_mapping(TESTING=False)
+    # oversize uploads are refused from Content-Length, before the
+    # body is read into memory
+    app.config["MAX_CONTENT_LENGTH"] = int(
+        os.getenv("MAX_CONTENT_LENGTH", 10 * 1024 * 1024)
+    )
 
-    bcrypt.init_app(app) # type: ignore
     CORS(
         app,
         origins=["http://localhost:5173", "https://pharmacy-inventory-app.vercel.app"],
@@ -78,7 +107,17 @@ def create_app(config_name: str | None=None) -> Flask:
         supports_credentials=True
     )
     app.register_blueprint(app_views)
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint)
+    app.cli.add_command(maintenance_cli)
+    app.cli.add_command(jobs_cli)
+    # hooks run in order before the request and in reverse after it,
+    # so the timings cover authentication and compression
+    listen_for_statements()
+    app.before_request(start_request_stats)
     app.before_request(check_authentication)
+    app.after_request(record_request_metrics)
+    app.after_request(record_request_stats)
+    app.after_request(compress_response)
     app.teardown_appcontext(close_db)
     app.register_error_handler(400, bad_request)
     app.register_error_handler(401, unauthorized)
@@ -86,7 +125,11 @@ def create_app(config_name: str | None=None) -> Flask:
     app.register_error_handler(404, not_found)
     app.register_error_handler(405, method_not_allowed)
     app.register_error_handler(409, conflict_error)
+    app.register_error_handler(413, payload_too_large)
+    app.register_error_handler(429, too_many_requests)
     app.register_error_handler(500, server_error)
+    app.register_error_handler(503, service_unavailable)
+    warm_product_index()
 
     # from api.v1.utils.utility import run_monthly_reordering_point_update
 
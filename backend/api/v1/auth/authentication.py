@@ -11,22 +11,32 @@ This module defines:
 """
 
 
+from datetime import datetime
 from dotenv import load_dotenv
 from flask import request, abort
 from typing import cast
 import logging
+import math
 import os
 
+from api.v1.auth.passwords import check_password, hash_password, needs_rehash
 from api.v1.utils.request_data_validation import (
     EmployeeLogin,
     validate_request_data,
 )
+from models import storage
 from models.employee import Employee
 
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# wrong passwords allowed before backing off, then the first delay in
+# seconds, doubled per further failure up to the maximum
+LOGIN_FREE_ATTEMPTS = int(os.getenv("LOGIN_FREE_ATTEMPTS", 3))
+LOGIN_BACKOFF_BASE = float(os.getenv("LOGIN_BACKOFF_BASE", 1))
+LOGIN_BACKOFF_MAX = float(os.getenv("LOGIN_BACKOFF_MAX", 300))
+
 
 class BaseAuth:
     """
@@ -99,9 +109,14 @@ class LoginAuth:
     def authenticate_employee(
         self, email_or_username: str | None, password: str
     ) -> Employee:
-        """Authenticate a user by email or username and password."""
-        from api.v1.app import bcrypt
+        """
+        Authenticate a user by email or username and password.
 
+        Accounts with repeated wrong passwords are refused with 429
+        until their backoff ends, without spending a hash on them.
+        A correct password clears the backoff and, if the bcrypt cost
+        has changed since it was hashed, is rehashed at the new cost.
+        """
         if not email_or_username:
             abort(400, description="Either email or username is required")
 
@@ -109,11 +124,33 @@ class LoginAuth:
         if not employee:
             abort(404, description="Invalid email or username.")
 
-        if not bcrypt.check_password_hash(  # type: ignore
-            employee.password, password
-        ):
+        now = datetime.now()
+        if employee.login_blocked_until and employee.login_blocked_until > now:
+            abort(
+                429,
+                description="Too many failed logins, try again later.",
+                retry_after=math.ceil(
+                    (employee.login_blocked_until - now).total_seconds()
+                ),
+            )
+
+        if not check_password(employee.password, password):
+            storage.record_failed_login(
+                employee.id,
+                LOGIN_FREE_ATTEMPTS,
+                LOGIN_BACKOFF_BASE,
+                LOGIN_BACKOFF_MAX,
+            )
             abort(401, description="wrong password")
 
+        rehash = needs_rehash(employee.password)
+        if rehash or employee.failed_logins:
+            if rehash:
+                employee.password = hash_password(password)
+            employee.failed_logins = 0
+            employee.login_blocked_until = None
+            storage.save()
+
         return employee
 
     def create_employee_session(
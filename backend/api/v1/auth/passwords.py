@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+Password hashing and verification off the request thread.
+
+bcrypt is deliberately slow: at the default cost a single check takes
+about a quarter of a second of CPU. Hashes run in a small per-worker
+process pool, and at most PASSWORD_HASH_QUEUE of them may be queued
+or running at once. Further logins wait up to PASSWORD_HASH_WAIT
+seconds for a slot, then get 503 with Retry-After instead of piling
+onto the CPUs every other request needs.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import abort
+from typing import Any, Callable, TypeVar
+import bcrypt
+import multiprocessing
+import os
+import threading
+
+
+T = TypeVar("T")
+
+# a change takes effect for existing accounts on their next login
+BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+# 0 hashes on the request thread, e.g. for scripts
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 1))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 4))
+PASSWORD_HASH_WAIT = float(os.getenv("PASSWORD_HASH_WAIT", 2))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_QUEUE)
+
+
+def _hash(password: str, rounds: int) -> str:
+    """Hash password with a new salt. Runs in the pool."""
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds)
+    ).decode("utf-8")
+
+
+def _check(hashed: str, password: str) -> bool:
+    """Compare password with a stored hash. Runs in the pool."""
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Returns this worker's hashing pool, started on first use so that
+    it is never shared across a fork.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def discard_pool() -> None:
+    """
+    Drop this worker's hashing pool so the next hash starts a new one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def run_bounded(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run func in the hashing pool, or answer 503 when the pool already
+    has PASSWORD_HASH_QUEUE hashes queued or running.
+    """
+    if PASSWORD_HASH_WORKERS <= 0:
+        return func(*args)
+
+    if not _slots.acquire(timeout=PASSWORD_HASH_WAIT):
+        abort(
+            503,
+            description="Too many logins in progress, try again shortly.",
+            retry_after=1,
+        )
+    try:
+        return get_pool().submit(func, *args).result()
+    except BrokenProcessPool:
+        discard_pool()  # a hash process died: start afresh next time
+        raise
+    finally:
+        _slots.release()
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password at the configured cost.
+    """
+    return run_bounded(_hash, password, BCRYPT_LOG_ROUNDS)
+
+
+def check_password(hashed: str, password: str) -> bool:
+    """
+    Return True if password matches the stored hash.
+    """
+    return run_bounded(_check, hashed, password)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """
+    Return True if hashed was made at a cost other than
+    BCRYPT_LOG_ROUNDS, e.g. "$2b$10$..." after raising it to 12.
+    """
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_LOG_ROUNDS
+    except (IndexError, ValueError):
+        return True
@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
 
 """
-Handles database-backed session authentication for employees.
+Handles session authentication for employees.
+
+AUTH_MODE selects how sessions are kept:
+- "db" (default): the cookie holds the id of an EmployeeSession row.
+- "token": the cookie holds a signed token verified without a
+  database read; see api/v1/auth/session_tokens.py.
 """
 
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from flask import abort
+from flask import abort, request
+import hashlib
 import logging
 import os
 
 from api.v1.utils.utility import get_obj
 from api.v1.auth.authentication import BaseAuth
+from api.v1.auth.session_tokens import SessionTokens
+from models import storage
 from models.employee import Employee
 from models.employee_session import EmployeeSession
 
@@ -19,6 +27,17 @@ from models.employee_session import EmployeeSession
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# logging in on one device too many ends the oldest session
+MAX_SESSIONS_PER_EMPLOYEE = int(os.getenv("MAX_SESSIONS_PER_EMPLOYEE", 10))
+
+
+def get_device_id(session_id: str) -> str:
+    """
+    A stable public name for a session. The session id itself is the
+    cookie's secret and is never shown.
+    """
+    return hashlib.sha256(session_id.encode()).hexdigest()[:16]
+
 
 class SessionDBAuth(BaseAuth):
     """
@@ -27,9 +46,20 @@ class SessionDBAuth(BaseAuth):
 
     def __init__(self) -> None:
         """
-        Initialize session duration from environment.
+        Initialize session duration and auth mode from environment.
         """
         self.session_duration = int(os.getenv("SESSION_DURATION", 0))
+        self.auth_mode = os.getenv("AUTH_MODE", "db")
+        self.tokens: SessionTokens | None = None
+        if self.auth_mode == "token":
+            secret = os.getenv("SESSION_TOKEN_SECRET")
+            if not secret:
+                raise ValueError(
+                    "SESSION_TOKEN_SECRET must be set when AUTH_MODE is token"
+                )
+            self.tokens = SessionTokens(secret, self.session_duration)
+        elif self.auth_mode != "db":
+            raise ValueError(f"Unknown AUTH_MODE {self.auth_mode!r}")
 
     def create_session(self, employee_id: str | None = None) -> str | None:
         """
@@ -38,9 +68,22 @@ class SessionDBAuth(BaseAuth):
         if not employee_id or not isinstance(employee_id, str):  # type: ignore
             return
 
-        employee_session = EmployeeSession(employee_id=employee_id)
+        if self.tokens:
+            employee = get_obj(Employee, employee_id)
+            return self.tokens.issue(employee) if employee else None
+
+        now = datetime.now()
+        employee_session = EmployeeSession(
+            employee_id=employee_id,
+            expires_at=now + timedelta(seconds=self.session_duration),
+            user_agent=request.user_agent.string[:300] or None,
+            ip_address=request.remote_addr,
+        )
         try:
-            employee_session.save()
+            storage.save()
+            storage.cap_employee_sessions(
+                employee_id, MAX_SESSIONS_PER_EMPLOYEE
+            )
         except Exception as e:
             logger.error(f"Database operation failed: {e}")
             abort(500)
@@ -55,6 +98,16 @@ class SessionDBAuth(BaseAuth):
         if not session_id:
             return
 
+        if self.tokens:
+            claims = self.tokens.verify(session_id)
+            if not claims:
+                return
+            # trusted from the token: nothing is read unless a view
+            # needs more than the id and admin flag
+            return storage.attach(
+                Employee, id=claims["id"], is_admin=claims["adm"]
+            )
+
         employee_id = self.employee_id_for_session_id(session_id)
         if not employee_id:
             return
@@ -71,6 +124,14 @@ class SessionDBAuth(BaseAuth):
         if not session_id:
             return
 
+        if self.tokens:
+            claims = self.tokens.verify(session_id)
+            if not claims:
+                return
+            # tokens cannot be deleted: log out every device instead
+            self.tokens.revoke(claims["id"])
+            return True
+
         employee_session = get_obj(EmployeeSession, session_id)
         if not employee_session:
             return
@@ -93,34 +154,68 @@ class SessionDBAuth(BaseAuth):
         if not session_id or not isinstance(session_id, str):  # type: ignore
             return
 
-        session = get_obj(EmployeeSession, session_id)
-        if not session:
-            return
-
-        if (
-            session.created_at + timedelta(seconds=self.session_duration)
-            < datetime.now()
-        ):
-            try:
-                session.delete()
-                session.save()
-            except Exception as e:
-                logger.error(f"Failed to delete expired session: {e}")
-            return
-        return session.employee_id
+        # expired rows are left to the purge
+        return storage.session_employee_id(session_id)
 
     def get_session(self, employee: Employee) -> str | None:
         """
-        Return a valid active session ID for the given employee.
+        Return the session this device already holds for the given
+        employee, if it is still valid, so logging in again does not
+        start another one. Tokens are not stored, so token mode always
+        issues a new one.
         """
-        if not employee.employee_session:
+        session_id = self.session_cookie()
+        if self.tokens or not session_id:
             return
 
-        employee_session_obj = employee.employee_session[0]
-        if (
-            employee_session_obj.created_at
-            + timedelta(seconds=self.session_duration)
-            > datetime.now()
-        ):
-            return employee_session_obj.id
+        if self.employee_id_for_session_id(session_id) == employee.id:
+            return session_id
         return
+
+    def get_devices(self, employee: Employee) -> list[dict[str, object]]:
+        """
+        Return the employee's active sessions, newest first, marking
+        the one making this request.
+        """
+        current_session_id = self.session_cookie()
+        return [
+            {
+                "device_id": get_device_id(employee_session.id),
+                "created_at": employee_session.created_at,
+                "expires_at": employee_session.expires_at,
+                "user_agent": employee_session.user_agent,
+                "ip_address": employee_session.ip_address,
+                "current": employee_session.id == current_session_id,
+            }
+            for employee_session in storage.employee_sessions(employee.id)
+        ]
+
+    def destroy_devices(
+            self, employee: Employee, device_id: str | None = None
+        ) -> int:
+        """
+        End the session named by device_id, or every session of the
+        employee other than the current one. Returns how many ended.
+        """
+        current_session_id = self.session_cookie()
+        ended = 0
+        for employee_session in storage.employee_sessions(employee.id):
+            if (
+                get_device_id(employee_session.id) == device_id
+                if device_id
+                else employee_session.id != current_session_id
+            ):
+                storage.delete(employee_session)
+                ended += 1
+        storage.save()
+        return ended
+
+    def revoke_sessions(self, employee_id: str) -> None:
+        """
+        End an employee's signed sessions, e.g. after their admin
+        flag changes or they are deleted. Stored sessions need nothing:
+        each request reloads the employee, and deleting one deletes
+        their sessions.
+        """
+        if self.tokens:
+            self.tokens.revoke(employee_id)
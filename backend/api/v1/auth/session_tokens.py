@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""
+Signed, expiring session tokens for the "token" auth mode.
+
+A token carries the employee id, admin flag and the employee's
+revocation generation, signed with HMAC-SHA256 (itsdangerous), so a
+request is authenticated without reading `employee_sessions`.
+Logout, deletion and changes to an employee bump their generation in
+`session_revocations`; each worker caches that table and rechecks it
+at most every REVOCATION_CHECK_INTERVAL seconds.
+"""
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from typing import Any
+import logging
+import os
+import threading
+import time
+
+from api.v1.utils.metrics import record_cache_lookup
+from models import storage
+from models.employee import Employee
+from models.session_revocation import SessionRevocation
+
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHECK_INTERVAL = float(os.getenv("REVOCATION_CHECK_INTERVAL", 1))
+
+
+class RevocationCache:
+    """
+    Per-worker copy of the revocation generations. A cheap
+    max(last_updated)/count probe decides whether to reload it.
+    """
+
+    def __init__(self, check_interval: float) -> None:
+        """Initialize an empty cache, loaded on first use."""
+        self.check_interval = check_interval
+        self.__lock = threading.Lock()
+        self.__generations: dict[str, int] = {}
+        self.__version: tuple[Any, ...] | None = None
+        self.__checked_at = 0.0
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Reload the generations if another worker may have changed them.
+        """
+        reloaded = self.__reload_if_changed(force)
+        record_cache_lookup("session_revocations", not reloaded)
+
+    def __reload_if_changed(self, force: bool) -> bool:
+        """Return True if the generations were read from the database."""
+        if (
+            not force
+            and time.monotonic() - self.__checked_at < self.check_interval
+        ):
+            return False
+
+        with self.__lock:
+            now = time.monotonic()
+            if not force and now - self.__checked_at < self.check_interval:
+                return False  # refreshed by another thread meanwhile
+
+            version = storage.last_modified(SessionRevocation)
+            reload = force or version != self.__version
+            if reload:
+                self.__generations = storage.revocation_generations()
+                self.__version = version
+            self.__checked_at = now
+            return reload
+
+    def mark_stale(self) -> None:
+        """
+        Force a version check on the next lookup.
+        """
+        self.__checked_at = 0.0
+
+    def generation(self, employee_id: str) -> int:
+        """
+        Return the current revocation generation of an employee.
+        """
+        self.refresh()
+        return self.__generations.get(employee_id, 0)
+
+
+class SessionTokens:
+    """
+    Issues and verifies signed session tokens.
+    """
+
+    salt = "employee-session"
+
+    def __init__(self, secret: str, max_age: int) -> None:
+        """Initialize the signer; tokens expire after max_age seconds."""
+        self.max_age = max_age
+        self.__serializer = URLSafeTimedSerializer(secret, salt=self.salt)
+        self.revocations = RevocationCache(REVOCATION_CHECK_INTERVAL)
+
+    def issue(self, employee: Employee) -> str:
+        """
+        Return a new token for employee at their current generation.
+        """
+        self.revocations.refresh(force=True)
+        return self.__serializer.dumps({
+            "id": employee.id,
+            "adm": bool(employee.is_admin),
+            "gen": self.revocations.generation(employee.id),
+        })
+
+    def verify(self, token: str) -> dict[str, Any] | None:
+        """
+        Return the claims of a valid, unexpired and unrevoked token,
+        or None.
+        """
+        try:
+            claims = self.__serializer.loads(token, max_age=self.max_age)
+        except BadSignature:  # also raised for expired tokens
+            return None
+
+        if claims["gen"] < self.revocations.generation(claims["id"]):
+            return None
+        return claims
+
+    def revoke(self, employee_id: str) -> None:
+        """
+        Invalidate every token issued to an employee so far.
+        """
+        storage.revoke_sessions(employee_id)
+        storage.save()
+        self.revocations.mark_stale()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""
+Flask CLI commands for database maintenance and background jobs.
+
+Usage:
+    flask --app api.v1.app maintenance rebuild-sales-rollup
+    flask --app api.v1.app maintenance backfill-product-activity
+    flask --app api.v1.app maintenance backfill-order-totals
+    flask --app api.v1.app maintenance purge-sessions
+    flask --app api.v1.app jobs worker --concurrency 4
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from flask.cli import AppGroup
+import click
+import logging
+import multiprocessing
+import os
+
+from api.v1.utils.jobs import run_pending_jobs, run_worker
+from models import storage
+from models.purchase_order import PurchaseOrder
+from models.sale_order import SaleOrder
+
+
+logger = logging.getLogger(__name__)
+maintenance_cli = AppGroup(
+    "maintenance", help="Database maintenance and backfill tasks."
+)
+jobs_cli = AppGroup("jobs", help="Background job workers.")
+
+
+@maintenance_cli.command("rebuild-sales-rollup")
+@click.option(
+    "--batch-days",
+    default=31,
+    show_default=True,
+    help="Number of days of sales aggregated per transaction.",
+)
+def rebuild_sales_rollup(batch_days: int) -> None:
+    """
+    Backfill the daily sales rollup from existing sales.
+    """
+    windows = storage.rebuild_sales_rollup(batch_days=batch_days)
+    click.echo(f"Rebuilt sales rollup in {windows} batch(es).")
+
+
+@maintenance_cli.command("backfill-product-activity")
+@click.option(
+    "--batch-size",
+    default=500,
+    show_default=True,
+    help="Number of products updated per transaction.",
+)
+def backfill_product_activity(batch_size: int) -> None:
+    """
+    Backfill product last sold and last received timestamps.
+    """
+    products_seen = storage.backfill_product_activity(batch_size=batch_size)
+    click.echo(f"Backfilled activity for {products_seen} product(s).")
+
+
+@maintenance_cli.command("backfill-order-totals")
+@click.option(
+    "--batch-size",
+    default=500,
+    show_default=True,
+    help="Number of orders updated per transaction.",
+)
+def backfill_order_totals(batch_size: int) -> None:
+    """
+    Backfill sale and purchase order totals from their items.
+    """
+    for cls in (SaleOrder, PurchaseOrder):
+        orders_seen = storage.backfill_order_totals(cls, batch_size=batch_size)
+        click.echo(
+            f"Backfilled totals for {orders_seen} {cls.__tablename__} row(s)."
+        )
+
+
+@maintenance_cli.command("purge-sessions")
+@click.option(
+    "--batch-size",
+    default=1000,
+    show_default=True,
+    help="Number of sessions deleted per transaction.",
+)
+def purge_sessions(batch_size: int) -> None:
+    """
+    Delete expired employee sessions.
+    """
+    purged = storage.purge_expired_sessions(batch_size=batch_size)
+    click.echo(f"Purged {purged} expired session(s).")
+
+
+@jobs_cli.command("worker")
+@click.option(
+    "--concurrency",
+    default=os.cpu_count() or 1,
+    show_default="number of CPUs",
+    help="Number of jobs run at once, each in its own process.",
+)
+@click.option(
+    "--once",
+    is_flag=True,
+    help="Run the jobs queued now, then exit.",
+)
+def jobs_worker(concurrency: int, once: bool) -> None:
+    """
+    Claim queued jobs and run them in a process pool.
+    """
+    if not once:
+        click.echo(f"Job worker started with {concurrency} process(es).")
+        run_worker(concurrency)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(concurrency, mp_context=context) as executor:
+        jobs_run = 0
+        while ran := run_pending_jobs(executor, limit=concurrency):
+            jobs_run += ran
+    click.echo(f"Ran {jobs_run} job(s).")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""
+Small in-process caches shared by the API views.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+import threading
+import time
+
+from api.v1.utils.metrics import record_cache_lookup
+
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe cache whose entries expire after a fixed number of seconds.
+
+    Concurrent misses on the same key are collapsed: only the first caller
+    computes the value while the others wait for and reuse its result.
+    """
+
+    def __init__(
+            self, ttl: float, maxsize: int = 128, name: str | None = None
+        ) -> None:
+        """Initialize an empty cache; a name reports its hit rate."""
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__key_locks: dict[Hashable, threading.Lock] = {}
+
+    def __lookup(self, key: Hashable) -> tuple[bool, V | None]:
+        """Return a fresh entry for key, if any. Caller holds the lock."""
+        entry = self.__entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.__entries[key]
+            return False, None
+        self.__entries.move_to_end(key)
+        return True, value
+
+    def __count(self, hit: bool) -> None:
+        """Count a lookup. Caller holds the lock."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.name:
+            record_cache_lookup(self.name, hit)
+
+    def get(self, key: Hashable) -> V | None:
+        """Return the cached value for key, or None if missing or expired."""
+        with self.__lock:
+            found, value = self.__lookup(key)
+            self.__count(found)
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Store value under key, evicting the oldest entry when full."""
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], V]) -> V:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        """
+        with self.__lock:
+            found, value = self.__lookup(key)
+            if found:
+                self.__count(True)
+                return value  # type: ignore
+            key_lock = self.__key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.__lock:
+                found, value = self.__lookup(key)
+                if found:
+                    self.__count(True)
+                    return value  # type: ignore
+                self.__count(False)
+            try:
+                value = compute()
+                self.set(key, value)
+            finally:
+                with self.__lock:
+                    self.__key_locks.pop(key, None)
+            return value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop one entry, or every entry when no key is given."""
+        with self.__lock:
+            if key is None:
+                self.__entries.clear()
+            else:
+                self.__entries.pop(key, None)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""
+Response compression with gzip/brotli negotiation.
+"""
+
+from flask import Response, request
+from typing import Iterable, Iterator
+import gzip
+import logging
+import os
+import zlib
+
+from api.v1.utils.instrumentation import timed
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 500))
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/plain",
+}
+
+
+def get_supported_encodings() -> list[str]:
+    """
+    Returns the encodings this server can produce, most preferred first.
+    """
+    return ["br", "gzip"] if brotli else ["gzip"]
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    """
+    Compresses a complete response body.
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)  # type: ignore
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compresses a streamed body chunk by chunk, flushing after each
+    chunk so the client receives data as soon as it is produced.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)  # type: ignore
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response: Response) -> Response:
+    """
+    After-request hook compressing text responses the client accepts.
+    Small bodies, already encoded bodies and file passthroughs
+    (images) are sent as they are.
+    """
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(get_supported_encodings())
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(
+            response.iter_encoded(), encoding
+        )
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        with timed("compress"):
+            response.set_data(compress_body(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    # the encoded body is no longer byte-identical to the original
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+"""
+Conditional GET helpers: ETags and 304 Not Modified responses.
+"""
+
+from flask import Response, request
+from typing import Any
+import hashlib
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build an ETag value from version parts (ids, last_updated stamps,
+    row counts) plus the request path and query parameters.
+    """
+    query = sorted(request.args.items(multi=True))
+    fingerprint = repr((request.path, query, parts)).encode("utf-8")
+    return hashlib.sha1(fingerprint).hexdigest()
+
+
+def not_modified(etag: str) -> Response | None:
+    """
+    Return a 304 response if the client already holds this version.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+
+    response = Response(status=304)
+    return with_etag(response, etag)
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """
+    Attach a weak ETag and ask clients to revalidate before reuse.
+    """
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
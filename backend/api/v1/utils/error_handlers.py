@@ -57,8 +57,37 @@ def conflict_error(error: HTTPException):
     return jsonify({"error": error.description}), 409
 
 
+def payload_too_large(error: HTTPException):
+    """
+    Handle 413 Payload Too Large errors.
+    """
+    return jsonify({"error": "Request body too large"}), 413
+
+
+def too_many_requests(error: HTTPException):
+    """
+    Handle 429 Too Many Requests errors.
+    """
+    response = jsonify({"error": error.description})
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after:
+        response.headers["Retry-After"] = str(retry_after)
+    return response, 429
+
+
 def server_error(error: HTTPException):
     """
     Handle 500 Internal Server Error.
     """
     return jsonify({"error": "Internal Server Error"}), 500
+
+
+def service_unavailable(error: HTTPException):
+    """
+    Handle 503 Service Unavailable errors.
+    """
+    response = jsonify({"error": error.description})
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after:
+        response.headers["Retry-After"] = str(retry_after)
+    return response, 503
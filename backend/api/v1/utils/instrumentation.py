@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+"""
+Per-request timing: wall time, database time and statement count,
+and time spent serializing JSON.
+
+Each request gets a RequestStats on `g`. SQLAlchemy cursor events add
+every statement to it, and `timed` blocks add named spans. When the
+response goes out, the totals are sent in a Server-Timing header and
+logged as one JSON line. Requests slower than SLOW_REQUEST_MS are kept
+in a bounded, per-worker buffer, with their SQL, for the admin
+diagnostics endpoint.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Any, Iterator
+import json
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 500))
+SLOW_REQUEST_BUFFER = int(os.getenv("SLOW_REQUEST_BUFFER", 50))
+# SQL kept per request; the count and total time cover every statement
+MAX_RECORDED_STATEMENTS = 50
+MAX_STATEMENT_LENGTH = 1000
+
+
+class RequestStats:
+    """
+    Timings collected while handling one request.
+    """
+
+    def __init__(self) -> None:
+        """Start the request clock."""
+        self.started = time.perf_counter()
+        self.db_ms = 0.0
+        self.statements = 0
+        self.sql: list[tuple[str, float]] = []
+        self.spans: dict[str, float] = {}
+
+    def add_statement(self, statement: str, duration_ms: float) -> None:
+        """
+        Count a statement, keeping its SQL while under the limit.
+        """
+        self.db_ms += duration_ms
+        self.statements += 1
+        if len(self.sql) < MAX_RECORDED_STATEMENTS:
+            self.sql.append((statement[:MAX_STATEMENT_LENGTH], duration_ms))
+
+    def add_span(self, name: str, duration_ms: float) -> None:
+        """
+        Add time to a named span, e.g. "serialize".
+        """
+        self.spans[name] = self.spans.get(name, 0.0) + duration_ms
+
+    def elapsed_ms(self) -> float:
+        """
+        Return the milliseconds since the request started.
+        """
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        """
+        Return the stats as a Server-Timing header value.
+        """
+        metrics = [
+            f'db;dur={self.db_ms:.1f};desc="{self.statements} statements"',
+            *(f"{name};dur={ms:.1f}" for name, ms in self.spans.items()),
+            f"total;dur={total_ms:.1f}",
+        ]
+        return ", ".join(metrics)
+
+
+class SlowRequestLog:
+    """
+    Thread-safe ring buffer of the most recent slow requests.
+    """
+
+    def __init__(self, maxlen: int) -> None:
+        """Initialize an empty buffer holding at most maxlen requests."""
+        self.__entries: deque[dict[str, Any]] = deque(maxlen=maxlen)
+        self.__lock = threading.Lock()
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Record a request, dropping the oldest when full."""
+        with self.__lock:
+            self.__entries.append(entry)
+
+    def slowest(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return the buffered requests, slowest first."""
+        with self.__lock:
+            entries = list(self.__entries)
+        entries.sort(key=lambda entry: entry["duration_ms"], reverse=True)
+        return entries[:limit]
+
+    def clear(self) -> None:
+        """Empty the buffer."""
+        with self.__lock:
+            self.__entries.clear()
+
+
+slow_requests = SlowRequestLog(SLOW_REQUEST_BUFFER)
+
+
+def get_request_stats() -> RequestStats | None:
+    """
+    Returns the current request's stats, or None outside a request.
+    """
+    if not has_request_context():
+        return None
+    return g.get("request_stats")
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to the current request's
+    `name` span. Does nothing outside a request.
+    """
+    stats = get_request_stats()
+    if stats is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_span(name, (time.perf_counter() - start) * 1000)
+
+
+def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any,
+        context: Any, executemany: bool
+    ) -> None:
+    """Note when a statement starts."""
+    context.query_started = time.perf_counter()
+
+
+def after_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any,
+        context: Any, executemany: bool
+    ) -> None:
+    """Add a finished statement to the current request's stats."""
+    stats = get_request_stats()
+    if stats is not None:
+        stats.add_statement(
+            statement,
+            (time.perf_counter() - context.query_started) * 1000,
+        )
+
+
+def listen_for_statements() -> None:
+    """
+    Time the statements of every engine. Safe to call more than once.
+    """
+    if event.contains(Engine, "before_cursor_execute", before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+
+
+def start_request_stats() -> None:
+    """
+    Starts timing the request. Registered before authentication so
+    that its queries are counted too.
+    """
+    g.request_stats = RequestStats()
+
+
+def record_request_stats(response: Response) -> Response:
+    """
+    Adds the Server-Timing header, logs the request and keeps it in
+    the slow request buffer if it took longer than SLOW_REQUEST_MS.
+    """
+    stats = get_request_stats()
+    if stats is None:
+        return response
+
+    total_ms = stats.elapsed_ms()
+    response.headers.add("Server-Timing", stats.server_timing(total_ms))
+
+    employee = g.get("current_employee")
+    entry: dict[str, Any] = {
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "duration_ms": round(total_ms, 2),
+        "db_ms": round(stats.db_ms, 2),
+        "statements": stats.statements,
+        **{f"{name}_ms": round(ms, 2) for name, ms in stats.spans.items()},
+        "employee_id": employee.id if employee else None,
+    }
+    slow = total_ms >= SLOW_REQUEST_MS
+    logger.log(logging.WARNING if slow else logging.INFO, json.dumps(entry))
+
+    if slow:
+        slow_requests.add({
+            **entry,
+            "query_string": request.query_string.decode("utf-8", "replace"),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "sql": [
+                {"statement": statement, "duration_ms": round(ms, 2)}
+                for statement, ms in stats.sql
+            ],
+        })
+    return response
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+
+"""
+Background jobs: handlers for heavy work moved out of requests, and
+the worker loop that claims queued jobs and runs them in a process
+pool.
+
+Routes enqueue a Job row and answer 202 with its status URL. Workers
+(`flask --app api.v1.app jobs worker`) claim jobs with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of them can share
+the queue. Between jobs, workers also requeue jobs lost with a dead
+worker and purge expired sessions every SESSION_PURGE_INTERVAL
+seconds; docker-compose.yaml deploys one as the `worker` service.
+"""
+
+from concurrent.futures import (
+    Executor, Future, FIRST_COMPLETED, ProcessPoolExecutor, wait
+)
+from datetime import timedelta
+from typing import Any, Callable
+import logging
+import multiprocessing
+import os
+import time
+
+from api.v1.utils.utility import FileManager, remove_file
+from models import storage
+from models.product import Product
+from models.purchase_order import PurchaseOrder
+from models.sale_order import SaleOrder
+
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any]], dict[str, Any] | None]
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", 30))
+# running jobs without a heartbeat for this long are assumed lost with
+# their worker
+JOB_STALE_AFTER = timedelta(seconds=int(os.getenv("JOB_STALE_AFTER", 900)))
+SESSION_PURGE_INTERVAL = float(os.getenv("SESSION_PURGE_INTERVAL", 3600))
+
+_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register a function as the handler of a job kind. It receives the
+    job payload and returns a JSON serializable result or None.
+    """
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def job_kinds() -> list[str]:
+    """
+    Names of the registered job kinds.
+    """
+    return sorted(_handlers)
+
+
+def execute_job(kind: str, payload: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Run the handler of a job kind. Module level so the process pool
+    can pickle it; each worker process opens its own database session.
+    """
+    try:
+        return _handlers[kind](payload)
+    finally:
+        storage.close()
+
+
+def get_error_message(error: BaseException) -> str:
+    """
+    A short description of why a job failed. Handlers reuse request
+    validation, so HTTP errors keep their description.
+    """
+    return getattr(error, "description", None) or repr(error)
+
+
+def finish_job(job_id: str, attempt: int, future: Future) -> None:
+    """
+    Record the outcome of a job's future, claimed at attempt.
+    """
+    try:
+        result = future.result()
+    except Exception as e:
+        logger.warning(f"Job {job_id} failed: {e!r}")
+        finished = storage.finish_job(
+            job_id, attempt, error=get_error_message(e)
+        )
+    else:
+        finished = storage.finish_job(job_id, attempt, result=result)
+    if not finished:
+        logger.warning(
+            f"Job {job_id} was requeued while running; outcome dropped"
+        )
+
+
+def run_pending_jobs(executor: Executor, limit: int = 10) -> int:
+    """
+    Claim up to limit queued jobs, run them on executor and wait for
+    them to finish, sending heartbeats meanwhile. Returns the number
+    of jobs run.
+    """
+    jobs = storage.claim_jobs(limit)
+    in_flight = {
+        executor.submit(execute_job, job.kind, job.payload):
+            (job.id, job.attempts)
+        for job in jobs
+    }
+    while in_flight:
+        done, _ = wait(in_flight, timeout=JOB_HEARTBEAT_INTERVAL)
+        for future in done:
+            finish_job(*in_flight.pop(future), future)
+        storage.heartbeat_jobs([job_id for job_id, _ in in_flight.values()])
+    return len(jobs)
+
+
+def run_worker(concurrency: int, poll_interval: float = JOB_POLL_INTERVAL) -> None:
+    """
+    Run jobs until interrupted, keeping up to concurrency of them in
+    flight in a pool of worker processes.
+    """
+    # spawn, not fork: children must not share the parent's
+    # database connections
+    context = multiprocessing.get_context("spawn")
+    in_flight: dict[Future, tuple[str, int]] = {}
+    last_requeue = last_purge = last_heartbeat = 0.0
+
+    with ProcessPoolExecutor(concurrency, mp_context=context) as executor:
+        while True:
+            if time.monotonic() - last_requeue > JOB_STALE_AFTER.total_seconds() / 2:
+                requeued = storage.requeue_stale_jobs(JOB_STALE_AFTER)
+                if requeued:
+                    logger.warning(f"Requeued {requeued} stale job(s)")
+                last_requeue = time.monotonic()
+
+            if time.monotonic() - last_purge > SESSION_PURGE_INTERVAL:
+                purged = storage.purge_expired_sessions()
+                logger.info(f"Purged {purged} expired session(s)")
+                last_purge = time.monotonic()
+
+            free_slots = concurrency - len(in_flight)
+            jobs = storage.claim_jobs(free_slots) if free_slots else []
+            for job in jobs:
+                future = executor.submit(execute_job, job.kind, job.payload)
+                in_flight[future] = (job.id, job.attempts)
+
+            if time.monotonic() - last_heartbeat > JOB_HEARTBEAT_INTERVAL:
+                storage.heartbeat_jobs(
+                    [job_id for job_id, _ in in_flight.values()]
+                )
+                last_heartbeat = time.monotonic()
+            storage.close()
+
+            if not in_flight:
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(
+                in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                finish_job(*in_flight.pop(future), future)
+
+
+@job_handler("product_image")
+def store_product_image(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Decode a staged product image upload, store its variants and
+    point the product at them.
+
+    The staged file is removed once the job succeeds or fails. A job
+    that raises is failed, not retried; only a job whose worker died
+    is run again, and then the file is still there for it.
+    """
+    staged_path = payload["staged_path"]
+    try:
+        with open(staged_path, "rb") as f:
+            image_hash = FileManager().store_image(f.read())
+
+        product = storage.get_obj_by_id(Product, payload["product_id"])
+        if not product:
+            raise ValueError("Product not found")
+
+        if product.image_filepath:
+            remove_file(product.image_filepath)
+            product.image_filepath = None
+        product.image_hash = image_hash
+        product.save()
+    except Exception:
+        remove_file(staged_path)
+        raise
+
+    remove_file(staged_path)
+    return {"image_hash": image_hash}
+
+
+@job_handler("rebuild_sales_rollup")
+def rebuild_sales_rollup(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Backfill the daily sales rollup from existing sales.
+    """
+    windows = storage.rebuild_sales_rollup(
+        batch_days=payload.get("batch_days", 31)
+    )
+    return {"batches": windows}
+
+
+@job_handler("backfill_product_activity")
+def backfill_product_activity(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Backfill product last sold and last received timestamps.
+    """
+    products_seen = storage.backfill_product_activity(
+        batch_size=payload.get("batch_size", 500)
+    )
+    return {"products": products_seen}
+
+
+@job_handler("backfill_order_totals")
+def backfill_order_totals(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Backfill sale and purchase order totals from their items.
+    """
+    return {
+        cls.__tablename__: storage.backfill_order_totals(
+            cls, batch_size=payload.get("batch_size", 500)
+        )
+        for cls in (SaleOrder, PurchaseOrder)
+    }
+
+
+@job_handler("purge_expired_sessions")
+def purge_expired_sessions(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Delete expired employee sessions.
+    """
+    purged = storage.purge_expired_sessions(
+        batch_size=payload.get("batch_size", 1000)
+    )
+    return {"sessions": purged}
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+Fast JSON provider for Flask, backed by orjson when it is installed.
+"""
+
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from flask import Response
+from flask.json.provider import JSONProvider
+from typing import Any
+from uuid import UUID
+import json
+
+from api.v1.utils.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS if orjson else 0
+)
+
+
+def default(obj: Any) -> Any:
+    """
+    Encodes the types neither encoder handles natively.
+    orjson already covers datetimes, enums, UUIDs and dataclasses;
+    the stdlib fallback needs all of them.
+    """
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (Decimal, UUID)):
+        return str(obj)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    JSON provider encoding with orjson, falling back to the stdlib
+    `json` module when orjson is unavailable or when stdlib keyword
+    arguments (indent, separators, ...) are requested.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize data as JSON to a string.
+        """
+        if orjson and not kwargs:
+            return orjson.dumps(
+                obj, default=default, option=ORJSON_OPTIONS
+            ).decode("utf-8")
+
+        kwargs.setdefault("default", default)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("sort_keys", True)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        """
+        Deserialize data as JSON from a string or bytes.
+        """
+        if orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Serialize the given arguments as JSON and return a response.
+        orjson output is passed on as bytes, skipping a decode/encode.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        with timed("serialize"):
+            if orjson:
+                data: str | bytes = orjson.dumps(
+                    obj, default=default, option=ORJSON_OPTIONS
+                )
+            else:
+                data = self.dumps(obj, separators=(",", ":"))
+        return self._app.response_class(data, mimetype="application/json")
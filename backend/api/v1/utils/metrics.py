@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+"""
+Prometheus metrics, served at /metrics in the text exposition format.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to a directory shared by
+the workers (gunicorn.conf.py empties it at start-up). Each worker then
+keeps its samples in memory-mapped files there, and a scrape answered
+by any worker reports the totals of all of them.
+
+Scrapes must send METRICS_TOKEN as a bearer token. Without one set,
+/metrics answers 404, except under FLASK_ENV=test.
+"""
+
+from datetime import datetime
+from flask import Response, abort, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+    Histogram, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Iterator
+import hmac
+import logging
+import os
+
+from api.v1.utils.instrumentation import get_request_stats
+from models import storage
+
+
+logger = logging.getLogger(__name__)
+
+# a bearer token Prometheus must send; unset turns /metrics off
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_OPEN = os.getenv("FLASK_ENV") == "test"
+if not METRICS_TOKEN and not METRICS_OPEN:
+    logger.warning("METRICS_TOKEN is not set; /metrics is disabled")
+# finer below 500ms, where the till-facing SLOs sit
+LATENCY_BUCKETS = (
+    0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75,
+    1.0, 2.5, 5.0, 10.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "pharmacy_http_request_duration_seconds",
+    "Time to handle a request, from before authentication to after "
+    "compression.",
+    ["method", "endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "pharmacy_http_requests",
+    "Requests handled, by response status.",
+    ["method", "endpoint", "status"],
+)
+CACHE_LOOKUPS = Counter(
+    "pharmacy_cache_lookups",
+    "In-process cache lookups, by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+# set by every worker after each request; summed over live workers
+DB_POOL_SIZE = Gauge(
+    "pharmacy_db_pool_size",
+    "Configured size of the database connection pools.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "pharmacy_db_pool_connections",
+    "Database connections by state (checked_out, idle, overflow).",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+
+class JobQueueCollector(Collector):
+    """
+    Reads the background job queue at scrape time, so the depth is
+    current whichever worker answers.
+    """
+
+    def describe(self) -> list[GaugeMetricFamily]:
+        """Names the metrics without querying the database."""
+        return [
+            GaugeMetricFamily("pharmacy_jobs", "", labels=["status"]),
+            GaugeMetricFamily("pharmacy_jobs_oldest_queued_age_seconds", ""),
+        ]
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        """Yields the queued and running job counts."""
+        try:
+            counts, oldest_queued = storage.job_queue_stats()
+        except SQLAlchemyError:
+            logger.warning("Could not read the job queue", exc_info=True)
+            return
+
+        jobs = GaugeMetricFamily(
+            "pharmacy_jobs",
+            "Background jobs waiting or in progress, by status.",
+            labels=["status"],
+        )
+        for status in ("queued", "running"):
+            jobs.add_metric([status], counts.get(status, 0))
+        yield jobs
+
+        age = (
+            (datetime.now() - oldest_queued).total_seconds()
+            if oldest_queued else 0
+        )
+        yield GaugeMetricFamily(
+            "pharmacy_jobs_oldest_queued_age_seconds",
+            "Time the oldest queued job has waited, 0 when none are.",
+            value=age,
+        )
+
+
+job_queue_collector = JobQueueCollector()
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    REGISTRY.register(job_queue_collector)
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    Returns the registry to scrape: the shared files of every worker
+    in multiprocess mode, this process's metrics otherwise.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(job_queue_collector)
+    return registry
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Count a lookup in a named in-process cache.
+    """
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_request_metrics(response: Response) -> Response:
+    """
+    After-request hook observing the request's latency and status,
+    and this worker's connection pool.
+    """
+    stats = get_request_stats()
+    if stats is None:
+        return response
+
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_LATENCY.labels(request.method, endpoint).observe(
+        stats.elapsed_ms() / 1000
+    )
+    REQUESTS.labels(request.method, endpoint, response.status_code).inc()
+
+    pool = storage.pool_status()
+    if pool:
+        DB_POOL_SIZE.set(pool.pop("size"))
+        for state, connections in pool.items():
+            DB_POOL_CONNECTIONS.labels(state).set(connections)
+    return response
+
+
+def metrics_endpoint() -> Response:
+    """
+    Serves every metric in the Prometheus text format to scrapes
+    bearing METRICS_TOKEN.
+    """
+    if not METRICS_TOKEN:
+        if not METRICS_OPEN:
+            abort(404)
+    elif not hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {METRICS_TOKEN}".encode(),
+    ):
+        abort(401)
+    return Response(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
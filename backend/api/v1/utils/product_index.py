@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+"""
+Per-worker in-memory index of compact product records for
+point-of-sale lookups and type-ahead suggestions.
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from models import storage
+from models.product import Product
+
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_INDEX_CHECK_INTERVAL = float(
+    os.getenv("PRODUCT_INDEX_CHECK_INTERVAL", 1)
+)
+PRODUCT_INDEX_TTL = float(os.getenv("PRODUCT_INDEX_TTL", 300))
+SALES_VELOCITY_DAYS = int(os.getenv("SALES_VELOCITY_DAYS", 30))
+# rows committed slightly out of last_updated order are picked up
+# by re-reading this much history on every incremental refresh
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase, strip accents and collapse whitespace for matching.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def get_prefix_keys(record: dict[str, Any]) -> set[str]:
+    """
+    Returns the keys a product is found under: its name from the
+    start of every word ("500mg" finds "paracetamol 500mg") and
+    its barcode.
+    """
+    name = normalize(record["name"] or "")
+    words = name.split(" ")
+    keys = {" ".join(words[i:]) for i in range(len(words)) if words[i]}
+    if record["barcode"]:
+        keys.add(normalize(record["barcode"]))
+    return keys
+
+
+class ProductIndex:
+    """
+    Compact product records (id, name, barcode, price, stock) held in
+    memory, keyed by id and by barcode, plus a sorted array of
+    normalized name and barcode prefixes searched with bisect.
+
+    Lookups only touch the database when the index may be stale: at
+    most every `check_interval` seconds, a max(last_updated)/count
+    probe tells whether other workers changed products. Changed rows
+    are merged in; a changed row count (a delete) or an index older
+    than `ttl` seconds triggers a full rebuild. Writes in this worker
+    call `mark_stale` so they are visible on the next lookup.
+    """
+
+    def __init__(self, check_interval: float, ttl: float) -> None:
+        """Initialize an empty index, built on first use."""
+        self.check_interval = check_interval
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        self.__records: dict[str, dict[str, Any]] = {}
+        self.__by_barcode: dict[str, str] = {}
+        self.__prefixes: list[tuple[str, str]] = []
+        self.__velocity: dict[str, float] = {}
+        self.__version: tuple[Any, ...] | None = None
+        self.__checked_at = 0.0
+        self.__built_at = 0.0
+
+    def __set_record(self, record: dict[str, Any]) -> None:
+        """Insert or replace a record. Caller holds the lock."""
+        product_id = record["id"]
+        self.__velocity[product_id] = record.pop("sales_velocity")
+
+        old = self.__records.get(product_id)
+        if old and old["barcode"] and old["barcode"] != record["barcode"]:
+            self.__by_barcode.pop(old["barcode"], None)
+
+        old_keys = get_prefix_keys(old) if old else set()
+        new_keys = get_prefix_keys(record)
+        for key in old_keys - new_keys:
+            position = bisect_left(self.__prefixes, (key, product_id))
+            del self.__prefixes[position]
+        for key in new_keys - old_keys:
+            insort(self.__prefixes, (key, product_id))
+
+        self.__records[product_id] = record
+        if record["barcode"]:
+            self.__by_barcode[record["barcode"]] = product_id
+
+    def __rebuild(self) -> None:
+        """Reload every record. Caller holds the lock."""
+        records = storage.product_index_records(
+            velocity_days=SALES_VELOCITY_DAYS
+        )
+        self.__velocity = {
+            record["id"]: record.pop("sales_velocity") for record in records
+        }
+        self.__records = {record["id"]: record for record in records}
+        self.__by_barcode = {
+            record["barcode"]: record["id"]
+            for record in records if record["barcode"]
+        }
+        self.__prefixes = sorted(
+            (key, record["id"])
+            for record in records for key in get_prefix_keys(record)
+        )
+        self.__built_at = time.monotonic()
+        logger.debug(f"Product index rebuilt: {len(self.__records)} products")
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Bring the index up to date if it may be stale.
+        """
+        if (
+            not force
+            and time.monotonic() - self.__checked_at < self.check_interval
+        ):
+            return
+
+        with self.__lock:
+            now = time.monotonic()
+            if not force and now - self.__checked_at < self.check_interval:
+                return  # refreshed by another thread meanwhile
+
+            version = storage.last_modified(Product)
+            if (
+                force
+                or self.__version is None
+                or version[1] != self.__version[1]
+                or now - self.__built_at > self.ttl
+            ):
+                self.__rebuild()
+            elif version[0] != self.__version[0]:
+                since: datetime = self.__version[0] - REFRESH_OVERLAP
+                for record in storage.product_index_records(
+                    since, velocity_days=SALES_VELOCITY_DAYS
+                ):
+                    self.__set_record(record)
+
+            self.__version = version
+            self.__checked_at = now
+
+    def mark_stale(self) -> None:
+        """
+        Force a version check on the next lookup.
+        """
+        self.__checked_at = 0.0
+
+    def get_by_barcode(self, barcode: str) -> dict[str, Any] | None:
+        """
+        Return a copy of the record for barcode, or None.
+        """
+        self.refresh()
+        product_id = self.__by_barcode.get(barcode)
+        record = self.__records.get(product_id) if product_id else None
+        return dict(record) if record else None
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Return up to limit products whose name (from any word) or
+        barcode starts with query, best sellers first.
+        """
+        self.refresh()
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        with self.__lock:
+            prefixes = self.__prefixes
+            matches: set[str] = set()
+            position = bisect_left(prefixes, (prefix,))
+            while (
+                position < len(prefixes)
+                and prefixes[position][0].startswith(prefix)
+            ):
+                matches.add(prefixes[position][1])
+                position += 1
+
+            top_ids = heapq.nsmallest(
+                limit,
+                matches,
+                key=lambda product_id: (
+                    -self.__velocity.get(product_id, 0.0),
+                    self.__records[product_id]["name"],
+                ),
+            )
+            return [
+                {
+                    **self.__records[product_id],
+                    "sales_velocity": self.__velocity.get(product_id, 0.0),
+                }
+                for product_id in top_ids
+            ]
+
+
+product_index = ProductIndex(
+    check_interval=PRODUCT_INDEX_CHECK_INTERVAL, ttl=PRODUCT_INDEX_TTL
+)
@@ -5,22 +5,27 @@ Defines Pydantic models, enums, and validation
 utilities for request data.
 """
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from enum import Enum
 from flask import abort, request
+from functools import lru_cache
 from json import JSONDecodeError
 from pydantic import (
     BaseModel,
+    TypeAdapter,
     ValidationError,
     EmailStr,
+    Field,
     StringConstraints,
     StrictBool,
+    NonNegativeFloat,
     PositiveFloat,
     PositiveInt,
     PastDatetime,
     field_validator,
+    model_validator,
 )
-from typing import Any, Annotated, Type, TypeVar, Optional, Tuple
+from typing import Any, Annotated, ClassVar, Type, TypeVar, Optional, Tuple
 import logging
 
 
@@ -81,6 +86,66 @@ class SalesPaymentStatus(str, Enum):
     paid = "paid"
     unpaid = "unpaid"
 
+class ReportGranularity(str, Enum):
+    """
+    Time buckets for sales reports.
+    """
+
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class ReportDimension(str, Enum):
+    """
+    Dimensions sales reports can be grouped by.
+    """
+
+    product = "product"
+    brand = "brand"
+    category = "category"
+    employee = "employee"
+
+
+class RankingWindow(str, Enum):
+    """
+    Rolling windows for product rankings, ending today.
+    """
+
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class RankingMetric(str, Enum):
+    """
+    Metrics products can be ranked by.
+    """
+
+    quantity = "quantity"
+    revenue = "revenue"
+
+
+class RankingPartition(str, Enum):
+    """
+    Groups product rankings can be computed within.
+    """
+
+    brand = "brand"
+    category = "category"
+
+
+class MaintenanceJobKind(str, Enum):
+    """
+    Maintenance tasks that can be queued as background jobs.
+    """
+
+    rebuild_sales_rollup = "rebuild_sales_rollup"
+    backfill_product_activity = "backfill_product_activity"
+    backfill_order_totals = "backfill_order_totals"
+    purge_expired_sessions = "purge_expired_sessions"
+
+
 class EmployeeLogin(BaseModel):
     """
     Schema for employee login validation.
@@ -572,7 +637,7 @@ class PurchaseRegister(BaseModel):
             strip_whitespace=True
         ),
     ]
-    quantity: Annotated[int, PositiveInt]
+    quantity: PositiveInt
     unit_cost_price: Annotated[float, PositiveFloat]
     total_cost_price: Annotated[float, PositiveFloat]
     payment_status: PaymentStatus
@@ -614,7 +679,7 @@ class PurchaseUpdate(BaseModel):
             ),
         ]
     ] = None
-    quantity: Optional[Annotated[int, PositiveInt]] = None
+    quantity: Optional[PositiveInt] = None
     unit_cost_price: Optional[Annotated[float, PositiveFloat]] = None
     total_cost_price: Optional[Annotated[float, PositiveFloat]] = None
     payment_status: Optional[PaymentStatus] = None
@@ -682,7 +747,7 @@ class SaleRegister(BaseModel):
             strip_whitespace=True
         ),
     ]
-    quantity: Annotated[int, PositiveInt]
+    quantity: PositiveInt
     unit_selling_price: Annotated[float, PositiveFloat]
     total_selling_price: Annotated[float, PositiveFloat]
     payment_status: SalesPaymentStatus
@@ -722,7 +787,7 @@ class SaleUpdate(BaseModel):
             ),
         ]
     ] = None
-    quantity: Optional[Annotated[int, PositiveInt]] = None
+    quantity: Optional[PositiveInt] = None
     unit_selling_price: Optional[Annotated[float, PositiveFloat]] = None
     total_selling_price: Optional[Annotated[float, PositiveFloat]] = None
     payment_status: Optional[SalesPaymentStatus] = None
@@ -753,6 +818,298 @@ class StockLevelUpdate(BaseModel):
     quantity_in_stock: Optional[Annotated[int, PositiveInt]] = None
 
 
+class ReportRangeQuery(BaseModel):
+    """
+    Common query parameters for reports over a date range.
+    """
+    group_by: list[ReportDimension] = []
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @field_validator("group_by", mode="before")
+    @classmethod
+    def split_group_by(cls, v: Any) -> Any:
+        """
+        Accept a comma separated list of dimensions.
+        """
+        if isinstance(v, str):
+            return [item.strip().lower() for item in v.split(",") if item.strip()]
+        return v
+
+    @model_validator(mode="after")
+    def check_date_range(self) -> "ReportRangeQuery":
+        """
+        Ensure the date range is not inverted.
+        """
+        if (
+            self.start_date and self.end_date
+            and self.start_date >= self.end_date
+        ):
+            raise ValueError("start_date must be before end_date")
+        return self
+
+
+class SalesReportQuery(ReportRangeQuery):
+    """
+    Schema for sales report query parameters.
+    """
+    granularity: ReportGranularity = ReportGranularity.day
+
+
+class MarginReportQuery(ReportRangeQuery):
+    """
+    Schema for margin report query parameters.
+    """
+    group_by: list[ReportDimension] = [ReportDimension.product]
+
+
+class ProductRankingQuery(BaseModel):
+    """
+    Schema for top products and movers query parameters.
+    """
+    window: RankingWindow = RankingWindow.week
+    metric: RankingMetric = RankingMetric.quantity
+    limit: PositiveInt = 50
+    partition_by: Optional[RankingPartition] = None
+
+    @field_validator("limit")
+    @classmethod
+    def check_limit(cls, v: int) -> int:
+        """
+        Cap the number of products returned per ranking.
+        """
+        if v > 200:
+            raise ValueError("limit must not exceed 200")
+        return v
+
+
+class ProductFilterQuery(BaseModel):
+    """
+    Schema for product filter query parameters. Brand and category
+    ids are comma separated; dates are inclusive.
+    """
+    brand_ids: list[str] = []
+    category_ids: list[str] = []
+    min_price: Optional[NonNegativeFloat] = None
+    max_price: Optional[NonNegativeFloat] = None
+    in_stock: Optional[bool] = None
+    below_reorder: Optional[bool] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+    facets: bool = True
+    page_size: Annotated[PositiveInt, Field(le=200)] = 50
+    page_num: PositiveInt = 1
+
+    @field_validator("brand_ids", "category_ids", mode="before")
+    @classmethod
+    def split_ids(cls, v: Any) -> Any:
+        """
+        Accept a comma separated list of ids.
+        """
+        if isinstance(v, str):
+            return list(dict.fromkeys(
+                item.strip() for item in v.split(",") if item.strip()
+            ))
+        return v
+
+    @model_validator(mode="after")
+    def check_ranges(self) -> "ProductFilterQuery":
+        """
+        Ensure the price and date ranges are not inverted.
+        """
+        if (
+            self.min_price is not None and self.max_price is not None
+            and self.min_price > self.max_price
+        ):
+            raise ValueError("min_price must not exceed max_price")
+        if (
+            self.created_from and self.created_to
+            and self.created_from > self.created_to
+        ):
+            raise ValueError("created_from must not be after created_to")
+        return self
+
+
+class ProductSuggestQuery(BaseModel):
+    """
+    Schema for product autocomplete query parameters.
+    """
+    q: Annotated[str, StringConstraints(min_length=1, max_length=100)]
+    limit: Annotated[PositiveInt, Field(le=50)] = 10
+
+
+class ListQuery(BaseModel):
+    """
+    Common filter and sort parameters for transactional lists.
+
+    created_from/created_to select the half-open range
+    [created_from, created_to). The older `date_time` parameter selects
+    the calendar day it falls on and cannot be combined with them.
+    `order_by` is a comma separated list of `sortable` columns, each
+    optionally prefixed with "-" for descending order. Fields a subclass
+    adds are equality filters.
+    """
+    sortable: ClassVar[frozenset[str]] = frozenset({"created_at"})
+
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    date_time: Optional[datetime] = None
+    order_by: list[str] = []
+
+    @field_validator("order_by", mode="before")
+    @classmethod
+    def split_order_by(cls, v: Any) -> Any:
+        """
+        Accept a comma separated list of sort keys.
+        """
+        if isinstance(v, str):
+            return [item.strip() for item in v.split(",") if item.strip()]
+        return v
+
+    @field_validator("order_by")
+    @classmethod
+    def check_order_by(cls, v: list[str]) -> list[str]:
+        """
+        Only allow sorting on indexed columns.
+        """
+        unknown = [key for key in v if key.lstrip("-") not in cls.sortable]
+        if unknown:
+            raise ValueError(
+                f"Cannot order by {', '.join(unknown)}; "
+                f"use {', '.join(sorted(cls.sortable))}"
+            )
+        return v
+
+    @model_validator(mode="after")
+    def check_created_range(self) -> "ListQuery":
+        """
+        Ensure the created range is not inverted, nor given alongside
+        date_time.
+        """
+        if self.date_time and (self.created_from or self.created_to):
+            raise ValueError(
+                "date_time cannot be combined with created_from or created_to"
+            )
+        if (
+            self.created_from and self.created_to
+            and self.created_from >= self.created_to
+        ):
+            raise ValueError("created_from must be before created_to")
+        return self
+
+    def storage_args(self) -> dict[str, Any]:
+        """
+        Keyword arguments for `DBStorage.all`.
+        """
+        created_from, created_to = self.created_from, self.created_to
+        if self.date_time:
+            created_from = datetime.combine(
+                self.date_time.date(), datetime.min.time()
+            )
+            created_to = created_from + timedelta(days=1)
+
+        return {
+            "created_from": created_from,
+            "created_to": created_to,
+            "order_by": self.order_by,
+            "filters": self.model_dump(
+                mode="json",
+                exclude=set(ListQuery.model_fields),
+                exclude_none=True,
+            ),
+        }
+
+
+class SaleListQuery(ListQuery):
+    """
+    Schema for sale list query parameters.
+    """
+    sortable = frozenset({"created_at", "total_selling_price", "quantity"})
+
+    payment_status: Optional[SalesPaymentStatus] = None
+    employee_id: Optional[str] = None
+    product_id: Optional[str] = None
+    sale_order_id: Optional[str] = None
+
+
+class PurchaseListQuery(ListQuery):
+    """
+    Schema for purchase list query parameters.
+    """
+    sortable = frozenset({"created_at", "total_cost_price", "quantity"})
+
+    item_status: Optional[ItemStatus] = None
+    payment_status: Optional[PaymentStatus] = None
+    product_id: Optional[str] = None
+    purchase_order_id: Optional[str] = None
+
+
+class SaleOrderListQuery(ListQuery):
+    """
+    Schema for sale order list query parameters.
+    """
+    status: Optional[SaleOrderStatus] = None
+    employee_id: Optional[str] = None
+
+
+class PurchaseOrderListQuery(ListQuery):
+    """
+    Schema for purchase order list query parameters.
+    """
+    status: Optional[PurchaseOrderStatus] = None
+    employee_id: Optional[str] = None
+
+
+class DeadStockQuery(BaseModel):
+    """
+    Schema for dead stock query parameters.
+    """
+    days: PositiveInt = 90
+
+
+MAX_BATCH_IDS = 500
+
+
+class BatchIdsQuery(BaseModel):
+    """
+    Schema for multi-get requests, `?ids=a,b,c` or `{"ids": [...]}`.
+    """
+    ids: Annotated[list[str], Field(min_length=1, max_length=MAX_BATCH_IDS)]
+
+    @field_validator("ids", mode="before")
+    @classmethod
+    def split_ids(cls, v: Any) -> Any:
+        """
+        Accept a comma separated list and drop repeated ids,
+        keeping the first occurrence.
+        """
+        if isinstance(v, str):
+            v = [item.strip() for item in v.split(",") if item.strip()]
+        # anything else is left for type validation to reject
+        if isinstance(v, list) and all(isinstance(item, str) for item in v):
+            return list(dict.fromkeys(v))  # type: ignore
+        return v
+
+
+class BarcodeBatch(BaseModel):
+    """
+    Schema for a multi-scan barcode lookup.
+    """
+    barcodes: Annotated[
+        list[Annotated[str, StringConstraints(min_length=1, max_length=20)]],
+        Field(min_length=1, max_length=MAX_BATCH_IDS),
+    ]
+
+
+class JobCreate(BaseModel):
+    """
+    Schema for queueing a maintenance job.
+    """
+    kind: MaintenanceJobKind
+    batch_size: Optional[PositiveInt] = None
+    batch_days: Optional[PositiveInt] = None
+
+
 def get_request_data() -> dict[str, Any]:
     """
     Extract and validate JSON from the request.
@@ -765,21 +1122,71 @@ def get_request_data() -> dict[str, Any]:
     return request_data
 
 
+@lru_cache(maxsize=None)
+def get_type_adapter(validation_cls: Type[BaseModel]) -> TypeAdapter[Any]:
+    """
+    Returns the adapter validating one instance of a schema,
+    built once per worker.
+    """
+    return TypeAdapter(validation_cls)
+
+
+@lru_cache(maxsize=None)
+def get_list_adapter(validation_cls: Type[BaseModel]) -> TypeAdapter[Any]:
+    """
+    Returns the adapter validating a bulk request: a JSON array of
+    1 to MAX_BATCH_IDS instances of a schema.
+    """
+    return TypeAdapter(Annotated[
+        list[validation_cls],  # type: ignore
+        Field(min_length=1, max_length=MAX_BATCH_IDS),
+    ])
+
+
+def get_json_body() -> bytes:
+    """
+    Returns the raw JSON request body, for pydantic to parse and
+    validate in one pass. Non-JSON requests get 415, as from
+    `request.get_json`.
+    """
+    if not request.is_json:
+        abort(
+            415,
+            description="Did not attempt to load JSON data because the"
+            " request Content-Type was not 'application/json'."
+        )
+    return request.get_data()
+
+
+def is_empty(valid_data: BaseModel) -> bool:
+    """
+    True when every field of a validated model, defaults included,
+    is None.
+    """
+    return all(
+        getattr(valid_data, name) is None
+        for name in type(valid_data).model_fields
+    )
+
+
 def validate_form_data(validation_cls: Type[T]) -> Tuple[dict[str, Any], Any]:
     """
+    Validate a multipart form, with an optional "image" file, or a
+    JSON body when there is neither, against a Pydantic model.
     """
     form_data = request.form.to_dict()
     file = request.files.get("image")
-
-    if not form_data and not file:
-        form_data = get_request_data()
+    adapter = get_type_adapter(validation_cls)
 
     try:
-        valid_data = validation_cls(**form_data)
+        if form_data or file:
+            valid_data = adapter.validate_python(form_data)
+        else:
+            valid_data = adapter.validate_json(get_json_body())
     except ValidationError as e:
-        abort(400, description=e.errors())
+        abort(400, description=e.errors(include_context=False))
 
-    if not valid_data.model_dump(exclude_none=True) and not file:
+    if is_empty(valid_data) and not file:
         abort(400, description="Request data cannot be empty")
     return valid_data.model_dump(exclude_unset=True), file
 
@@ -788,8 +1195,6 @@ def validate_request_data(validation_cls: Type[T]) -> dict[str, Any]:
     """
     Validate incoming request data against a Pydantic model.
     """
-    request_data = get_request_data()
-
     if not issubclass(validation_cls, BaseModel):  # type: ignore
         logger.error(
             "Validation class must inherit from pydantic BaseModel"
@@ -797,10 +1202,55 @@ def validate_request_data(validation_cls: Type[T]) -> dict[str, Any]:
         abort(500)
 
     try:
-        valid_data = validation_cls(**request_data)
+        valid_data = get_type_adapter(validation_cls).validate_json(
+            get_json_body()
+        )
     except ValidationError as e:
-        abort(400, description=e.errors())
+        abort(400, description=e.errors(include_context=False))
 
-    if not valid_data.model_dump(exclude_none=True):
+    if is_empty(valid_data):
         abort(400, description="Request data cannot be empty")
     return valid_data.model_dump(exclude_unset=True)
+
+
+def validate_request_list(validation_cls: Type[T]) -> list[dict[str, Any]]:
+    """
+    Validate a JSON array of items against a Pydantic model,
+    for bulk endpoints.
+    """
+    try:
+        items = get_list_adapter(validation_cls).validate_json(
+            get_json_body()
+        )
+    except ValidationError as e:
+        abort(400, description=e.errors(include_context=False))
+
+    for position, item in enumerate(items):
+        if is_empty(item):
+            abort(400, description=f"Item {position} cannot be empty")
+    return [item.model_dump(exclude_unset=True) for item in items]
+
+
+def validate_query_args(validation_cls: Type[T]) -> T:
+    """
+    Validate the request query string against a Pydantic model.
+    """
+    try:
+        return validation_cls(**request.args.to_dict())
+    except ValidationError as e:
+        abort(400, description=e.errors(include_context=False))
+
+
+def validate_batch_ids() -> list[str]:
+    """
+    Read the ids of a multi-get from the query string on GET
+    or from the JSON body on POST.
+    """
+    data = (
+        request.args.to_dict() if request.method == "GET"
+        else get_request_data()
+    )
+    try:
+        return BatchIdsQuery(**data).ids
+    except ValidationError as e:
+        abort(400, description=e.errors(include_context=False))
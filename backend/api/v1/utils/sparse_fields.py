@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""
+Sparse fieldsets (`?fields=`) for read endpoints.
+
+Views describe their computed keys as relationship paths, e.g.
+{"brand_name": ("brand", "name")}. The same description drives both
+what storage loads and what the serializer emits, so a request for
+`?fields=name,quantity_in_stock` neither selects other columns nor
+touches any relationship.
+"""
+
+from flask import abort, request
+from typing import Any, Iterable, Type
+
+from models.basemodel import BaseModel
+
+
+RelationFields = dict[str, tuple[str, ...]]
+LoadFields = list[str | tuple[str, ...]]
+
+
+def get_fields_arg(
+        cls: Type[BaseModel],
+        relation_fields: RelationFields | None = None,
+        hidden: Iterable[str] = (),
+        extra: Iterable[str] = (),
+    ) -> set[str] | None:
+    """
+    Parse the comma separated `fields` query parameter.
+    Returns None when it is absent, meaning every field.
+    `extra` names keys the view computes itself, such as order items.
+    """
+    fields_arg = request.args.get("fields")
+    if fields_arg is None:
+        return None
+
+    fields = {field.strip() for field in fields_arg.split(",") if field.strip()}
+    allowed = (
+        set(cls.__mapper__.column_attrs.keys())  # type: ignore
+        | set(relation_fields or {})
+        | set(extra)
+    ) - set(hidden) - {"password"}
+
+    unknown = fields - allowed
+    if not fields or unknown:
+        abort(
+            400,
+            description=f"Unknown fields: {', '.join(sorted(unknown))}"
+            if unknown else "fields cannot be empty",
+        )
+
+    fields.add("id")
+    return fields
+
+
+def get_load_fields(
+        fields: set[str] | None,
+        relation_fields: RelationFields | None = None,
+    ) -> LoadFields | None:
+    """
+    Translate requested fields into the columns and relationship
+    paths storage must load.
+    """
+    if fields is None:
+        return None
+    relation_fields = relation_fields or {}
+    return [relation_fields.get(field, field) for field in sorted(fields)]
+
+
+def get_related_value(obj: Any, path: tuple[str, ...]) -> Any:
+    """
+    Follow a relationship path, returning None on a missing link.
+    """
+    for attr in path:
+        if obj is None:
+            return None
+        obj = getattr(obj, attr)
+    return obj
+
+
+def to_sparse_dict(
+        obj: BaseModel,
+        fields: set[str] | None,
+        relation_fields: RelationFields | None = None,
+    ) -> dict[str, Any]:
+    """
+    Serialize obj, keeping only the requested fields and only
+    resolving the relationships those fields need.
+    """
+    obj_dict = obj.to_dict()
+    obj_dict.pop("__class__", None)
+    if fields is not None:
+        obj_dict = {
+            key: value for key, value in obj_dict.items() if key in fields
+        }
+
+    for key, path in (relation_fields or {}).items():
+        if fields is None or key in fields:
+            obj_dict[key] = get_related_value(obj, path)
+    return obj_dict
@@ -6,18 +6,23 @@ Utility functions and database helpers.
 
 # from datetime import datetime, timedelta
 from werkzeug.datastructures import FileStorage
-from flask import abort, current_app
+from flask import abort
+from functools import lru_cache
 from io import BytesIO
-from PIL import Image
+from PIL import Image, features
 from psycopg2.errors import UniqueViolation
 from sqlalchemy.exc import IntegrityError
 from typing import Type, TypeVar, Any
 from uuid import uuid4
 # import calendar
+import hashlib
 import logging
 import magic
 import os
+import re
+import shutil
 
+from api.v1.utils.request_data_validation import validate_batch_ids
 from models import storage
 from models.basemodel import BaseModel
 from models.employee import Employee
@@ -26,6 +31,14 @@ from models.employee import Employee
 logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=BaseModel)
 
+# backend/, which holds static/ and uploads/
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..")
+)
+UPLOAD_STAGING_DIR = os.getenv(
+    "UPLOAD_STAGING_DIR", os.path.join(PROJECT_ROOT, "uploads")
+)
+
 
 def check_email_username_exists(data: dict[str, Any]) -> None:
     """
@@ -45,9 +58,11 @@ def check_email_username_exists(data: dict[str, Any]) -> None:
             abort(409, description="Username already exists.")
 
 
-def get_obj(cls: Type[T], id: str) -> T | None:
+def get_obj(
+        cls: Type[T], id: str, fields: list[Any] | None = None
+    ) -> T | None:
     """
-    Fetch a record by ID.
+    Fetch a record by ID, optionally loading only the given fields.
     """
 
     if not issubclass(cls, BaseModel):  # type: ignore
@@ -55,10 +70,25 @@ def get_obj(cls: Type[T], id: str) -> T | None:
     if not isinstance(id, str):  # type: ignore
         abort(400, description="id must be a valid string.")
 
-    obj = storage.get_obj_by_id(cls, id)
+    obj = storage.get_obj_by_id(cls, id, fields=fields)
     return obj
 
 
+def get_many_objs(
+        cls: Type[T], fields: list[Any] | None = None
+    ) -> tuple[list[T], list[str]]:
+    """
+    Fetch the records named by a multi-get request in one query.
+    Returns the records found, in request order, and the missing ids.
+    """
+    ids = validate_batch_ids()
+    objs = storage.get_many(cls, ids, fields=fields)
+
+    found = [obj for obj in objs if obj is not None]
+    missing = [id for id, obj in zip(ids, objs) if obj is None]
+    return found, missing
+
+
 # def run_monthly_reordering_point_update():
 #     """
 #     """
@@ -154,51 +184,139 @@ class DatabaseOp:
             abort(500)
 
 
+def remove_file(filepath: str) -> None:
+    """
+    Delete a stored file if it still exists.
+    """
+    absolute_path = os.path.abspath(filepath)
+    if os.path.exists(absolute_path):
+        os.remove(absolute_path)
+
+
+@lru_cache(maxsize=1)
+def get_mime_detector() -> magic.Magic:
+    """
+    Returns a libmagic handle shared by all uploads in this worker.
+    Opening one loads the magic database, so it is done once;
+    `from_buffer` serializes access with its own lock.
+    """
+    return magic.Magic(mime=True)
+
+
 class FileManager:
     """
+    Validates uploaded images and stores them as pre-sized variants.
+
+    Variants are written to static/images/<hh>/<hash>/, where hash is
+    the sha256 of the uploaded bytes, so uploading the same image again
+    reuses the stored files. Each upload is decoded once.
     """
     max_image_size = 1 * 1024 * 1024
+    min_quality = 40
+    max_quality = 85
+    webp_quality = 80
+    # method 2 encodes about 3x faster than the default 4 at a
+    # similar size
+    webp_method = 2
+    # variant name -> longest side in pixels
+    variants = {"thumb": 160, "medium": 480, "full": 1600}
+    max_dimension = max(variants.values())
+    mimetypes = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+    webp_enabled = (
+        features.check("webp")
+        and os.getenv("IMAGE_WEBP", "1") not in ("0", "false")
+    )
 
     def allowed_mime(self, mime_type: str) -> bool:
         return mime_type in ('image/jpeg', 'image/jpg', 'image/png')
 
-    def compress_image(self, image: Image.Image) -> BytesIO:
+    def get_target_size(
+            self, size: tuple[int, int], max_dimension: int
+        ) -> tuple[int, int]:
         """
-        Resize an compress images.
-        Steps:
-        1. Remove EXIF metadata
-        2. Convert to RGB
-        3. Resize if image is larger than max dimension
-        4. Save as JPEG with decreasing quality
+        Size of an image after fitting it within max_dimension.
         """
-        max_dimension = 800
+        width, height = size
+        scale = min(1.0, max_dimension / max(width, height))
+        return max(1, round(width * scale)), max(1, round(height * scale))
 
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
-        else:
-            image = image.copy()
-        
-        width, height = image.size
-        if max(width, height) > max_dimension:
-            image.thumbnail((max_dimension, max_dimension))
-        
+    def encode_jpeg(self, image: Image.Image, quality: int) -> BytesIO:
+        """
+        Encode image as an optimized JPEG at the given quality.
+        """
         img_bytes = BytesIO()
-        quality = 85
-        
-        while True:
-            img_bytes.seek(0)
-            img_bytes.truncate(0)
-            
-            image.save(img_bytes, format="JPEG", optimize=True, quality=quality)
+        image.save(img_bytes, format="JPEG", optimize=True, quality=quality)
+        img_bytes.seek(0)
+        return img_bytes
 
-            if img_bytes.tell() <= self.max_image_size or quality <= 40:
-                break
+    def compress_image(self, image: Image.Image) -> BytesIO:
+        """
+        Save as JPEG at the highest quality within max_image_size,
+        found by binary search between min_quality and max_quality.
+        EXIF metadata is not carried over.
+        """
+        # most images fit at the top quality: one encode
+        best = self.encode_jpeg(image, self.max_quality)
+        if best.getbuffer().nbytes <= self.max_image_size:
+            return best
+
+        low, high = self.min_quality, self.max_quality - 1
+        best = None
+        while low <= high:
+            quality = (low + high) // 2
+            img_bytes = self.encode_jpeg(image, quality)
+            if img_bytes.getbuffer().nbytes <= self.max_image_size:
+                best = img_bytes
+                low = quality + 1
+            else:
+                high = quality - 1
 
-            quality -= 5
-        
-        img_bytes.seek(0)
+        # nothing fits: return the smallest encode for the caller to reject
+        return best or self.encode_jpeg(image, self.min_quality)
 
-        return img_bytes
+    def encode_variants(self, image: Image.Image) -> dict[str, BytesIO]:
+        """
+        Encode every variant of image, keyed by file name such as
+        "thumb.jpg". Images with transparency are kept as PNG, others
+        become JPEG; WebP copies are added when enabled.
+        """
+        has_alpha = image.mode in ("RGBA", "LA") or (
+            image.mode == "P" and "transparency" in image.info
+        )
+        if has_alpha:
+            image, ext = image.convert("RGBA"), "png"
+        else:
+            image = image if image.mode in ("RGB", "L") else image.convert("RGB")
+            ext = "jpg"
+
+        encoded: dict[str, BytesIO] = {}
+        # largest first, so each variant is resized from the previous one
+        for variant, max_dimension in sorted(
+            self.variants.items(), key=lambda item: -item[1]
+        ):
+            size = self.get_target_size(image.size, max_dimension)
+            if size != image.size:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+
+            if ext == "jpg":
+                img_bytes = self.compress_image(image)
+                if img_bytes.getbuffer().nbytes > self.max_image_size:
+                    abort(400, description="Image too large even after compression.")
+            else:
+                img_bytes = BytesIO()
+                image.save(img_bytes, format="PNG", optimize=True)
+            encoded[f"{variant}.{ext}"] = img_bytes
+
+            if self.webp_enabled:
+                webp_bytes = BytesIO()
+                image.save(
+                    webp_bytes,
+                    format="WEBP",
+                    quality=self.webp_quality,
+                    method=self.webp_method,
+                )
+                encoded[f"{variant}.webp"] = webp_bytes
+        return encoded
 
     def validate_request(self, file: FileStorage) -> FileStorage:
         """
@@ -212,12 +330,12 @@ class FileManager:
 
         return file
     
-    def validate_file(self, file_bytes: bytes) -> str:
+    def validate_file(self, file_bytes: bytes) -> tuple[str, Image.Image]:
         """
         Verifies file mime type and ensure file is not corrupt.
+        Returns the mime type and the decoded image.
         """
-        mime = magic.Magic(mime=True)
-        mime_type = mime.from_buffer(file_bytes)
+        mime_type = get_mime_detector().from_buffer(file_bytes)
         if not self.allowed_mime(mime_type):
             abort(
                 400,
@@ -227,83 +345,100 @@ class FileManager:
 
         try:
             image = Image.open(BytesIO(file_bytes))
-            image.verify()  # Validate image is not corrupt
+            if image.format == "JPEG":
+                # every variant is downscaled anyway: let libjpeg decode
+                # at 1/2, 1/4 or 1/8 scale instead of full size
+                image.draft(
+                    "RGB", self.get_target_size(image.size, self.max_dimension)
+                )
+            image.load()  # a full decode rejects corrupt or truncated files
         except Exception:
             abort(
                 400,
                 description="Uploaded file is not a valid image."
             )
-        return mime_type
-    
-    def validate_file_size(self, file_bytes: bytes, mime_type: str) -> BytesIO:
+        return mime_type, image
+
+    def get_image_dir(self, image_hash: str) -> str:
         """
+        Directory holding the variants of an image.
         """
-        image = Image.open(BytesIO(file_bytes))
-
-        if len(file_bytes) <= self.max_image_size:
-            return BytesIO(file_bytes)
-        
-        if mime_type in ["image/jpeg", "image/jpg"]:
-            compressed = self.compress_image(image)
-
-            if compressed.getbuffer().nbytes > self.max_image_size:
-                abort(400, description="Image too large even after compression.")
-            return compressed
-        
-        abort(
-            400,
-            description="Maximum image size exceeded"
-            f" {self.max_image_size/(1024*1024)}mb."
+        return os.path.join(
+            PROJECT_ROOT, "static", "images", image_hash[:2], image_hash
         )
 
-    def upload_file(
-            self, img_bytes: BytesIO, ext: str,
-            image_type: str, obj: BaseModel | None=None
-        ) -> str:
+    def find_variant(
+            self, image_hash: str, variant: str, accept_webp: bool = False
+        ) -> tuple[str, str] | None:
         """
+        Returns the path and mime type of a stored variant, preferring
+        WebP when the client accepts it, or None.
         """
-        folder = {
-            "employee": "employees_images",
-            "products": "products_images",
-        }.get(image_type, "other")
-
-        static_folder = os.path.join("static", folder)
-        os.makedirs(static_folder, exist_ok=True)
-
-        image_filepath = getattr(obj, "image_filepath", None) if obj else None
-
-        if image_filepath:
-            absolute_path = os.path.abspath(image_filepath)
-
-            if os.path.exists(absolute_path):
-                os.remove(absolute_path)
-
-        filename = f"{uuid4().hex}.{ext}"
-        project_root = os.path.abspath(os.path.join(current_app.root_path, "..", ".."))
-        filepath = os.path.join(project_root, "static", folder, filename)
-
-        img_bytes.seek(0)
-        with open(filepath, "wb") as f:
-            f.write(img_bytes.read())
-
-        return filepath
-
-    def process_file(
-            self, file: FileStorage, image_type: str, obj: BaseModel | None=None
-        ) -> str:
+        if variant not in self.variants or not re.fullmatch(
+            r"[0-9a-f]{64}", image_hash
+        ):
+            return None
+
+        image_dir = self.get_image_dir(image_hash)
+        for ext in (["webp"] if accept_webp else []) + ["jpg", "png"]:
+            path = os.path.join(image_dir, f"{variant}.{ext}")
+            if os.path.isfile(path):
+                return path, self.mimetypes[ext]
+        return None
+
+    def stage_file(self, file: FileStorage) -> str:
         """
+        Check an uploaded image's name and mime type and save it under
+        UPLOAD_STAGING_DIR for a background job to decode and store.
+        Returns the staged file path.
         """
         file = self.validate_request(file)
         file_bytes = file.read()
+        mime_type = get_mime_detector().from_buffer(file_bytes)
+        if not self.allowed_mime(mime_type):
+            abort(
+                400,
+                description=f"Invalid file format {mime_type}."
+                " Allowed files are: jpeg, jpg, png"
+            )
 
-        mime_type = self.validate_file(file_bytes)
-        img_bytes = self.validate_file_size(file_bytes, mime_type)
-
-        ext = "jpg" if mime_type == "image/jpeg" else "png"
+        os.makedirs(UPLOAD_STAGING_DIR, exist_ok=True)
+        staged_path = os.path.join(UPLOAD_STAGING_DIR, uuid4().hex)
+        with open(staged_path, "wb") as f:
+            f.write(file_bytes)
+        return staged_path
 
-        if obj:
-            image_filepath = self.upload_file(img_bytes, ext, image_type, obj)
-        else:
-            image_filepath = self.upload_file(img_bytes, ext, image_type)
+    def store_image(self, file_bytes: bytes) -> str:
+        """
+        Validate image bytes and store their variants.
+        Returns the image hash.
+        """
+        image_hash = hashlib.sha256(file_bytes).hexdigest()
+        image_dir = self.get_image_dir(image_hash)
+        if os.path.isdir(image_dir):
+            return image_hash  # already stored
+
+        _, image = self.validate_file(file_bytes)
+        encoded = self.encode_variants(image)
+
+        # write beside the final directory, then rename it into place
+        # so readers never see a partial set of variants
+        os.makedirs(os.path.dirname(image_dir), exist_ok=True)
+        tmp_dir = f"{image_dir}.{uuid4().hex}.tmp"
+        os.makedirs(tmp_dir)
+        for filename, img_bytes in encoded.items():
+            with open(os.path.join(tmp_dir, filename), "wb") as f:
+                f.write(img_bytes.getbuffer())
+        try:
+            os.rename(tmp_dir, image_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir)  # stored meanwhile by another request
+        return image_hash
 
-        return image_filepath 
+    def process_file(self, file: FileStorage) -> str:
+        """
+        Validate an uploaded image and store its variants.
+        Returns the image hash.
+        """
+        file = self.validate_request(file)
+        return self.store_image(file.read())
@@ -10,11 +10,16 @@ app_views = Blueprint("app_views", __name__, url_prefix="/api/v1")
 
 from api.v1.views.brands import *
 from api.v1.views.categories import *
+from api.v1.views.dashboard import *
+from api.v1.views.diagnostics import *
 from api.v1.views.employees import *
 from api.v1.views.filter_products import *
+from api.v1.views.images import *
+from api.v1.views.jobs import *
 from api.v1.views.products import *
 from api.v1.views.purchases import *
 from api.v1.views.purchase_orders import *
+from api.v1.views.reports import *
 from api.v1.views.sale_orders import *
 from api.v1.views.sales import *
 from api.v1.views.stock_levels import *
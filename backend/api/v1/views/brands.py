@@ -10,27 +10,36 @@ import logging
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
+from api.v1.utils.conditional import make_etag, not_modified, with_etag
 from api.v1.utils.request_data_validation import (
     BrandRegister,
     BrandUpdate,
     validate_request_data,
 )
-from api.v1.utils.utility import DatabaseOp, get_obj
+from api.v1.utils.sparse_fields import (
+    RelationFields, get_fields_arg, get_load_fields, to_sparse_dict
+)
+from api.v1.utils.utility import DatabaseOp, get_many_objs, get_obj
 from models import storage
 from models.brand import Brand
+from models.employee import Employee
 
 
 logger = logging.getLogger(__name__)
 
 
-def get_brand_dict(brand: Brand) -> dict[str, Any]:
+brand_relation_fields: RelationFields = {
+    "added_by": ("added_by", "username"),
+}
+
+
+def get_brand_dict(
+        brand: Brand, fields: set[str] | None = None
+    ) -> dict[str, Any]:
     """
     Converts a Brand object to a dictionary excluding related fields.
     """
-    brand_dict = brand.to_dict()
-    brand_dict["added_by"] = brand.added_by.username
-    brand_dict.pop("__class__", None)
-    return brand_dict
+    return to_sparse_dict(brand, fields, brand_relation_fields)
 
 
 @app_views.route("/brands", strict_slashes=False, methods=["POST"])
@@ -62,26 +71,60 @@ def get_all_brands(page_size: int, page_num: int):
     """
     Retrieves all brands with pagination.
     """
+    fields = get_fields_arg(Brand, brand_relation_fields)
+    load_fields = get_load_fields(fields, brand_relation_fields)
+
+    etag = make_etag(storage.last_modified(Brand, Employee))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     date_time = request.args.get("date_time")
     search_term = request.args.get("search")
 
     if search_term:
         brands = storage.search(
-            Brand, search_term, page_size=page_size, page_num=page_num
+            Brand, search_term, page_size=page_size, page_num=page_num,
+            fields=load_fields,
         )
     else:
         brands = storage.all(
-            Brand, page_size=page_size, page_num=page_num, date_time=date_time
+            Brand, page_size=page_size, page_num=page_num,
+            date_time=date_time, fields=load_fields,
         )
 
     if not brands:
         abort(404, description="No brand found")
 
     brand_lists: list[dict[str, Any]] = [
-        get_brand_dict(brand) for brand in brands
+        get_brand_dict(brand, fields) for brand in brands
     ]
 
-    return jsonify(brand_lists), 200
+    return with_etag(jsonify(brand_lists), etag), 200
+
+
+@app_views.route("/brands", strict_slashes=False, methods=["GET"])
+@app_views.route(
+    "/brands/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+@admin_only
+def get_many_brands():
+    """
+    Get several brands by id in one call, in request order.
+    Ids come from `?ids=a,b,c` or a JSON body `{"ids": [...]}`.
+    """
+    fields = get_fields_arg(Brand, brand_relation_fields)
+    brands, missing = get_many_objs(
+        Brand, get_load_fields(fields, brand_relation_fields)
+    )
+    return jsonify({
+        "results": [
+            get_brand_dict(brand, fields) for brand in brands
+        ],
+        "missing": missing,
+    }), 200
 
 
 @app_views.route(
@@ -94,12 +137,22 @@ def get_brand(brand_id: str):
     """
     Retrieves a single brand by ID.
     """
-    brand = get_obj(Brand, brand_id)
+    fields = get_fields_arg(Brand, brand_relation_fields)
+    brand = get_obj(
+        Brand, brand_id, get_load_fields(fields, brand_relation_fields)
+    )
     if not brand:
         abort(404, description="Brand does not exist")
 
-    brand_dict = get_brand_dict(brand)
-    return jsonify(brand_dict), 200
+    etag = make_etag(
+        brand.id, brand.last_updated, storage.last_modified(Employee)
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    brand_dict = get_brand_dict(brand, fields)
+    return with_etag(jsonify(brand_dict), etag), 200
 
 
 @app_views.route(
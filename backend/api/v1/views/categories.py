@@ -10,31 +10,37 @@ import logging
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
+from api.v1.utils.conditional import make_etag, not_modified, with_etag
 from api.v1.utils.request_data_validation import (
     CategoryRegister,
     CategoryUpdate,
     validate_request_data,
 )
-from api.v1.utils.utility import DatabaseOp, get_obj
+from api.v1.utils.sparse_fields import (
+    RelationFields, get_fields_arg, get_load_fields, to_sparse_dict
+)
+from api.v1.utils.utility import DatabaseOp, get_many_objs, get_obj
 from models import storage
 from models.category import Category
+from models.employee import Employee
 
 
 logger = logging.getLogger(__name__)
 
 
-def get_category_dict(category: Category) -> dict[str, Any]:
+category_relation_fields: RelationFields = {
+    "added_by": ("added_by", "username"),
+}
+
+
+def get_category_dict(
+        category: Category, fields: set[str] | None = None
+    ) -> dict[str, Any]:
     """
     Converts a Category object to a dictionary
     excluding related fields.
     """
-
-    category_dict = category.to_dict()
-    logger.debug(f"category dict: {category_dict}")
-    category_dict["added_by"] = category.added_by.username
-    category_dict.pop("__class__", None)
-
-    return category_dict
+    return to_sparse_dict(category, fields, category_relation_fields)
 
 
 @app_views.route(
@@ -70,26 +76,60 @@ def get_all_categories(page_size: int, page_num: int):
     """
     Retrieves all categories with pagination.
     """
+    fields = get_fields_arg(Category, category_relation_fields)
+    load_fields = get_load_fields(fields, category_relation_fields)
+
+    etag = make_etag(storage.last_modified(Category, Employee))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     date_time = request.args.get("date_time")
     search_term = request.args.get("search")
 
     if search_term:
         categories = storage.search(
-            Category, search_term, page_size=page_size, page_num=page_num
+            Category, search_term, page_size=page_size, page_num=page_num,
+            fields=load_fields,
         )
     else:
         categories = storage.all(
-            Category, page_size=page_size, page_num=page_num, date_time=date_time
+            Category, page_size=page_size, page_num=page_num,
+            date_time=date_time, fields=load_fields,
         )
     if not categories:
         abort(404, description="No category found")
 
     logger.debug(f"categories: {categories}")
     category_lists: list[dict[str, Any]] = [
-        get_category_dict(category) for category in categories
+        get_category_dict(category, fields) for category in categories
     ]
 
-    return jsonify(category_lists), 200
+    return with_etag(jsonify(category_lists), etag), 200
+
+
+@app_views.route("/categories", strict_slashes=False, methods=["GET"])
+@app_views.route(
+    "/categories/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+@admin_only
+def get_many_categories():
+    """
+    Get several categories by id in one call, in request order.
+    Ids come from `?ids=a,b,c` or a JSON body `{"ids": [...]}`.
+    """
+    fields = get_fields_arg(Category, category_relation_fields)
+    categories, missing = get_many_objs(
+        Category, get_load_fields(fields, category_relation_fields)
+    )
+    return jsonify({
+        "results": [
+            get_category_dict(category, fields) for category in categories
+        ],
+        "missing": missing,
+    }), 200
 
 
 @app_views.route(
@@ -102,12 +142,23 @@ def get_category(category_id: str):
     """
     Retrieves a single category by ID.
     """
-    category = get_obj(Category, category_id)
+    fields = get_fields_arg(Category, category_relation_fields)
+    category = get_obj(
+        Category, category_id,
+        get_load_fields(fields, category_relation_fields),
+    )
     if not category:
         abort(404, description="Category does not exist")
 
-    category_dict = get_category_dict(category)
-    return jsonify(category_dict), 200
+    etag = make_etag(
+        category.id, category.last_updated, storage.last_modified(Employee)
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    category_dict = get_category_dict(category, fields)
+    return with_etag(jsonify(category_dict), etag), 200
 
 
 @app_views.route(
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Routes for the admin dashboard summary.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import jsonify
+from typing import Any, Callable
+import logging
+import os
+
+from api.v1.auth.authorization import admin_only
+from api.v1.views import app_views
+from api.v1.utils.cache import TTLCache
+from models import storage
+from models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from models.sale_order import SaleOrder, SaleOrderStatus
+
+
+logger = logging.getLogger(__name__)
+
+# Each pool thread gets its own scoped session, hence its own connection.
+dashboard_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DASHBOARD_WORKERS", 4)),
+    thread_name_prefix="dashboard",
+)
+dashboard_cache: TTLCache[dict[str, Any]] = TTLCache(
+    ttl=float(os.getenv("DASHBOARD_CACHE_TTL", 5)), maxsize=1,
+    name="dashboard",
+)
+
+
+def run_in_own_session(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a storage query on a pool thread and release its connection.
+    """
+    try:
+        return func(*args)
+    finally:
+        storage.close()
+
+
+def build_dashboard_summary() -> dict[str, Any]:
+    """
+    Run the independent dashboard aggregates concurrently.
+    """
+    now = datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+    low_stock_threshold = int(os.getenv("LOW_STOCK_THRESHOLD", 10))
+
+    jobs = {
+        "today": (storage.get_sales_totals, today, tomorrow),
+        "open_sale_orders": (
+            storage.count_orders_by_status,
+            SaleOrder,
+            [SaleOrderStatus.pending],
+        ),
+        "open_purchase_orders": (
+            storage.count_orders_by_status,
+            PurchaseOrder,
+            [PurchaseOrderStatus.pending, PurchaseOrderStatus.in_progress],
+        ),
+        "low_stock_products": (
+            storage.count_low_stock_products, low_stock_threshold
+        ),
+        "top_sellers": (
+            storage.top_selling_products, today - timedelta(days=6), tomorrow, 5
+        ),
+    }
+    futures = {
+        name: dashboard_executor.submit(run_in_own_session, *job)
+        for name, job in jobs.items()
+    }
+    results = {name: future.result() for name, future in futures.items()}
+
+    return {
+        "generated_at": now.isoformat(),
+        "today_revenue": results["today"]["revenue"],
+        "today_sales_count": results["today"]["sales_count"],
+        "open_sale_orders": results["open_sale_orders"],
+        "open_purchase_orders": results["open_purchase_orders"],
+        "low_stock_products": results["low_stock_products"],
+        "top_sellers": results["top_sellers"],
+    }
+
+
+@app_views.route(
+    "/dashboard/summary",
+    strict_slashes=False,
+    methods=["GET"]
+)
+@admin_only
+def get_dashboard_summary():
+    """
+    Get today's revenue, open orders, low stock count and top sellers.
+    Results are shared between callers for a few seconds.
+    """
+    summary = dashboard_cache.get_or_set("summary", build_dashboard_summary)
+    return jsonify(summary), 200
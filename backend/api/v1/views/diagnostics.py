@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+"""
+Defines admin routes for inspecting request performance.
+"""
+
+from flask import abort, jsonify, request
+import logging
+
+from api.v1.auth.authorization import admin_only
+from api.v1.views import app_views
+from api.v1.utils.instrumentation import SLOW_REQUEST_MS, slow_requests
+
+
+logger = logging.getLogger(__name__)
+
+
+@app_views.route(
+    "/diagnostics/slow_requests", strict_slashes=False, methods=["GET"]
+)
+@admin_only
+def get_slow_requests():
+    """
+    Retrieves this worker's recent slow requests, slowest first, with
+    their timings and SQL. Optional `limit` caps how many are returned.
+    """
+    limit = request.args.get("limit", type=int)
+    if limit is not None and limit <= 0:
+        abort(400, description="limit must be a positive integer")
+    return jsonify({
+        "threshold_ms": SLOW_REQUEST_MS,
+        "requests": slow_requests.slowest(limit),
+    }), 200
@@ -9,14 +9,18 @@ import logging
 from typing import cast
 
 from api.v1.auth.authorization import admin_only
+from api.v1.auth.passwords import hash_password
 from api.v1.views import app_views
 from api.v1.utils.request_data_validation import (
     EmployeeRegister,
     EmployeeUpdate,
     validate_request_data,
 )
+from api.v1.utils.sparse_fields import (
+    get_fields_arg, get_load_fields, to_sparse_dict
+)
 from api.v1.utils.utility import (
-    DatabaseOp, get_obj, check_email_username_exists
+    DatabaseOp, get_many_objs, get_obj, check_email_username_exists
 )
 from models import storage
 from models.employee import Employee
@@ -30,14 +34,11 @@ def register_employee():
     """
     Registers a new employee.
     """
-    from api.v1.app import bcrypt
     valid_data = validate_request_data(EmployeeRegister)
 
     check_email_username_exists(valid_data)
 
-    valid_data["password"] = bcrypt.generate_password_hash(  # type: ignore
-        valid_data["password"]
-    ).decode("utf-8")
+    valid_data["password"] = hash_password(valid_data["password"])
     employee = Employee(**valid_data)
 
     db = DatabaseOp()
@@ -58,20 +59,46 @@ def get_all_employees(page_size: int, page_num: int):
     """
     Retrieves all employees with pagination.
     """
+    fields = get_fields_arg(Employee)
     date_time = request.args.get("date_time")
 
     employees_objects = storage.all(
-        Employee, page_size=page_size, page_num=page_num, date_time=date_time
+        Employee, page_size=page_size, page_num=page_num,
+        date_time=date_time, fields=get_load_fields(fields),
     )
     if not employees_objects:
         abort(404, description="No employee found")
 
     all_employees = [
-        employee.to_dict() for employee in employees_objects
+        to_sparse_dict(employee, fields) for employee in employees_objects
     ]
     return jsonify(all_employees), 200
 
 
+@app_views.route("/employees", strict_slashes=False, methods=["GET"])
+@app_views.route(
+    "/employees/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+@admin_only
+def get_many_employees():
+    """
+    Get several employees by id in one call, in request order.
+    Ids come from `?ids=a,b,c` or a JSON body `{"ids": [...]}`.
+    """
+    fields = get_fields_arg(Employee)
+    employees, missing = get_many_objs(
+        Employee, get_load_fields(fields)
+    )
+    return jsonify({
+        "results": [
+            to_sparse_dict(employee, fields) for employee in employees
+        ],
+        "missing": missing,
+    }), 200
+
+
 @app_views.route(
         "/employees/<employee_id>",
         strict_slashes=False,
@@ -81,15 +108,15 @@ def get_employee(employee_id: str):
     """
     Retrieves a single employee by ID.
     """
+    fields = get_fields_arg(Employee)
     if employee_id == "me":
         employee = cast(Employee, g.current_employee)
     else:
-        employee = get_obj(Employee, employee_id)
+        employee = get_obj(Employee, employee_id, get_load_fields(fields))
 
     if not employee:
         abort(404, description="User does not exist")
-    employee_dict = employee.to_dict()
-    employee_dict.pop("__class__", None)
+    employee_dict = to_sparse_dict(employee, fields)
     return jsonify(employee_dict), 200
 
 
@@ -113,6 +140,9 @@ def update_employee(employee_id: str):
 
     db = DatabaseOp()
     db.save(employee)
+    if "is_admin" in valid_data:
+        from api.v1.app import auth
+        auth.revoke_sessions(employee.id)  # tokens carry the admin flag
 
     employee_dict = employee.to_dict()
     return jsonify(employee_dict), 200
@@ -128,10 +158,13 @@ def delete_employee(employee_id: str):
     """
     Deletes an employee by ID.
     """
+    from api.v1.app import auth
+
     employee = get_obj(Employee, employee_id)
     if not employee:
         abort(404, description="User does not exist")
 
+    auth.revoke_sessions(employee.id)
     db = DatabaseOp()
     db.delete(employee)
     db.commit()
@@ -10,27 +10,49 @@ import logging
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
+from api.v1.utils.request_data_validation import (
+    ProductFilterQuery, validate_query_args
+)
+from api.v1.utils.sparse_fields import get_load_fields
 from api.v1.utils.utility import get_obj
+from api.v1.views.products import (
+    get_product_dict, get_product_fields_arg, product_relation_fields
+)
 from models import storage
 from models.brand import Brand
 from models.category import Category
-from models.product import Product
 
 
 logger = logging.getLogger(__name__)
 
 
-def get_product_dict(product: Product) -> dict[str, Any]:
+@app_views.route("/products/filter", strict_slashes=False, methods=["GET"])
+@admin_only
+def filter_products():
     """
-    Return product dicts.
+    Filter products by brands, categories, price range, stock,
+    reorder status and creation date.
+    Facet counts per brand and category come from the same
+    request unless `facets=false`.
     """
-    product_dict = product.to_dict()
-    product_dict["category_name"] = product.category.name
-    product_dict["added_by"] = product.added_by.username
-    product_dict["brand_name"] = product.brand.name
-    product_dict.pop("image_filepath", None)
-    product_dict.pop("__class__", None)
-    return product_dict
+    query = validate_query_args(ProductFilterQuery)
+    filters = query.model_dump(
+        exclude={"facets", "page_size", "page_num"}
+    )
+    fields = get_product_fields_arg()
+    products = storage.filter_products(
+        query.page_size,
+        query.page_num,
+        fields=get_load_fields(fields, product_relation_fields),
+        **filters,
+    )
+
+    response: dict[str, Any] = {
+        "results": [get_product_dict(product, fields) for product in products]
+    }
+    if query.facets:
+        response["facets"] = storage.product_facets(**filters)
+    return jsonify(response), 200
 
 
 @app_views.route(
@@ -47,17 +69,18 @@ def get_brand_products(brand_id: str, page_size: int, page_num: int):
     if not brand:
         abort(404, description="Brand does not exist.")
 
+    fields = get_product_fields_arg()
     brand_products = storage.filter_products(
         page_size,
         page_num,
-        brand_id=brand.id,
-        filter_type="brand"
+        brand_ids=[brand.id],
+        fields=get_load_fields(fields, product_relation_fields),
     )
     if not brand_products:
         abort(404, description="No product found for the brand.")
 
     brand_products_list = [
-        get_product_dict(product) for product in brand_products
+        get_product_dict(product, fields) for product in brand_products
     ]
     return jsonify(brand_products_list), 200
 
@@ -76,17 +99,18 @@ def get_category_products(category_id: str, page_size: int, page_num: int):
     if not category:
         abort(404, description="Category does not exist.")
     
+    fields = get_product_fields_arg()
     category_products = storage.filter_products(
         page_size,
         page_num,
-        category_id=category.id,
-        filter_type="category"
+        category_ids=[category.id],
+        fields=get_load_fields(fields, product_relation_fields),
     )
     if not category_products:
         abort(404, description="No product found for the category.")
     
     category_products_list = [
-        get_product_dict(product) for product in category_products
+        get_product_dict(product, fields) for product in category_products
     ]
     return jsonify(category_products_list), 200
 
@@ -110,15 +134,17 @@ def get_category_brand_products(
     if not brand:
         abort(404, description="Brand does not exist.")
     
+    fields = get_product_fields_arg()
     category_brand_products = storage.filter_products(
         page_size, page_num,
-        brand_id=brand_id,
-        category_id=category_id
+        brand_ids=[brand.id],
+        category_ids=[category.id],
+        fields=get_load_fields(fields, product_relation_fields),
     )
     if not category_brand_products:
         abort(404, description="No category and brand found for this product.")
 
     category_brand_products_list = [
-        get_product_dict(product) for product in category_brand_products
+        get_product_dict(product, fields) for product in category_brand_products
     ]
     return jsonify(category_brand_products_list), 200
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+"""
+Serves stored image variants.
+"""
+
+from flask import abort, request, send_file
+import logging
+
+from api.v1.views import app_views
+from api.v1.utils.utility import FileManager
+
+
+logger = logging.getLogger(__name__)
+
+# variants are content-addressed: a given URL never changes
+IMAGE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@app_views.route(
+    "/images/<image_hash>/<variant>",
+    strict_slashes=False,
+    methods=["GET"]
+)
+def get_image(image_hash: str, variant: str):
+    """
+    Serve the thumb, medium or full variant of an image, as WebP
+    when the client lists it in Accept.
+    """
+    accept_webp = any(
+        mimetype == "image/webp" and quality > 0
+        for mimetype, quality in request.accept_mimetypes
+    )
+    found = FileManager().find_variant(image_hash, variant, accept_webp)
+    if not found:
+        abort(404, description="Image not found")
+
+    path, mimetype = found
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        conditional=True,
+        etag=f"{image_hash}-{variant}-{mimetype.split('/')[1]}",
+        max_age=IMAGE_MAX_AGE,
+    )
+    response.cache_control.immutable = True
+    response.vary.add("Accept")
+    return response
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+Defines routes for queueing background jobs and polling their status.
+"""
+
+from flask import abort, jsonify, g, url_for
+from typing import Any
+import logging
+
+from api.v1.auth.authorization import admin_only
+from api.v1.views import app_views
+from api.v1.utils.request_data_validation import (
+    JobCreate,
+    validate_request_data,
+)
+from api.v1.utils.utility import DatabaseOp, get_obj
+from models.job import Job
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_job_dict(job: Job) -> dict[str, Any]:
+    """
+    Converts a Job object to a dictionary with its status URL.
+    """
+    job_dict = job.to_dict()
+    job_dict.pop("__class__", None)
+    job_dict["status_url"] = url_for("app_views.get_job", job_id=job.id)
+    return job_dict
+
+
+def new_job(kind: str, payload: dict[str, Any]) -> Job:
+    """
+    Add a job for the current employee to the session. It is queued
+    when the session is next committed.
+    """
+    return Job(kind=kind, payload=payload, employee_id=g.current_employee.id)
+
+
+def enqueue_job(kind: str, payload: dict[str, Any]):
+    """
+    Queue a job for the current employee and answer 202 Accepted,
+    pointing the client at the job's status URL.
+    """
+    job = new_job(kind, payload)
+    db = DatabaseOp()
+    db.save(job)
+
+    job_dict = get_job_dict(job)
+    response = jsonify(job_dict)
+    response.headers["Location"] = job_dict["status_url"]
+    return response, 202
+
+
+@app_views.route("/jobs", strict_slashes=False, methods=["POST"])
+@admin_only
+def create_job():
+    """
+    Queues a maintenance job.
+    """
+    valid_data = validate_request_data(JobCreate)
+    kind = valid_data.pop("kind").value
+    return enqueue_job(kind, valid_data)
+
+
+@app_views.route("/jobs/<job_id>", strict_slashes=False, methods=["GET"])
+def get_job(job_id: str):
+    """
+    Retrieves a job's status, and its result once finished.
+    Employees only see their own jobs; admins see all.
+    """
+    job = get_obj(Job, job_id)
+    employee = g.current_employee
+    if not job or (job.employee_id != employee.id and not employee.is_admin):
+        abort(404, description="Job does not exist")
+
+    response = jsonify(get_job_dict(job))
+    if job.status in ("queued", "running"):
+        response.headers["Retry-After"] = "1"
+    return response, 200
@@ -4,41 +4,104 @@
 Routes for managing products.
 """
 
+from datetime import datetime, timedelta
 from flask import abort, jsonify, g, request
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import HTTPException
 from typing import Any
 import logging
-import os
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
+from api.v1.views.jobs import enqueue_job, get_job_dict, new_job
+from api.v1.utils.conditional import make_etag, not_modified, with_etag
+from api.v1.utils.product_index import product_index
 from api.v1.utils.request_data_validation import (
+    BarcodeBatch,
+    DeadStockQuery,
     ProductRegister,
+    ProductSuggestQuery,
     ProductUpdate,
     validate_form_data,
+    validate_query_args,
+    validate_request_data,
+)
+from api.v1.utils.sparse_fields import (
+    RelationFields, get_fields_arg, get_load_fields, to_sparse_dict
+)
+from api.v1.utils.utility import (
+    DatabaseOp, FileManager, get_many_objs, get_obj, remove_file
 )
-from api.v1.utils.utility import DatabaseOp, FileManager, get_obj
 from models import storage
 from models.product import Product
 from models.brand import Brand
 from models.category import Category
+from models.employee import Employee
+from models.job import Job
 
 
 logger = logging.getLogger(__name__)
 
 
-def get_product_dict(product: Product) -> dict[str, Any]:
+product_relation_fields: RelationFields = {
+    "category_name": ("category", "name"),
+    "added_by": ("added_by", "username"),
+    "brand_name": ("brand", "name"),
+}
+
+
+def get_product_dict(
+        product: Product, fields: set[str] | None = None
+    ) -> dict[str, Any]:
     """
     Return product data excluding relations.
     """
-    product_dict = product.to_dict()
-    product_dict["category_name"] = product.category.name
-    product_dict["added_by"] = product.added_by.username
-    product_dict["brand_name"] = product.brand.name
+    product_dict = to_sparse_dict(product, fields, product_relation_fields)
     product_dict.pop("image_filepath", None)
-    product_dict.pop("__class__", None)
     return product_dict
 
 
+def get_product_fields_arg() -> set[str] | None:
+    """
+    Parse `?fields=` for product read endpoints.
+    """
+    return get_fields_arg(
+        Product, product_relation_fields, hidden=["image_filepath"]
+    )
+
+
+def queue_product_image(
+        product: Product, image_file: FileStorage | None
+    ) -> Job | None:
+    """
+    Stage an uploaded image and add a job storing it for the product.
+    The upload is only checked for type here, as for
+    PUT /products/<product_id>/image.
+    """
+    if not image_file:
+        return None
+    staged_path = FileManager().stage_file(image_file)
+    return new_job(
+        "product_image",
+        {"product_id": product.id, "staged_path": staged_path},
+    )
+
+
+def save_product(product: Product, image_job: Job | None) -> None:
+    """
+    Save a product together with its image job, dropping the staged
+    image if the save fails.
+    """
+    db = DatabaseOp()
+    try:
+        db.save(product)
+    except HTTPException:
+        if image_job:
+            remove_file(image_job.payload["staged_path"])
+        raise
+    product_index.mark_stale()
+
+
 @app_views.route(
         "/products",
         strict_slashes=False,
@@ -72,15 +135,13 @@ def register_product():
     if not category:
         abort(404, description="Category does not exist.")
     
-    if image_file:
-        image_filepath = FileManager().process_file(image_file, "products")
-        valid_data["image_filepath"] = image_filepath
-
     product = Product(**valid_data)
-    db = DatabaseOp()
-    db.save(product)
+    image_job = queue_product_image(product, image_file)
+    save_product(product, image_job)
 
     product_dict = get_product_dict(product)
+    if image_job:
+        product_dict["image_job"] = get_job_dict(image_job)
     return jsonify(product_dict), 201
 
 
@@ -94,28 +155,150 @@ def get_all_products(page_size: int, page_num: int):
     """
     Get paginated list of products.
     """
+    fields = get_product_fields_arg()
+    load_fields = get_load_fields(fields, product_relation_fields)
+
+    etag = make_etag(storage.last_modified(Product, Brand, Category, Employee))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     date_time = request.args.get("date_time")
     search_term = request.args.get("search")
 
     if search_term:
         products = storage.search(
-            Product, search_term, page_size=page_size, page_num=page_num
+            Product, search_term, page_size=page_size, page_num=page_num,
+            fields=load_fields,
         )
     else:
         products = storage.all(
-            Product, page_size=page_size, page_num=page_num, date_time=date_time
+            Product, page_size=page_size, page_num=page_num,
+            date_time=date_time, fields=load_fields,
         )
 
     if not products:
         abort(404, description="No product found")
 
     product_lists: list[dict[str, Any]] = [
-        get_product_dict(product) for product in products
+        get_product_dict(product, fields) for product in products
     ]
 
+    return with_etag(jsonify(product_lists), etag), 200
+
+
+@app_views.route(
+    "/products/dead_stock",
+    strict_slashes=False,
+    methods=["GET"],
+    defaults={"page_size": 50, "page_num": 1},
+)
+@app_views.route(
+    "/products/dead_stock/<int:page_size>/<int:page_num>",
+    strict_slashes=False,
+    methods=["GET"]
+)
+@admin_only
+def get_dead_stock(page_size: int, page_num: int):
+    """
+    Get in-stock products that have not sold in the last `days` days.
+    """
+    if page_size <= 0 or page_num <= 0:
+        abort(400, description="Page size and number must be positive")
+
+    query = validate_query_args(DeadStockQuery)
+    cutoff = datetime.now() - timedelta(days=query.days)
+    fields = get_product_fields_arg()
+
+    products = storage.dead_stock_products(
+        cutoff, page_size, page_num,
+        fields=get_load_fields(fields, product_relation_fields),
+    )
+    if not products:
+        abort(404, description="No dead stock found")
+
+    product_lists: list[dict[str, Any]] = [
+        get_product_dict(product, fields) for product in products
+    ]
     return jsonify(product_lists), 200
 
 
+@app_views.route("/products", strict_slashes=False, methods=["GET"])
+@app_views.route(
+    "/products/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+@admin_only
+def get_many_products():
+    """
+    Get several products by id in one call, in request order.
+    Ids come from `?ids=a,b,c` or a JSON body `{"ids": [...]}`.
+    """
+    fields = get_product_fields_arg()
+    products, missing = get_many_objs(
+        Product, get_load_fields(fields, product_relation_fields)
+    )
+    return jsonify({
+        "results": [
+            get_product_dict(product, fields) for product in products
+        ],
+        "missing": missing,
+    }), 200
+
+
+@app_views.route(
+    "/products/barcode/<barcode>",
+    strict_slashes=False,
+    methods=["GET"]
+)
+def get_product_by_barcode(barcode: str):
+    """
+    Look up a scanned barcode in the in-memory product index.
+    Returns the product id, name, barcode, price and stock.
+    """
+    record = product_index.get_by_barcode(barcode)
+    if not record:
+        abort(404, description="No product found for barcode")
+    return jsonify(record), 200
+
+
+@app_views.route(
+    "/products/barcode/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+def get_products_by_barcodes():
+    """
+    Look up several scanned barcodes at once, in scan order.
+    """
+    valid_data = validate_request_data(BarcodeBatch)
+
+    results: list[dict[str, Any]] = []
+    missing: list[str] = []
+    for barcode in valid_data["barcodes"]:
+        record = product_index.get_by_barcode(barcode)
+        if record:
+            results.append(record)
+        else:
+            missing.append(barcode)
+    return jsonify({"results": results, "missing": missing}), 200
+
+
+@app_views.route(
+    "/products/suggest",
+    strict_slashes=False,
+    methods=["GET"]
+)
+def suggest_products():
+    """
+    Autocomplete product names and barcodes from the in-memory
+    product index, best sellers first.
+    """
+    query = validate_query_args(ProductSuggestQuery)
+    return jsonify(product_index.suggest(query.q, query.limit)), 200
+
+
 @app_views.route(
         "products/<product_id>",
         strict_slashes=False,
@@ -126,12 +309,24 @@ def get_product(product_id: str):
     """
     Get a single product by ID.
     """
-    product = get_obj(Product, product_id)
+    fields = get_product_fields_arg()
+    product = get_obj(
+        Product, product_id, get_load_fields(fields, product_relation_fields)
+    )
     if not product:
         abort(404, description="Product does not exist")
 
-    product_dict = get_product_dict(product)
-    return jsonify(product_dict), 200
+    etag = make_etag(
+        product.id,
+        product.last_updated,
+        storage.last_modified(Brand, Category, Employee),
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    product_dict = get_product_dict(product, fields)
+    return with_etag(jsonify(product_dict), etag), 200
 
 
 @app_views.route(
@@ -166,20 +361,45 @@ def update_product(product_id: str):
             abort(404, description="Category does not exist.")
         valid_data["category"] = category
     
-    if image_file:
-        image_filepath = FileManager().process_file(image_file, "products", obj=product)
-        valid_data["image_filepath"] = image_filepath
-
     for attr, value in valid_data.items():
         setattr(product, attr, value)
 
-    db = DatabaseOp()
-    db.save(product)
+    image_job = queue_product_image(product, image_file)
+    save_product(product, image_job)
 
     product_dict = get_product_dict(product)
+    if image_job:
+        product_dict["image_job"] = get_job_dict(image_job)
     return jsonify(product_dict), 200
 
 
+@app_views.route(
+        "products/<product_id>/image",
+        strict_slashes=False,
+        methods=["PUT"]
+    )
+@admin_only
+def update_product_image(product_id: str):
+    """
+    Replace a product's image in the background. The upload is only
+    checked for type here; decoding and storing its variants is left
+    to a job whose status URL is returned with 202 Accepted.
+    """
+    product = get_obj(Product, product_id)
+    if not product:
+        abort(404, description="Product does not exist")
+
+    image_file = request.files.get("image")
+    if not image_file:
+        abort(400, description="No image uploaded")
+
+    staged_path = FileManager().stage_file(image_file)
+    return enqueue_job(
+        "product_image",
+        {"product_id": product_id, "staged_path": staged_path},
+    )
+
+
 @app_views.route(
         "products/<product_id>",
         strict_slashes=False,
@@ -194,15 +414,11 @@ def delete_product(product_id: str):
     if not product:
         abort(404, description="Product does not exist")
     
-    image_filepath = product.image_filepath
-
-    if image_filepath:
-        absolute_path = os.path.abspath(image_filepath)
-
-        if os.path.exists(absolute_path):
-            os.remove(absolute_path)
+    if product.image_filepath:
+        remove_file(product.image_filepath)
 
     db = DatabaseOp()
     db.delete(product)
     db.commit()
+    product_index.mark_stale()
     return jsonify({}), 200
@@ -4,18 +4,27 @@
 Routes for managing purchase orders.
 """
 
-from flask import abort, jsonify, g, request
+from flask import abort, jsonify, g
 from typing import Any
 import logging
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
 from api.v1.utils.request_data_validation import (
+    PurchaseOrderListQuery,
     PurchaseOrderRegister,
     PurchaseOrderUpdate,
+    validate_query_args,
     validate_request_data,
 )
-from api.v1.utils.utility import DatabaseOp, get_obj
+from api.v1.utils.sparse_fields import (
+    LoadFields,
+    RelationFields,
+    get_fields_arg,
+    get_load_fields,
+    to_sparse_dict,
+)
+from api.v1.utils.utility import DatabaseOp, get_many_objs, get_obj
 from models import storage
 from models.purchase_order import PurchaseOrder
 
@@ -23,13 +32,64 @@ from models.purchase_order import PurchaseOrder
 logger = logging.getLogger(__name__)
 
 
-def get_purchase_order_dict(purchase_order: PurchaseOrder) -> dict[str, Any]:
+purchase_order_relation_fields: RelationFields = {
+    "added_by": ("added_by", "username"),
+}
+purchase_order_item_fields = (
+    "purchase_order_items", "purchase_order_items_summary"
+)
+
+
+def get_purchase_order_dict(
+        purchase_order: PurchaseOrder, fields: set[str] | None = None
+    ) -> dict[str, Any]:
     """
     Return a purchase order as a dictionary excluding related items.
     """
-    order_dict = purchase_order.to_dict()
-    order_dict["added_by"] = purchase_order.added_by.username
-    order_dict.pop("__class__", None)
+    return to_sparse_dict(
+        purchase_order, fields, purchase_order_relation_fields
+    )
+
+
+def get_purchase_order_fields(
+        list_view: bool = False,
+    ) -> tuple[set[str] | None, LoadFields | None]:
+    """
+    Parse `?fields=` for purchase order reads. Returns the requested
+    fields and what to load; orders with items are loaded in full.
+    List pages default to the order row with its totals, no items.
+    """
+    fields = get_fields_arg(
+        PurchaseOrder,
+        purchase_order_relation_fields,
+        extra=purchase_order_item_fields,
+    )
+    if fields is None and list_view:
+        fields = (
+            set(PurchaseOrder.__mapper__.column_attrs.keys())  # type: ignore
+            | set(purchase_order_relation_fields)
+        )
+    if fields is None or fields & set(purchase_order_item_fields):
+        return fields, None
+    return fields, get_load_fields(fields, purchase_order_relation_fields)
+
+
+def add_purchase_order_items(
+        order_dict: dict[str, Any],
+        purchase_order: PurchaseOrder,
+        fields: set[str] | None = None,
+    ) -> dict[str, Any]:
+    """
+    Add the requested item listings to a serialized purchase order.
+    """
+    if fields is None or "purchase_order_items" in fields:
+        order_dict["purchase_order_items"] = get_purchase_order_items_dict(
+            purchase_order
+        )
+    if fields is None or "purchase_order_items_summary" in fields:
+        order_dict["purchase_order_items_summary"] = (
+            get_purchase_order_items_str(purchase_order)
+        )
     return order_dict
 
 def get_purchase_order_items_dict(
@@ -41,7 +101,7 @@ def get_purchase_order_items_dict(
     for purchase in purchase_order.purchases:
         purchase_dict = purchase.to_dict()
         purchase_dict["product"] = purchase.product.name
-        purchase.pop("__class__", None)
+        purchase_dict.pop("__class__", None)
         purchases.append(purchase_dict)
     
     return purchases
@@ -86,20 +146,54 @@ def get_all_purchase_orders(page_size: int, page_num: int):
     """
     Get paginated list of all purchase orders.
     """
-    date_time = request.args.get("date_time")
+    fields, load_fields = get_purchase_order_fields(list_view=True)
+    query = validate_query_args(PurchaseOrderListQuery)
 
     purchase_orders = storage.all(
-        PurchaseOrder, page_size=page_size, page_num=page_num, date_time=date_time
+        PurchaseOrder, page_size=page_size, page_num=page_num,
+        **query.storage_args(), fields=load_fields,
     )
     if not purchase_orders:
         abort(404, description="No purchase_order found")
 
     purchase_order_lists: list[dict[str, Any]] = [
-        get_purchase_order_dict(purchase_order) for purchase_order in purchase_orders
+        add_purchase_order_items(
+            get_purchase_order_dict(purchase_order, fields),
+            purchase_order,
+            fields,
+        )
+        for purchase_order in purchase_orders
     ]
     return jsonify(purchase_order_lists), 200
 
 
+@app_views.route("/purchase_orders", strict_slashes=False, methods=["GET"])
+@app_views.route(
+    "/purchase_orders/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+@admin_only
+def get_many_purchase_orders():
+    """
+    Get several purchase orders by id in one call, in request order.
+    Ids come from `?ids=a,b,c` or a JSON body `{"ids": [...]}`.
+    """
+    fields, load_fields = get_purchase_order_fields()
+    purchase_orders, missing = get_many_objs(PurchaseOrder, load_fields)
+    return jsonify({
+        "results": [
+            add_purchase_order_items(
+                get_purchase_order_dict(purchase_order, fields),
+                purchase_order,
+                fields,
+            )
+            for purchase_order in purchase_orders
+        ],
+        "missing": missing,
+    }), 200
+
+
 @app_views.route(
     "purchase_orders/<purchase_order_id>",
     strict_slashes=False,
@@ -110,16 +204,13 @@ def get_purchase_order(purchase_order_id: str):
     """
     Get details of a purchase order by ID.
     """
-    purchase_order = get_obj(PurchaseOrder, purchase_order_id)
+    fields, load_fields = get_purchase_order_fields()
+    purchase_order = get_obj(PurchaseOrder, purchase_order_id, load_fields)
     if not purchase_order:
         abort(404, description="Order does not exist")
 
-    purchase_order_dict = get_purchase_order_dict(purchase_order)
-    purchase_order_dict["purchase_order_items"] = get_purchase_order_items_dict(
-        purchase_order
-    )
-    purchase_order_dict["purchase_order_items_summary"] = get_purchase_order_items_str(
-        purchase_order
+    purchase_order_dict = add_purchase_order_items(
+        get_purchase_order_dict(purchase_order, fields), purchase_order, fields
     )
     return jsonify(purchase_order_dict), 200
 
@@ -4,19 +4,27 @@
 Routes for managing purchase order items.
 """
 
-from flask import abort, jsonify, request
+from flask import abort, jsonify
 from typing import Any
 import logging
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
 from api.v1.utils.request_data_validation import (
+    PurchaseListQuery,
     PurchaseRegister,
     PurchaseUpdate,
+    validate_query_args,
     validate_request_data,
 )
-from api.v1.utils.utility import DatabaseOp, get_obj
-from api.v1.views.stock_levels import add_or_subtract_stock
+from api.v1.utils.sparse_fields import (
+    RelationFields, get_fields_arg, get_load_fields, to_sparse_dict
+)
+from api.v1.utils.utility import DatabaseOp, get_many_objs, get_obj
+from api.v1.views.stock_levels import (
+    add_or_subtract_stock,
+    update_average_unit_cost,
+)
 from models import storage
 from models.product import Product
 from models.purchase_order import PurchaseOrder
@@ -26,16 +34,20 @@ from models.purchase import Purchase
 logger = logging.getLogger(__name__)
 
 
-def get_purchase_dict(item: Purchase) -> dict[str, Any]:
+purchase_relation_fields: RelationFields = {
+    "product": ("product", "name"),
+    "product_quantity_in_stock": ("product", "quantity_in_stock"),
+    "added_by": ("purchase_order", "added_by", "username"),
+}
+
+
+def get_purchase_dict(
+        item: Purchase, fields: set[str] | None = None
+    ) -> dict[str, Any]:
     """
     Return purchase order item data excluding relations.
     """
-    item_dict = item.to_dict()
-    item_dict["product"] = item.product.name
-    item_dict["product_quantity_in_stock"] = item.product.quantity_in_stock
-    item_dict["added_by"] = item.purchase_order.added_by.username
-    item_dict.pop("__class__", None)
-    return item_dict
+    return to_sparse_dict(item, fields, purchase_relation_fields)
 
 
 @app_views.route(
@@ -59,12 +71,16 @@ def add_purchase():
         abort(404, description="Order does not exist")
     
     purchase = Purchase(**valid_data)
+    storage.refresh_order_totals(
+        PurchaseOrder, [purchase.purchase_order_id]
+    )
 
     db = DatabaseOp()
     db.save(purchase)
 
     # add purchase to stock
     if purchase.item_status == "supplied":
+        update_average_unit_cost(purchase, purchase.product)
         add_or_subtract_stock(purchase, purchase.product)
 
     purchase_dict = get_purchase_dict(purchase)
@@ -81,20 +97,47 @@ def get_all_purchases(page_size: int, page_num: int):
     """
     Get paginated list of all purchase order items.
     """
-    date_time = request.args.get("date_time")
+    fields = get_fields_arg(Purchase, purchase_relation_fields)
+    query = validate_query_args(PurchaseListQuery)
 
     purchases = storage.all(
-        Purchase, page_size=page_size, page_num=page_num, date_time=date_time
+        Purchase, page_size=page_size, page_num=page_num,
+        **query.storage_args(),
+        fields=get_load_fields(fields, purchase_relation_fields),
     )
     if not purchases:
         abort(404, description="No purchases found")
 
     purchases_list: list[dict[str, Any]] = [
-        get_purchase_dict(purchase) for purchase in purchases
+        get_purchase_dict(purchase, fields) for purchase in purchases
     ]
     return jsonify(purchases_list), 200
 
 
+@app_views.route("/purchases", strict_slashes=False, methods=["GET"])
+@app_views.route(
+    "/purchases/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+@admin_only
+def get_many_purchases():
+    """
+    Get several purchases by id in one call, in request order.
+    Ids come from `?ids=a,b,c` or a JSON body `{"ids": [...]}`.
+    """
+    fields = get_fields_arg(Purchase, purchase_relation_fields)
+    purchases, missing = get_many_objs(
+        Purchase, get_load_fields(fields, purchase_relation_fields)
+    )
+    return jsonify({
+        "results": [
+            get_purchase_dict(purchase, fields) for purchase in purchases
+        ],
+        "missing": missing,
+    }), 200
+
+
 @app_views.route(
     "/purchases/<purchase_id>",
     strict_slashes=False,
@@ -105,11 +148,15 @@ def get_purchase(purchase_id: str):
     """
     Get a single purchase item by ID.
     """
-    purchase= get_obj(Purchase, purchase_id)
+    fields = get_fields_arg(Purchase, purchase_relation_fields)
+    purchase= get_obj(
+        Purchase, purchase_id,
+        get_load_fields(fields, purchase_relation_fields),
+    )
     if not purchase:
         abort(404, description="Item does not exist.")
 
-    purchase_dict = get_purchase_dict(purchase)
+    purchase_dict = get_purchase_dict(purchase, fields)
     return jsonify(purchase_dict), 200
 
 
@@ -139,14 +186,22 @@ def update_purchase(purchase_id: str):
         if not purchase_order:
             abort(404, description="Order does not exist.")
 
+    was_supplied = purchase.item_status == "supplied"
+    old_purchase_order_id = purchase.purchase_order_id
+
     for attr, value in valid_data.items():
         setattr(purchase, attr, value)
+    storage.refresh_order_totals(
+        PurchaseOrder, [old_purchase_order_id, purchase.purchase_order_id]
+    )
 
     db = DatabaseOp()
     db.save(purchase)
 
     # add purchase to stock
     if purchase.item_status == "supplied":
+        if not was_supplied:
+            update_average_unit_cost(purchase, purchase.product)
         add_or_subtract_stock(purchase, purchase.product)
 
     purchase_dict = get_purchase_dict(purchase)
@@ -169,5 +224,8 @@ def delete_purchase(purchase_id: str):
 
     db = DatabaseOp()
     db.delete(purchase)
+    storage.refresh_order_totals(
+        PurchaseOrder, [purchase.purchase_order_id]
+    )
     db.commit()
     return jsonify({}), 200
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+"""
+Routes for sales reporting.
+"""
+
+from datetime import date, timedelta
+from flask import jsonify
+from typing import Any
+import logging
+import os
+
+from api.v1.auth.authorization import admin_only
+from api.v1.views import app_views
+from api.v1.utils.cache import TTLCache
+from api.v1.utils.request_data_validation import (
+    MarginReportQuery,
+    ProductRankingQuery,
+    SalesReportQuery,
+    validate_query_args,
+)
+from models import storage
+
+
+logger = logging.getLogger(__name__)
+
+ranking_window_days = {"day": 1, "week": 7, "month": 30}
+ranking_cache: TTLCache[list[dict[str, Any]]] = TTLCache(
+    ttl=float(os.getenv("RANKING_CACHE_TTL", 60)), maxsize=256,
+    name="product_ranking",
+)
+
+
+def get_ranking_window(window: str) -> tuple[date, date]:
+    """
+    Returns the half-open [start, end) dates of a window ending today.
+    """
+    end = date.today() + timedelta(days=1)
+    return end - timedelta(days=ranking_window_days[window]), end
+
+
+@app_views.route("/reports/sales", strict_slashes=False, methods=["GET"])
+@admin_only
+def get_sales_report():
+    """
+    Get paid sales totals per day, week or month.
+    Answered from the daily sales rollup, never from the sales table.
+    """
+    query = validate_query_args(SalesReportQuery)
+
+    report = storage.sales_report(
+        query.granularity.value,
+        group_by=[dimension.value for dimension in query.group_by],
+        start_date=query.start_date,
+        end_date=query.end_date,
+    )
+    return jsonify({
+        "granularity": query.granularity.value,
+        "group_by": [dimension.value for dimension in query.group_by],
+        "results": report,
+    }), 200
+
+
+@app_views.route("/reports/margin", strict_slashes=False, methods=["GET"])
+@admin_only
+def get_margin_report():
+    """
+    Get revenue, cost of goods and gross profit per product,
+    brand and/or category, from the costs stamped on each sale.
+    """
+    query = validate_query_args(MarginReportQuery)
+
+    report = storage.sales_report(
+        None,
+        group_by=[dimension.value for dimension in query.group_by],
+        start_date=query.start_date,
+        end_date=query.end_date,
+    )
+    for row in report:
+        row["gross_profit"] = row["revenue"] - row["cost"]
+        row["margin_percent"] = (
+            round(100 * row["gross_profit"] / row["revenue"], 2)
+            if row["revenue"] else None
+        )
+    return jsonify({
+        "group_by": [dimension.value for dimension in query.group_by],
+        "results": report,
+    }), 200
+
+
+@app_views.route(
+    "/reports/top_products",
+    strict_slashes=False,
+    methods=["GET"]
+)
+@admin_only
+def get_top_products():
+    """
+    Get the best selling products in a rolling window,
+    overall or per brand or category.
+    """
+    query = validate_query_args(ProductRankingQuery)
+    start, end = get_ranking_window(query.window.value)
+    partition_by = query.partition_by.value if query.partition_by else None
+
+    cache_key = (
+        "top_products", start, end, query.metric.value,
+        query.limit, partition_by,
+    )
+    products = ranking_cache.get_or_set(
+        cache_key,
+        lambda: storage.top_products(
+            start, end, query.metric.value, query.limit, partition_by
+        ),
+    )
+    return jsonify({
+        "window": query.window.value,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "metric": query.metric.value,
+        "partition_by": partition_by,
+        "results": products,
+    }), 200
+
+
+@app_views.route("/reports/movers", strict_slashes=False, methods=["GET"])
+@admin_only
+def get_product_movers():
+    """
+    Get the products whose sales changed the most against
+    the previous window of the same length.
+    """
+    query = validate_query_args(ProductRankingQuery)
+    start, end = get_ranking_window(query.window.value)
+    previous_start = start - timedelta(
+        days=ranking_window_days[query.window.value]
+    )
+    partition_by = query.partition_by.value if query.partition_by else None
+
+    cache_key = (
+        "movers", start, end, query.metric.value,
+        query.limit, partition_by,
+    )
+    movers = ranking_cache.get_or_set(
+        cache_key,
+        lambda: storage.product_movers(
+            previous_start, start, end,
+            query.metric.value, query.limit, partition_by
+        ),
+    )
+    return jsonify({
+        "window": query.window.value,
+        "previous_start_date": previous_start.isoformat(),
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "metric": query.metric.value,
+        "partition_by": partition_by,
+        "results": movers,
+    }), 200
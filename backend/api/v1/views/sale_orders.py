@@ -4,18 +4,27 @@
 Routes for managing sale orders.
 """
 
-from flask import abort, jsonify, g, request
+from flask import abort, jsonify, g
 from typing import Any
 import logging
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
 from api.v1.utils.request_data_validation import (
+    SaleOrderListQuery,
     SaleOrderRegister,
     SaleOrderUpdate,
+    validate_query_args,
     validate_request_data,
 )
-from api.v1.utils.utility import DatabaseOp, get_obj
+from api.v1.utils.sparse_fields import (
+    LoadFields,
+    RelationFields,
+    get_fields_arg,
+    get_load_fields,
+    to_sparse_dict,
+)
+from api.v1.utils.utility import DatabaseOp, get_many_objs, get_obj
 from models import storage
 from models.sale_order import SaleOrder
 
@@ -23,13 +32,64 @@ from models.sale_order import SaleOrder
 logger = logging.getLogger(__name__)
 
 
-def get_sale_order_dict(sale_order: SaleOrder) -> dict[str, Any]:
+sale_order_relation_fields: RelationFields = {
+    "added_by": ("added_by", "username"),
+}
+sale_order_item_fields = (
+    "sale_order_items", "sale_order_items_summary"
+)
+
+
+def get_sale_order_dict(
+        sale_order: SaleOrder, fields: set[str] | None = None
+    ) -> dict[str, Any]:
     """
     Return a sale order as a dictionary excluding related items.
     """
-    order_dict = sale_order.to_dict()
-    order_dict["added_by"] = sale_order.added_by.username
-    order_dict.pop("__class__", None)
+    return to_sparse_dict(
+        sale_order, fields, sale_order_relation_fields
+    )
+
+
+def get_sale_order_fields(
+        list_view: bool = False,
+    ) -> tuple[set[str] | None, LoadFields | None]:
+    """
+    Parse `?fields=` for sale order reads. Returns the requested
+    fields and what to load; orders with items are loaded in full.
+    List pages default to the order row with its totals, no items.
+    """
+    fields = get_fields_arg(
+        SaleOrder,
+        sale_order_relation_fields,
+        extra=sale_order_item_fields,
+    )
+    if fields is None and list_view:
+        fields = (
+            set(SaleOrder.__mapper__.column_attrs.keys())  # type: ignore
+            | set(sale_order_relation_fields)
+        )
+    if fields is None or fields & set(sale_order_item_fields):
+        return fields, None
+    return fields, get_load_fields(fields, sale_order_relation_fields)
+
+
+def add_sale_order_items(
+        order_dict: dict[str, Any],
+        sale_order: SaleOrder,
+        fields: set[str] | None = None,
+    ) -> dict[str, Any]:
+    """
+    Add the requested item listings to a serialized sale order.
+    """
+    if fields is None or "sale_order_items" in fields:
+        order_dict["sale_order_items"] = get_sale_order_items_dict(
+            sale_order
+        )
+    if fields is None or "sale_order_items_summary" in fields:
+        order_dict["sale_order_items_summary"] = (
+            get_sale_order_items_str(sale_order)
+        )
     return order_dict
 
 def get_sale_order_items_dict(
@@ -41,7 +101,7 @@ def get_sale_order_items_dict(
     for sale in sale_order.sales:
         sale_dict = sale.to_dict()
         sale_dict["product"] = sale.product.name
-        sale.pop("__class__", None)
+        sale_dict.pop("__class__", None)
         sales.append(sale_dict)
     
     return sales
@@ -84,26 +144,50 @@ def get_all_sale_orders(page_size: int, page_num: int):
     """
     Get paginated list of all sale orders.
     """
-    date_time = request.args.get("date_time")
+    fields, load_fields = get_sale_order_fields(list_view=True)
+    query = validate_query_args(SaleOrderListQuery)
 
     sale_orders = storage.all(
-        SaleOrder, page_size=page_size, page_num=page_num, date_time=date_time
+        SaleOrder, page_size=page_size, page_num=page_num,
+        **query.storage_args(), fields=load_fields,
     )
     if not sale_orders:
         abort(404, description="No sale_order found")
 
-    sale_order_lists: list[dict[str, Any]] = []
-    for sale_order in sale_orders:
-        order_dict = get_sale_order_dict(sale_order)
-        order_dict["sale_order_items"] = get_sale_order_items_dict(
-            sale_order)
-        order_dict["sale_order_items_summary"] = get_sale_order_items_str(
-            sale_order)
-        sale_order_lists.append(order_dict)
+    sale_order_lists: list[dict[str, Any]] = [
+        add_sale_order_items(
+            get_sale_order_dict(sale_order, fields), sale_order, fields
+        )
+        for sale_order in sale_orders
+    ]
     
     return jsonify(sale_order_lists), 200
 
 
+@app_views.route("/sale_orders", strict_slashes=False, methods=["GET"])
+@app_views.route(
+    "/sale_orders/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+def get_many_sale_orders():
+    """
+    Get several sale orders by id in one call, in request order.
+    Ids come from `?ids=a,b,c` or a JSON body `{"ids": [...]}`.
+    """
+    fields, load_fields = get_sale_order_fields()
+    sale_orders, missing = get_many_objs(SaleOrder, load_fields)
+    return jsonify({
+        "results": [
+            add_sale_order_items(
+                get_sale_order_dict(sale_order, fields), sale_order, fields
+            )
+            for sale_order in sale_orders
+        ],
+        "missing": missing,
+    }), 200
+
+
 @app_views.route(
     "sale_orders/<sale_order_id>",
     strict_slashes=False,
@@ -113,16 +197,13 @@ def get_sale_order(sale_order_id: str):
     """
     Get details of a sale order by ID.
     """
-    sale_order = get_obj(SaleOrder, sale_order_id)
+    fields, load_fields = get_sale_order_fields()
+    sale_order = get_obj(SaleOrder, sale_order_id, load_fields)
     if not sale_order:
         abort(404, description="Order does not exist")
 
-    sale_order_dict = get_sale_order_dict(sale_order)
-    sale_order_dict["sale_order_items"] = get_sale_order_items_dict(
-        sale_order
-    )
-    sale_order_dict["sale_order_items_summary"] = get_sale_order_items_str(
-        sale_order
+    sale_order_dict = add_sale_order_items(
+        get_sale_order_dict(sale_order, fields), sale_order, fields
     )
     return jsonify(sale_order_dict), 200
 
@@ -4,19 +4,26 @@
 Handles CRUD operations for sales via API routes.
 """
 
-from flask import abort, jsonify, g, request
+from collections import Counter
+from flask import abort, jsonify, g
 from typing import Any
 import logging
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
 from api.v1.utils.request_data_validation import (
+    SaleListQuery,
     SaleRegister,
     SaleUpdate,
+    validate_query_args,
     validate_request_data,
+    validate_request_list,
 )
-from api.v1.utils.utility import DatabaseOp, get_obj
-from api.v1.views.stock_levels import add_or_subtract_stock
+from api.v1.utils.sparse_fields import (
+    RelationFields, get_fields_arg, get_load_fields, to_sparse_dict
+)
+from api.v1.utils.utility import DatabaseOp, get_many_objs, get_obj
+from api.v1.views.stock_levels import add_or_subtract_stock, move_stock
 from models import storage
 from models.product import Product
 from models.sale import Sale
@@ -26,18 +33,76 @@ from models.sale_order import SaleOrder
 logger = logging.getLogger(__name__)
 
 
-def get_sale_dict(sale: Sale) -> dict[str, Any]:
+sale_relation_fields: RelationFields = {
+    "product_name": ("product", "name"),
+    "product_quantity_in_stock": ("product", "quantity_in_stock"),
+    "added_by": ("added_by", "username"),
+}
+
+
+def get_sale_dict(
+        sale: Sale, fields: set[str] | None = None
+    ) -> dict[str, Any]:
     """
     Returns a serialized dictionary for a sale with readable fields.
     """
-    sale_dict = sale.to_dict()
-    sale_dict["product_name"] = getattr(sale.product, "name", None)
-    sale_dict["product_quantity_in_stock"] = getattr(
-        sale.product, "quantity_in_stock", None
-    )
-    sale_dict["added_by"] = getattr(sale.added_by, "username")
-    sale_dict.pop("__class__", None)
-    return sale_dict
+    return to_sparse_dict(sale, fields, sale_relation_fields)
+
+
+def stamp_cost_of_goods(sale: Sale, product: Product | None) -> None:
+    """
+    Records the product's current average unit cost on the sale,
+    so margins never need the purchase history.
+    """
+    if sale.unit_cost is None and product:
+        sale.unit_cost = (
+            product.average_unit_cost or product.unit_cost_price or 0
+        )
+    sale.cost_of_goods = (sale.unit_cost or 0) * sale.quantity
+
+
+def stamp_product_dimensions(sale: Sale, product: Product | None) -> None:
+    """
+    Records the product's brand and category on the sale, so that its
+    rollup row stays put when the product is later re-categorised.
+    """
+    sale.brand_id = getattr(product, "brand_id", None)
+    sale.category_id = getattr(product, "category_id", None)
+
+
+def get_sale_rollup_row(sale: Sale) -> dict[str, Any] | None:
+    """
+    Returns the daily rollup contribution of a sale.
+    Only paid sales are counted.
+    """
+    if sale.payment_status != "paid":
+        return None
+
+    return {
+        "sale_date": sale.created_at.date(),
+        "product_id": sale.product_id,
+        "brand_id": sale.brand_id,
+        "category_id": sale.category_id,
+        "employee_id": sale.employee_id,
+        "quantity": sale.quantity,
+        "revenue": sale.total_selling_price,
+        "cost": sale.cost_of_goods or 0,
+    }
+
+
+def update_sale_rollup(
+        old_row: dict[str, Any] | None, new_row: dict[str, Any] | None
+    ) -> None:
+    """
+    Moves a sale's contribution in the daily rollup from old_row to new_row.
+    Must run before the sale is saved so both commit together.
+    """
+    if old_row == new_row:
+        return
+    if old_row:
+        storage.update_sales_rollup(old_row, sign=-1)
+    if new_row:
+        storage.update_sales_rollup(new_row, sign=1)
 
 
 @app_views.route("/sales", strict_slashes=False, methods=["POST"])
@@ -59,6 +124,11 @@ def add_sale_item():
 
     valid_data["employee_id"] = admin.id
     sale = Sale(**valid_data)
+    stamp_product_dimensions(sale, product)
+    stamp_cost_of_goods(sale, product)
+    update_sale_rollup(None, get_sale_rollup_row(sale))
+    storage.refresh_order_totals(SaleOrder, [sale.sale_order_id])
+
     db = DatabaseOp()
     db.save(sale)
 
@@ -70,6 +140,64 @@ def add_sale_item():
     return jsonify(sale_dict), 201
 
 
+@app_views.route("/sales/bulk", strict_slashes=False, methods=["POST"])
+def add_sale_items():
+    """
+    Creates several sale records, e.g. a whole basket, from a JSON
+    array. Products and orders are loaded in one query each, and
+    stock is checked for every paid line before anything is saved.
+    """
+    admin = g.current_employee
+    items = validate_request_list(SaleRegister)
+
+    product_ids = list({item["product_id"] for item in items})
+    products = {
+        product.id: product
+        for product in storage.get_many(Product, product_ids) if product
+    }
+    order_ids = list({item["sale_order_id"] for item in items})
+    sale_orders = {
+        order.id for order in storage.get_many(SaleOrder, order_ids) if order
+    }
+    for position, item in enumerate(items):
+        if item["product_id"] not in products:
+            abort(404, description=f"Item {position}: Product does not exist.")
+        if item["sale_order_id"] not in sale_orders:
+            abort(404, description=f"Item {position}: Sale order does not exist.")
+
+    paid_quantities: Counter[str] = Counter()
+    for item in items:
+        if item.get("payment_status") == "paid":
+            paid_quantities[item["product_id"]] += item["quantity"]
+    for product_id, quantity in paid_quantities.items():
+        stock = storage.get_stock_obj(product_id)
+        if not stock or stock.quantity_in_stock < quantity:
+            abort(
+                400,
+                description="Not enough stock available for "
+                f"{products[product_id].name}."
+            )
+
+    sales: list[Sale] = []
+    for item in items:
+        item["employee_id"] = admin.id
+        sale = Sale(**item)
+        product = products[sale.product_id]
+        stamp_product_dimensions(sale, product)
+        stamp_cost_of_goods(sale, product)
+        update_sale_rollup(None, get_sale_rollup_row(sale))
+        if sale.payment_status == "paid":
+            move_stock(sale, product)
+        sales.append(sale)
+    storage.refresh_order_totals(SaleOrder, order_ids)
+
+    # the sales, stock moves, rollup and order totals commit together
+    db = DatabaseOp()
+    db.commit()
+
+    return jsonify([get_sale_dict(sale) for sale in sales]), 201
+
+
 @app_views.route(
     "/sales/<int:page_size>/<int:page_num>",
     strict_slashes=False,
@@ -79,21 +207,47 @@ def get_all_sales(page_size: int, page_num: int):
     """
     Retrieves all sales with pagination.
     """
-    date_time = request.args.get("date_time")
+    fields = get_fields_arg(Sale, sale_relation_fields)
+    query = validate_query_args(SaleListQuery)
 
     sales = storage.all(
-        Sale, page_size=page_size, page_num=page_num, date_time=date_time
+        Sale, page_size=page_size, page_num=page_num, **query.storage_args(),
+        fields=get_load_fields(fields, sale_relation_fields),
     )
     if not sales:
         abort(404, description="No sales found")
 
     sales_list: list[dict[str, Any]] = [
-        get_sale_dict(sale) for sale in sales
+        get_sale_dict(sale, fields) for sale in sales
     ]
 
     return jsonify(sales_list), 200
 
 
+@app_views.route("/sales", strict_slashes=False, methods=["GET"])
+@app_views.route(
+    "/sales/batch_get",
+    strict_slashes=False,
+    methods=["POST"]
+)
+@admin_only
+def get_many_sales():
+    """
+    Get several sales by id in one call, in request order.
+    Ids come from `?ids=a,b,c` or a JSON body `{"ids": [...]}`.
+    """
+    fields = get_fields_arg(Sale, sale_relation_fields)
+    sales, missing = get_many_objs(
+        Sale, get_load_fields(fields, sale_relation_fields)
+    )
+    return jsonify({
+        "results": [
+            get_sale_dict(sale, fields) for sale in sales
+        ],
+        "missing": missing,
+    }), 200
+
+
 @app_views.route(
         "sales/<sale_id>",
         strict_slashes=False,
@@ -104,11 +258,14 @@ def get_sale_item(sale_id: str):
     """
     Retrieves a single sale record by ID.
     """
-    sale = get_obj(Sale, sale_id)
+    fields = get_fields_arg(Sale, sale_relation_fields)
+    sale = get_obj(
+        Sale, sale_id, get_load_fields(fields, sale_relation_fields)
+    )
     if not sale:
         abort(404, description="Item does not exist")
 
-    sale_dict = get_sale_dict(sale)
+    sale_dict = get_sale_dict(sale, fields)
     return jsonify(sale_dict), 200
 
 
@@ -130,7 +287,7 @@ def update_sale_item(sale_id: str):
             abort(404, description="Product does not exist.")
     
     if "sale_order_id" in valid_data:
-        sale_order = get_obj(Product, valid_data["sale_order_id"])
+        sale_order = get_obj(SaleOrder, valid_data["sale_order_id"])
         if not sale_order:
             abort(404, description="Sale order does not exist.")
 
@@ -138,9 +295,22 @@ def update_sale_item(sale_id: str):
     if not sale:
         abort(404, description="Item does not exist")
 
+    old_rollup_row = get_sale_rollup_row(sale)
+    old_sale_order_id = sale.sale_order_id
+
     for attr, value in valid_data.items():
         setattr(sale, attr, value)
 
+    new_product = product if "product_id" in valid_data else sale.product
+    if "product_id" in valid_data:
+        sale.unit_cost = None
+        stamp_product_dimensions(sale, new_product)
+    stamp_cost_of_goods(sale, new_product)
+    update_sale_rollup(old_rollup_row, get_sale_rollup_row(sale))
+    storage.refresh_order_totals(
+        SaleOrder, [old_sale_order_id, sale.sale_order_id]
+    )
+
     db = DatabaseOp()
     db.save(sale)
 
@@ -166,7 +336,10 @@ def delete_sale_item(sale_id: str):
     if not sale:
         abort(404, description="Item does not exist")
 
+    update_sale_rollup(get_sale_rollup_row(sale), None)
+
     db = DatabaseOp()
     db.delete(sale)
+    storage.refresh_order_totals(SaleOrder, [sale.sale_order_id])
     db.commit()
     return jsonify({}), 200
@@ -6,7 +6,7 @@ Handles employee login and logout using session authentication.
 
 
 from dotenv import load_dotenv
-from flask import abort, jsonify
+from flask import abort, g, jsonify
 import logging
 import os
 
@@ -65,3 +65,57 @@ def logout():
     if not auth.destroy_session():
         abort(404)
     return jsonify({}), 200
+
+
+def get_device_auth():
+    """
+    Returns the session auth, refusing device management in token
+    mode where sessions are not stored.
+    """
+    from api.v1.app import auth
+
+    if auth.tokens:
+        abort(404, description="Devices are not tracked in token auth mode")
+    return auth
+
+
+@app_views.route(
+        "/auth_session/devices",
+        strict_slashes=False,
+        methods=["GET"]
+    )
+def get_devices():
+    """
+    Lists the current employee's active sessions.
+    """
+    auth = get_device_auth()
+    return jsonify(auth.get_devices(g.current_employee)), 200
+
+
+@app_views.route(
+        "/auth_session/devices",
+        strict_slashes=False,
+        methods=["DELETE"]
+    )
+def delete_other_devices():
+    """
+    Logs the current employee out of every other device.
+    """
+    auth = get_device_auth()
+    ended = auth.destroy_devices(g.current_employee)
+    return jsonify({"ended": ended}), 200
+
+
+@app_views.route(
+        "/auth_session/devices/<device_id>",
+        strict_slashes=False,
+        methods=["DELETE"]
+    )
+def delete_device(device_id: str):
+    """
+    Logs the current employee out of one device.
+    """
+    auth = get_device_auth()
+    if not auth.destroy_devices(g.current_employee, device_id):
+        abort(404, description="Device not found")
+    return jsonify({}), 200
@@ -3,16 +3,22 @@
 """
 """
 
+from datetime import datetime
 from flask import abort, jsonify, request
 from typing import Any
 import logging
 
 from api.v1.auth.authorization import admin_only
 from api.v1.views import app_views
+from api.v1.utils.conditional import make_etag, not_modified, with_etag
 from api.v1.utils.request_data_validation import (
     StockLevelUpdate,
     validate_request_data,
 )
+from api.v1.utils.sparse_fields import (
+    RelationFields, get_fields_arg, get_load_fields, to_sparse_dict
+)
+from api.v1.utils.product_index import product_index
 from api.v1.utils.utility import DatabaseOp, get_obj
 from models import storage
 from models.product import Product
@@ -24,22 +30,52 @@ from models.stock_level import StockLevel
 logger = logging.getLogger(__name__)
 
 
-def get_stock_level_dict(stock: StockLevel) -> dict[str, Any]:
+stock_level_relation_fields: RelationFields = {
+    "product_name": ("product", "name"),
+}
+
+
+def get_stock_level_dict(
+        stock: StockLevel, fields: set[str] | None = None
+    ) -> dict[str, Any]:
+    """
+    Converts a StockLevel object to a dictionary with the product name.
+    """
+    return to_sparse_dict(stock, fields, stock_level_relation_fields)
+
+
+def update_average_unit_cost(purchase: Purchase, product: Product) -> None:
     """
+    Folds a newly supplied purchase into the product's moving
+    weighted-average unit cost. Must run before the stock is added.
     """
-    stock_dict = stock.to_dict()
-    if stock.product:
-        logger.debug(f"stock product: {stock.product}")
-        stock_dict["product_name"] = stock.product.name
-    stock_dict.pop("__class__", None)
+    on_hand = max(product.quantity_in_stock or 0, 0)
+    if on_hand + purchase.quantity <= 0:
+        return
+    current_cost = product.average_unit_cost or product.unit_cost_price or 0
 
-    return stock_dict
+    product.average_unit_cost = (
+        on_hand * current_cost + purchase.quantity * purchase.unit_cost_price
+    ) / (on_hand + purchase.quantity)
 
 
 def add_or_subtract_stock(obj: Purchase | Sale, product: Product) -> None:
     """
     Automatically updates stock levels after a purchase or sale.
     """
+    stock = move_stock(obj, product)
+
+    db = DatabaseOp()
+    db.save(stock)
+    db.save(product)
+
+
+def move_stock(obj: Purchase | Sale, product: Product) -> StockLevel:
+    """
+    Applies a purchase or sale to the product's stock level in the
+    session without committing, so that callers can save several
+    together. Aborts with 400 if a sale exceeds the stock.
+    """
     if obj.quantity <= 0:
         abort(400, description="Quantity must be greater than 0.")
 
@@ -60,11 +96,15 @@ def add_or_subtract_stock(obj: Purchase | Sale, product: Product) -> None:
             product_id=product.id, quantity_in_stock=obj.quantity
         )
 
-    db = DatabaseOp()
+    if isinstance(obj, Purchase):
+        product.last_received_at = datetime.now()
+    elif not product.last_sold_at or obj.created_at > product.last_sold_at:
+        product.last_sold_at = obj.created_at
 
     product.quantity_in_stock = stock.quantity_in_stock
-    db.save(stock)
-    db.save(product)
+    stock.last_updated = product.last_updated = datetime.now()
+    product_index.mark_stale()
+    return stock
 
 
 @app_views.route(
@@ -74,12 +114,24 @@ def add_or_subtract_stock(obj: Purchase | Sale, product: Product) -> None:
 @admin_only
 def get_stock_level(stock_level_id: str):
     """
+    Retrieves a single stock level by ID.
     """
-    stock = get_obj(StockLevel, stock_level_id)
+    fields = get_fields_arg(StockLevel, stock_level_relation_fields)
+    stock = get_obj(
+        StockLevel, stock_level_id,
+        get_load_fields(fields, stock_level_relation_fields),
+    )
     if not stock:
         abort(404, description="No stock found")
-    
-    return jsonify(get_stock_level_dict(stock)), 200
+
+    etag = make_etag(
+        stock.id, stock.last_updated, storage.last_modified(Product)
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    return with_etag(jsonify(get_stock_level_dict(stock, fields)), etag), 200
 
 
 @app_views.route(
@@ -90,19 +142,29 @@ def get_stock_level(stock_level_id: str):
 @admin_only
 def get_all_current_stock(page_size: int, page_num: int):
     """
+    Retrieves all stock levels with pagination.
     """
+    fields = get_fields_arg(StockLevel, stock_level_relation_fields)
+
+    etag = make_etag(storage.last_modified(StockLevel, Product))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     date_time = request.args.get("date_time")
 
     stock_levels = storage.all(
-        StockLevel, page_size=page_size, page_num=page_num, date_time=date_time
+        StockLevel, page_size=page_size, page_num=page_num,
+        date_time=date_time,
+        fields=get_load_fields(fields, stock_level_relation_fields),
     )
     if not stock_levels:
         abort(404, description="No stock found")
     
     all_stocks: list[dict[str, Any]] = [
-        get_stock_level_dict(stock) for stock in stock_levels
+        get_stock_level_dict(stock, fields) for stock in stock_levels
     ]
-    return jsonify(all_stocks), 200
+    return with_etag(jsonify(all_stocks), etag), 200
 
 
 @app_views.route(
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""
+Shared helpers for the benchmark scripts.
+"""
+
+from flask.testing import FlaskClient
+from statistics import median
+from typing import Any, Callable
+import os
+import time
+
+
+LIST_ENDPOINTS = [
+    "/api/v1/products",
+    "/api/v1/brands",
+    "/api/v1/categories",
+    "/api/v1/stock_levels",
+    "/api/v1/sales",
+    "/api/v1/purchases",
+    "/api/v1/sale_orders",
+    "/api/v1/purchase_orders",
+]
+
+
+def time_ms(func: Callable[[], Any], runs: int) -> float:
+    """
+    Returns the median run time of func in milliseconds.
+    """
+    timings: list[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings)
+
+
+def login(client: FlaskClient) -> None:
+    """
+    Logs the test client in with BENCH_USERNAME and BENCH_PASSWORD.
+    """
+    response = client.post(
+        "/api/v1/auth_session/login",
+        json={
+            "email_or_username": os.environ["BENCH_USERNAME"],
+            "password": os.environ["BENCH_PASSWORD"],
+        },
+    )
+    if response.status_code not in (200, 201):
+        raise SystemExit(f"Login failed: {response.status_code}")
+
+    session_cookie = response.headers.get("Set-Cookie", "")
+    cookie_name, session_id = session_cookie.split(";", 1)[0].split("=", 1)
+    client.set_cookie(cookie_name, session_id)
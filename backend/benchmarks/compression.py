@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Measures wire size and latency of the list endpoints with and
+without response compression.
+
+Usage (from backend/, against a populated database):
+    BENCH_USERNAME=admin BENCH_PASSWORD=secret \
+        python -m benchmarks.compression --runs 50
+"""
+
+from statistics import median
+import argparse
+import time
+
+from api.v1.app import create_app
+from benchmarks import LIST_ENDPOINTS, login
+
+
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    client = create_app().test_client()
+    login(client)
+
+    print(f"{'endpoint':<34}{'encoding':<10}{'bytes':>10}{'ratio':>8}{'p50 ms':>10}")
+    for endpoint in LIST_ENDPOINTS:
+        endpoint = f"{endpoint}/100/1"
+        identity_size = 0
+        for encoding in ENCODINGS:
+            timings: list[float] = []
+            size = 0
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                response = client.get(
+                    endpoint, headers={"Accept-Encoding": encoding}
+                )
+                size = len(response.get_data())
+                timings.append((time.perf_counter() - start) * 1000)
+
+            if response.status_code != 200:
+                print(f"{endpoint:<34}{'-':<10}status {response.status_code}")
+                break
+            if response.headers.get("Content-Encoding", "identity") != encoding:
+                continue  # encoding not available on this server
+            identity_size = identity_size or size
+            print(
+                f"{endpoint:<34}{encoding:<10}{size:>10}"
+                f"{identity_size / size:>8.1f}{median(timings):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
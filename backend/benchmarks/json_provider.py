@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+Compares the stdlib and fast JSON providers on a synthetic 500-row
+page and on the list endpoints.
+
+Usage (from backend/, against a populated database):
+    BENCH_USERNAME=admin BENCH_PASSWORD=secret \
+        python -m benchmarks.json_provider --runs 20
+"""
+
+from datetime import datetime
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+from typing import Any
+import argparse
+
+from api.v1.app import create_app
+from api.v1.utils.json_provider import FastJSONProvider
+from benchmarks import LIST_ENDPOINTS, login, time_ms
+from models.sale import SalePaymentStatus
+
+
+PAGE_SIZE = 500
+
+
+def synthetic_page() -> list[dict[str, Any]]:
+    """
+    Returns rows shaped like serialized sales.
+    """
+    now = datetime.now()
+    return [
+        {
+            "id": f"{i:036d}",
+            "created_at": now,
+            "last_updated": now,
+            "product_id": f"{i:036d}",
+            "product_name": f"paracetamol {i} 500mg",
+            "quantity": i % 7 + 1,
+            "unit_selling_price": 350.0,
+            "total_selling_price": 350.0 * (i % 7 + 1),
+            "payment_status": SalePaymentStatus.paid,
+        }
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    providers: dict[str, type[JSONProvider]] = {
+        "stdlib": DefaultJSONProvider,
+        "fast": FastJSONProvider,
+    }
+
+    page = synthetic_page()
+    print(f"encode {PAGE_SIZE} rows (ms, p50)")
+    for name, provider_cls in providers.items():
+        app = Flask(__name__)
+        provider = provider_cls(app)
+        with app.app_context():
+            elapsed = time_ms(lambda: provider.response(page), args.runs)
+        print(f"  {name:<8}{elapsed:>10.2f}")
+
+    print(f"\nlist endpoints, {PAGE_SIZE} rows per page (ms, p50)")
+    for name, provider_cls in providers.items():
+        app = create_app()
+        app.json = provider_cls(app)
+        client = app.test_client()
+        login(client)
+        for endpoint in LIST_ENDPOINTS:
+            url = f"{endpoint}/{PAGE_SIZE}/1"
+            elapsed = time_ms(lambda: client.get(url), args.runs)
+            print(f"  {name:<8}{url:<40}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+
+"""
+Replays a pharmacy's traffic against a running instance and reports
+throughput and p50/p95/p99 latency per route.
+
+Each simulated employee logs in, then runs scenarios drawn by weight
+from MIX: barcode scans, product searches, sale checkouts, dashboard
+polls and purchase receipts. Every HTTP call is timed under its route
+template. Scenarios, products and quantities are drawn from --seed,
+so runs with the same arguments send the same sequence of requests.
+
+The first run registers the employees and a catalog of products with
+stock; later runs reuse them and top the stock back up.
+
+Usage (from backend/, with the API running):
+    python -m benchmarks.load_test --base-url http://127.0.0.1:5000 \
+        --employees 8 --duration 60 --output load.json
+    python -m benchmarks.load_test --employees 8 --duration 60 \
+        --compare load.json
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+
+API = "/api/v1"
+PREFIX = "loadtest"
+PASSWORD = "Loadtest1234"
+SEED_STOCK = 10000
+DRUGS = [
+    "amoxicillin", "artemether", "ciprofloxacin", "diclofenac",
+    "ibuprofen", "loratadine", "metformin", "metronidazole",
+    "omeprazole", "paracetamol", "vitamin c", "zinc",
+]
+# scenario weights: mostly till traffic, some back-office
+MIX = {
+    "scan": 40,
+    "search": 25,
+    "checkout": 20,
+    "dashboard": 10,
+    "receipt": 5,
+}
+
+Samples = dict[str, list[tuple[float, int]]]
+
+
+class SimulatedEmployee:
+    """
+    One logged-in employee running scenarios on its own connection.
+    """
+
+    def __init__(
+            self, base_url: str, index: int, catalog: list[dict[str, Any]],
+            seed: int, think_ms: float
+        ) -> None:
+        """Initialize the employee with its own random stream."""
+        self.base_url = base_url
+        self.username = f"{PREFIX}{index:03d}"
+        self.catalog = catalog
+        self.rng = random.Random(seed * 1000 + index)
+        self.think = think_ms / 1000
+        self.http = requests.Session()
+        self.samples: Samples = defaultdict(list)
+        self.scenarios: dict[str, Callable[[], None]] = {
+            "scan": self.scan,
+            "search": self.search,
+            "checkout": self.checkout,
+            "dashboard": self.dashboard,
+            "receipt": self.receipt,
+        }
+
+    def call(
+            self, route: str, path: str, **kwargs: Any
+        ) -> requests.Response | None:
+        """
+        Send a request and record its latency under route, e.g.
+        "GET /products/barcode/<barcode>". Returns None when the
+        connection failed.
+        """
+        method = route.split(" ", 1)[0]
+        start = time.perf_counter()
+        try:
+            response = self.http.request(
+                method, f"{self.base_url}{API}{path}", timeout=30, **kwargs
+            )
+        except requests.RequestException:
+            response = None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        status = response.status_code if response is not None else 0
+        self.samples[route].append((elapsed_ms, status))
+        return response
+
+    def login(self) -> None:
+        """
+        Log in, waiting out 503s while the hashing pool is busy.
+        """
+        for _ in range(30):
+            response = self.http.post(
+                f"{self.base_url}{API}/auth_session/login",
+                json={
+                    "email_or_username": self.username, "password": PASSWORD,
+                },
+                timeout=30,
+            )
+            if response.status_code in (429, 503):
+                time.sleep(float(response.headers.get("Retry-After", 1)))
+                continue
+            if response.status_code != 201:
+                raise SystemExit(
+                    f"Login failed for {self.username}: "
+                    f"{response.status_code} {response.text}"
+                )
+            # the cookie is marked Secure; send it over plain http too
+            for cookie in response.cookies:
+                self.http.cookies.set(cookie.name, cookie.value)
+            return
+        raise SystemExit(f"Login kept failing for {self.username}")
+
+    def product(self) -> dict[str, Any]:
+        """Pick a product, favouring the first (best selling) ones."""
+        index = min(int(self.rng.expovariate(8 / len(self.catalog))),
+                    len(self.catalog) - 1)
+        return self.catalog[index]
+
+    def scan(self) -> None:
+        """A till scans one barcode."""
+        self.call(
+            "GET /products/barcode/<barcode>",
+            f"/products/barcode/{self.product()['barcode']}",
+        )
+
+    def search(self) -> None:
+        """A customer asks for a drug by name, typed a key at a time."""
+        drug = self.rng.choice(DRUGS)
+        for length in range(2, self.rng.randint(3, 6)):
+            self.call(
+                "GET /products/suggest",
+                "/products/suggest",
+                params={"q": drug[:length], "limit": 10},
+            )
+
+    def checkout(self) -> None:
+        """Ring up a paid basket of one to five products."""
+        response = self.call("POST /sale_orders", "/sale_orders", json={})
+        if response is None or response.status_code != 201:
+            return
+        sale_order_id = response.json()["id"]
+
+        items: list[dict[str, Any]] = []
+        basket = self.rng.randint(1, min(5, len(self.catalog)))
+        for product in self.rng.sample(self.catalog[:50], basket):
+            quantity = self.rng.randint(1, 3)
+            items.append({
+                "sale_order_id": sale_order_id,
+                "product_id": product["id"],
+                "quantity": quantity,
+                "unit_selling_price": product["unit_selling_price"],
+                "total_selling_price": (
+                    quantity * product["unit_selling_price"]
+                ),
+                "payment_status": "paid",
+            })
+        self.call("POST /sales/bulk", "/sales/bulk", json=items)
+        self.call(
+            "PUT /sale_orders/<sale_order_id>",
+            f"/sale_orders/{sale_order_id}",
+            json={"status": "complete"},
+        )
+
+    def dashboard(self) -> None:
+        """The manager's screen refreshes."""
+        self.call("GET /dashboard/summary", "/dashboard/summary")
+
+    def receipt(self) -> None:
+        """Receive a supplier delivery of one product."""
+        response = self.call(
+            "POST /purchase_orders",
+            "/purchase_orders",
+            json={"ordering_cost": 500},
+        )
+        if response is None or response.status_code != 201:
+            return
+        purchase_order_id = response.json()["id"]
+
+        product = self.product()
+        quantity = self.rng.randint(10, 100)
+        self.call("POST /purchases", "/purchases", json=get_purchase(
+            purchase_order_id, product, quantity
+        ))
+        self.call(
+            "PUT /purchase_orders/<purchase_order_id>",
+            f"/purchase_orders/{purchase_order_id}",
+            json={"status": "complete"},
+        )
+
+    def run(self, stop: threading.Event, iterations: int | None) -> None:
+        """
+        Run weighted scenarios until stop is set, or iterations times.
+        """
+        names = list(MIX)
+        weights = list(MIX.values())
+        done = 0
+        while not stop.is_set() and (iterations is None or done < iterations):
+            self.scenarios[self.rng.choices(names, weights)[0]]()
+            done += 1
+            if self.think:
+                time.sleep(self.rng.expovariate(1 / self.think))
+
+
+def get_cost_price(product: dict[str, Any]) -> int:
+    """The catalog buys at roughly 70% of the selling price."""
+    return max(1, int(product["unit_selling_price"] * 0.7))
+
+
+def get_purchase(
+        purchase_order_id: str, product: dict[str, Any], quantity: int
+    ) -> dict[str, Any]:
+    """
+    Returns a paid, supplied purchase line for a product.
+    """
+    return {
+        "purchase_order_id": purchase_order_id,
+        "product_id": product["id"],
+        "quantity": quantity,
+        "unit_cost_price": get_cost_price(product),
+        "total_cost_price": quantity * get_cost_price(product),
+        "payment_status": "paid",
+        "item_status": "supplied",
+    }
+
+
+def register_employees(base_url: str, count: int) -> None:
+    """
+    Registers the simulated employees; existing ones are kept.
+    """
+    for index in range(count):
+        username = f"{PREFIX}{index:03d}"
+        response = requests.post(f"{base_url}{API}/register", json={
+            "first_name": "Load",
+            "last_name": f"Tester{index:03d}",
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": PASSWORD,
+            "home_address": "No. 1 benchmark road",
+            "role": "manager",
+            "is_admin": True,
+        }, timeout=60)
+        if response.status_code not in (201, 409):
+            raise SystemExit(
+                f"Registering {username} failed: "
+                f"{response.status_code} {response.text}"
+            )
+
+
+def find_or_create(admin: SimulatedEmployee, resource: str, name: str) -> str:
+    """
+    Returns the id of the brand or category called name, creating it
+    if needed.
+    """
+    response = admin.http.post(
+        f"{admin.base_url}{API}/{resource}", json={"name": name}, timeout=30
+    )
+    if response.status_code == 201:
+        return response.json()["id"]
+
+    page = 1
+    while True:
+        response = admin.http.get(
+            f"{admin.base_url}{API}/{resource}/200/{page}", timeout=30
+        )
+        if response.status_code != 200:
+            raise SystemExit(f"Could not find or create {resource} {name}")
+        for record in response.json():
+            if record["name"] == name:
+                return record["id"]
+        page += 1
+
+
+def lookup_catalog(
+        admin: SimulatedEmployee, barcodes: list[str]
+    ) -> tuple[list[dict[str, Any]], list[str]]:
+    """
+    Returns the catalog products found by barcode, and those missing.
+    """
+    results: list[dict[str, Any]] = []
+    missing: list[str] = []
+    for start in range(0, len(barcodes), 100):
+        response = admin.http.post(
+            f"{admin.base_url}{API}/products/barcode/batch_get",
+            json={"barcodes": barcodes[start:start + 100]},
+            timeout=30,
+        )
+        response.raise_for_status()
+        results.extend(response.json()["results"])
+        missing.extend(response.json()["missing"])
+    return results, missing
+
+
+def seed_catalog(admin: SimulatedEmployee, size: int) -> list[dict[str, Any]]:
+    """
+    Creates any missing catalog products and tops every product's
+    stock up to SEED_STOCK. Returns the catalog in barcode order.
+    """
+    barcodes = [f"99{index:011d}" for index in range(size)]
+    _, missing = lookup_catalog(admin, barcodes)
+
+    if missing:
+        brand_id = find_or_create(admin, "brands", f"{PREFIX} brand")
+        category_id = find_or_create(
+            admin, "categories", f"{PREFIX} category"
+        )
+        for barcode in missing:
+            index = int(barcode[2:])
+            price = 100 + (index * 37) % 2000
+            drug = DRUGS[index % len(DRUGS)].title()
+            strength = (100, 250, 500)[index % 3]
+            product = {
+                "barcode": barcode,
+                "name": f"{drug} {strength}mg ({PREFIX} {index:04d})",
+                "brand_id": brand_id,
+                "category_id": category_id,
+                "unit_cost_price": int(price * 0.7),
+                "unit_selling_price": price,
+            }
+            response = admin.http.post(
+                f"{admin.base_url}{API}/products", json=product, timeout=30
+            )
+            if response.status_code != 201:
+                raise SystemExit(
+                    f"Creating product {barcode} failed: "
+                    f"{response.status_code} {response.text}"
+                )
+
+    for _ in range(50):  # the product index picks new rows up shortly
+        catalog, missing = lookup_catalog(admin, barcodes)
+        if not missing:
+            break
+        time.sleep(0.2)
+    else:
+        raise SystemExit(f"{len(missing)} catalog products never appeared")
+
+    low_stock = [
+        product for product in catalog
+        if (product["quantity_in_stock"] or 0) < SEED_STOCK
+    ]
+    if low_stock:
+        response = admin.http.post(
+            f"{admin.base_url}{API}/purchase_orders",
+            json={"ordering_cost": 500},
+            timeout=30,
+        )
+        response.raise_for_status()
+        purchase_order_id = response.json()["id"]
+        for product in low_stock:
+            quantity = SEED_STOCK - (product["quantity_in_stock"] or 0)
+            admin.http.post(
+                f"{admin.base_url}{API}/purchases",
+                json=get_purchase(purchase_order_id, product, quantity),
+                timeout=30,
+            ).raise_for_status()
+
+    catalog.sort(key=lambda product: product["barcode"])
+    return catalog
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(
+        samples: list[tuple[float, int]], seconds: float
+    ) -> dict[str, Any]:
+    """
+    Returns the count, throughput, error count and latency
+    percentiles of a route's samples.
+    """
+    timings = sorted(elapsed_ms for elapsed_ms, _ in samples)
+    statuses = Counter(str(status) for _, status in samples)
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / seconds, 2),
+        "errors": sum(
+            count for status, count in statuses.items()
+            if status == "0" or int(status) >= 400
+        ),
+        "statuses": dict(sorted(statuses.items())),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "max_ms": round(timings[-1], 2),
+    }
+
+
+def get_commit() -> str | None:
+    """Returns the checked out commit, if this is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(
+        report: dict[str, Any], baseline: dict[str, Any] | None
+    ) -> None:
+    """
+    Prints the per-route table, with p95 changes against a baseline.
+    """
+    print(
+        f"{'route':<44}{'reqs':>7}{'rps':>8}{'err':>5}"
+        f"{'p50':>9}{'p95':>9}{'p99':>9}"
+        + (f"{'p95 vs base':>13}" if baseline else ""),
+        file=sys.stderr,
+    )
+    rows = {**report["routes"], "all": report["total"]}
+    for route, stats in rows.items():
+        line = (
+            f"{route:<44}{stats['requests']:>7}{stats['throughput_rps']:>8.1f}"
+            f"{stats['errors']:>5}{stats['p50_ms']:>9.1f}"
+            f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+        )
+        if baseline:
+            base = (
+                baseline["total"] if route == "all"
+                else baseline["routes"].get(route)
+            )
+            if base:
+                change = (stats["p95_ms"] / base["p95_ms"] - 1) * 100
+                line += f"{change:>+12.0f}%"
+        print(line, file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--base-url",
+        default=os.getenv("LOAD_TEST_URL", "http://127.0.0.1:5000"),
+    )
+    parser.add_argument("--employees", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30,
+                        help="seconds to run for")
+    parser.add_argument("--iterations", type=int,
+                        help="scenarios per employee, instead of --duration")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="mean pause between scenarios")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="a previous JSON report")
+    args = parser.parse_args()
+    base_url = args.base_url.rstrip("/")
+
+    register_employees(base_url, args.employees)
+    admin = SimulatedEmployee(base_url, 0, [], args.seed, 0)
+    admin.login()
+    catalog = seed_catalog(admin, args.products)
+
+    employees = [
+        SimulatedEmployee(base_url, index, catalog, args.seed, args.think_ms)
+        for index in range(args.employees)
+    ]
+    for employee in employees:
+        employee.login()
+
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=employee.run, args=(stop, args.iterations))
+        for employee in employees
+    ]
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    if args.iterations is None:
+        time.sleep(args.duration)
+        stop.set()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    samples: Samples = defaultdict(list)
+    for employee in employees:
+        for route, route_samples in employee.samples.items():
+            samples[route].extend(route_samples)
+
+    report = {
+        "commit": get_commit(),
+        "started_at": started_at.isoformat(),
+        "base_url": base_url,
+        "seconds": round(seconds, 2),
+        "options": {
+            "employees": args.employees,
+            "duration": args.duration,
+            "iterations": args.iterations,
+            "products": args.products,
+            "seed": args.seed,
+            "think_ms": args.think_ms,
+            "mix": MIX,
+        },
+        "total": summarize(
+            [sample for route in samples.values() for sample in route],
+            seconds,
+        ),
+        "routes": {
+            route: summarize(route_samples, seconds)
+            for route, route_samples in sorted(samples.items())
+        },
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""
+Measures how a burst of logins affects the latency of other requests.
+
+A probe thread keeps requesting a cheap endpoint while storm threads
+log in as fast as they can. Probe latency is reported idle, during a
+storm with hashing on the request threads (the old behaviour) and
+during a storm with hashing in the bounded pool.
+
+Usage (from backend/, against a populated database):
+    BENCH_USERNAME=admin BENCH_PASSWORD=secret \
+        python -m benchmarks.login_storm --storm-threads 16 --seconds 5
+"""
+
+from collections import Counter
+from flask import Flask
+from flask.testing import FlaskClient
+from statistics import quantiles
+import argparse
+import os
+import threading
+import time
+
+from api.v1.app import create_app
+from api.v1.auth import passwords
+from benchmarks import login
+
+
+PROBE_ENDPOINT = "/api/v1/products/suggest?q=a"
+
+
+def probe(client: FlaskClient, stop: threading.Event) -> list[float]:
+    """
+    Request PROBE_ENDPOINT until stop is set. Returns latencies in ms.
+    """
+    timings: list[float] = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        client.get(PROBE_ENDPOINT)
+        timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.01)
+    return timings
+
+
+def storm(app: Flask, stop: threading.Event, statuses: Counter) -> None:
+    """
+    Log in repeatedly until stop is set, counting response statuses.
+    """
+    client = app.test_client()
+    credentials = {
+        "email_or_username": os.environ["BENCH_USERNAME"],
+        "password": os.environ["BENCH_PASSWORD"],
+    }
+    while not stop.is_set():
+        response = client.post("/api/v1/auth_session/login", json=credentials)
+        statuses[response.status_code] += 1
+
+
+def run(
+        app: Flask, client: FlaskClient, storm_threads: int, seconds: float
+    ) -> tuple[list[float], Counter]:
+    """
+    Probe for seconds with storm_threads logging in meanwhile.
+    """
+    stop = threading.Event()
+    statuses: Counter = Counter()
+    threads = [
+        threading.Thread(target=storm, args=(app, stop, statuses))
+        for _ in range(storm_threads)
+    ]
+    for thread in threads:
+        thread.start()
+
+    timer = threading.Timer(seconds, stop.set)
+    timer.start()
+    timings = probe(client, stop)
+    for thread in threads:
+        thread.join()
+    return timings, statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--storm-threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    login(client)  # also starts the hashing pool
+
+    default_workers = passwords.PASSWORD_HASH_WORKERS
+    scenarios = {
+        "idle": (0, default_workers),
+        "storm, inline hashing": (args.storm_threads, 0),
+        "storm, pooled hashing": (args.storm_threads, default_workers),
+    }
+
+    print(f"{'scenario':<24}{'p50 ms':>10}{'p99 ms':>10}  logins by status")
+    for name, (storm_threads, workers) in scenarios.items():
+        passwords.PASSWORD_HASH_WORKERS = workers
+        timings, statuses = run(app, client, storm_threads, args.seconds)
+        cuts = quantiles(timings, n=100)
+        print(
+            f"{name:<24}{cuts[49]:>10.1f}{cuts[98]:>10.1f}  "
+            f"{dict(sorted(statuses.items()))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""
+Compares request validation before and after cached TypeAdapters, for
+every schema in request_data_validation.py.
+
+legacy: json.loads, model construction, then two model_dump passes.
+current: a cached TypeAdapter's validate_json on the raw bytes, then
+one model_dump pass. Bulk rows validate a 100 item array, against one
+model construction per item.
+
+Usage (from backend/):
+    python -m benchmarks.request_validation --runs 2000
+"""
+
+from pydantic import BaseModel
+from typing import Any
+import argparse
+import inspect
+import json
+
+from api.v1.utils import request_data_validation as validation
+from api.v1.utils.request_data_validation import (
+    get_list_adapter, get_type_adapter, is_empty
+)
+from benchmarks import time_ms
+
+
+ID = "0c3c5f0e-6f1a-4cf5-9d6b-2f1f5b8f2a11"
+SALE = {
+    "sale_order_id": ID,
+    "product_id": ID,
+    "quantity": 3,
+    "unit_selling_price": 350,
+    "total_selling_price": 1050,
+    "payment_status": "paid",
+}
+PURCHASE = {
+    "purchase_order_id": ID,
+    "product_id": ID,
+    "quantity": 40,
+    "unit_cost_price": 200,
+    "total_cost_price": 8000,
+    "payment_status": "paid",
+    "item_status": "supplied",
+}
+PRODUCT = {
+    "barcode": "5012345678900",
+    "name": "Paracetamol 500mg",
+    "category_id": ID,
+    "brand_id": ID,
+    "unit_cost_price": 200,
+    "unit_selling_price": 350,
+    "lead_time": 7,
+}
+EMPLOYEE = {
+    "first_name": "Range",
+    "last_name": "Rover",
+    "home_address": "No. 1 sporty street",
+    "role": "manager",
+    "is_admin": True,
+}
+LIST_QUERY = {
+    "created_from": "2025-01-01T00:00:00",
+    "created_to": "2025-02-01T00:00:00",
+    "order_by": "-created_at",
+}
+REPORT_QUERY = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+
+SAMPLES: dict[str, dict[str, Any]] = {
+    "BarcodeBatch": {"barcodes": ["5012345678900", "5012345678901"]},
+    "BatchIdsQuery": {"ids": f"{ID},{ID[:-1]}2"},
+    "BrandRegister": {"name": "Emzor"},
+    "BrandUpdate": {"name": "Emzor", "is_active": False},
+    "CategoryRegister": {"name": "pain killers", "description": "analgesics"},
+    "CategoryUpdate": {"description": "analgesics"},
+    "DeadStockQuery": {"days": 60},
+    "EmployeeLogin": {"email_or_username": "RRover", "password": "Ranger1234"},
+    "EmployeeRegister": {
+        **EMPLOYEE,
+        "username": "RRover",
+        "email": "rangerover@gmail.com",
+        "password": "Ranger1234",
+    },
+    "EmployeeUpdate": EMPLOYEE,
+    "JobCreate": {"kind": "backfill_order_totals", "batch_size": 100},
+    "ListQuery": LIST_QUERY,
+    "MarginReportQuery": {**REPORT_QUERY, "group_by": "brand"},
+    "ProductFilterQuery": {
+        "brand_ids": f"{ID},{ID}", "min_price": 100, "in_stock": True,
+    },
+    "ProductRankingQuery": {"window": "week", "metric": "revenue", "limit": 10},
+    "ProductRegister": PRODUCT,
+    "ProductSuggestQuery": {"q": "para", "limit": 10},
+    "ProductUpdate": {"unit_selling_price": 400},
+    "PurchaseListQuery": {**LIST_QUERY, "item_status": "supplied"},
+    "PurchaseOrderListQuery": {**LIST_QUERY, "status": "pending"},
+    "PurchaseOrderRegister": {"supplier_name": "Emzor", "ordering_cost": 500},
+    "PurchaseOrderUpdate": {"status": "complete"},
+    "PurchaseRegister": PURCHASE,
+    "PurchaseUpdate": {"quantity": 50, "total_cost_price": 10000},
+    "ReportRangeQuery": REPORT_QUERY,
+    "SaleListQuery": {**LIST_QUERY, "payment_status": "paid"},
+    "SaleOrderListQuery": {**LIST_QUERY, "status": "pending"},
+    "SaleOrderRegister": {},
+    "SaleOrderUpdate": {"status": "complete"},
+    "SaleRegister": SALE,
+    "SaleUpdate": {"quantity": 4, "total_selling_price": 1400},
+    "SalesReportQuery": {**REPORT_QUERY, "granularity": "week"},
+    "StockLevelUpdate": {"quantity_in_stock": 12},
+}
+BULK_SCHEMAS = ["SaleRegister"]
+BULK_SIZE = 100
+
+
+def get_schemas() -> dict[str, type[BaseModel]]:
+    """
+    Returns every schema defined in request_data_validation.py.
+    """
+    return {
+        name: cls
+        for name, cls in inspect.getmembers(validation, inspect.isclass)
+        if issubclass(cls, BaseModel) and cls.__module__ == validation.__name__
+    }
+
+
+def legacy(cls: type[BaseModel], body: bytes) -> dict[str, Any]:
+    """The old validate_request_data."""
+    valid_data = cls(**json.loads(body))
+    if not valid_data.model_dump(exclude_none=True):
+        raise ValueError("empty")
+    return valid_data.model_dump(exclude_unset=True)
+
+
+def current(cls: type[BaseModel], body: bytes) -> dict[str, Any]:
+    """The new validate_request_data."""
+    valid_data = get_type_adapter(cls).validate_json(body)
+    if is_empty(valid_data):
+        raise ValueError("empty")
+    return valid_data.model_dump(exclude_unset=True)
+
+
+def legacy_bulk(cls: type[BaseModel], body: bytes) -> list[dict[str, Any]]:
+    """One model per item, as a loop over the old path would."""
+    return [
+        cls(**item).model_dump(exclude_unset=True)
+        for item in json.loads(body)
+    ]
+
+
+def current_bulk(cls: type[BaseModel], body: bytes) -> list[dict[str, Any]]:
+    """The new validate_request_list."""
+    return [
+        item.model_dump(exclude_unset=True)
+        for item in get_list_adapter(cls).validate_json(body)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    schemas = get_schemas()
+    missing = sorted(set(schemas) - set(SAMPLES))
+    if missing:
+        raise SystemExit(f"No sample payload for: {', '.join(missing)}")
+
+    print(f"{'schema':<26}{'legacy us':>12}{'current us':>12}{'speedup':>9}")
+    rows: list[tuple[str, Any, Any, bytes]] = [
+        (name, legacy, current, json.dumps(SAMPLES[name]).encode())
+        for name in sorted(schemas)
+    ] + [
+        (
+            f"{name}[{BULK_SIZE}]", legacy_bulk, current_bulk,
+            json.dumps([SAMPLES[name]] * BULK_SIZE).encode(),
+        )
+        for name in BULK_SCHEMAS
+    ]
+    for label, old, new, body in rows:
+        cls = schemas[label.split("[")[0]]
+        new(cls, body)  # build the adapter outside the timing
+        old_us = time_ms(lambda: old(cls, body), args.runs) * 1000
+        new_us = time_ms(lambda: new(cls, body), args.runs) * 1000
+        print(
+            f"{label:<26}{old_us:>12.1f}{new_us:>12.1f}"
+            f"{old_us / new_us:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+"""
+Gunicorn settings, loaded automatically from the working directory.
+
+When PROMETHEUS_MULTIPROC_DIR is set, the workers keep their metrics
+in files there; see api/v1/utils/metrics.py.
+"""
+
+from typing import Any
+import os
+import shutil
+
+
+# threaded workers keep serving while a login waits on the password
+# hashing pool, or a request on the database
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+
+def on_starting(server: Any) -> None:
+    """
+    Start with an empty metrics directory, so counters from a previous
+    run are not reported again.
+    """
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """
+    Drop an exited worker's live gauges (the pool gauges).
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -7,7 +7,6 @@ Base model for all database classes.
 
 from copy import deepcopy
 from datetime import datetime
-from enum import Enum
 from sqlalchemy.orm import DeclarativeBase, mapped_column
 from sqlalchemy import String, DateTime
 from typing import Any
@@ -24,7 +23,9 @@ class BaseModel:
 
     id = mapped_column(String(36), primary_key=True, sort_order=-3)
     created_at = mapped_column(DateTime, default=datetime.now, sort_order=-2)
-    last_updated = mapped_column(DateTime, default=datetime.now, sort_order=-1)
+    last_updated = mapped_column(
+        DateTime, default=datetime.now, index=True, sort_order=-1
+    )
 
     def __init__(self, **kwargs: Any) -> None:
         """Create new model instance."""
@@ -53,13 +54,6 @@ class BaseModel:
         from models import storage
         storage.delete(self)
 
-    def get_enum_value(self, obj_dict: dict[str, Any]) -> dict[str, Any]:
-        """Replace Enum fields with their values."""
-        for attr, val in obj_dict.items():
-            if isinstance(val, Enum):
-                obj_dict[attr] = val.value
-        return obj_dict
-
     def save(self) -> None:
         """Update timestamp and save to storage."""
         from models import storage
@@ -68,13 +62,16 @@ class BaseModel:
         storage.save()
 
     def to_dict(self) -> dict[str, Any]:
-        """Return dict version of the object."""
-        obj_dict = deepcopy(self.__dict__)
+        """
+        Return dict version of the object.
+        Datetimes and enums are left as they are for the JSON provider.
+        """
+        column_keys = self.__mapper__.column_attrs.keys()  # type: ignore
+        obj_dict = {
+            key: value for key, value in self.__dict__.items()
+            if key in column_keys
+        }
 
-        obj_dict["created_at"] = obj_dict["created_at"].isoformat()
-        obj_dict["last_updated"] = obj_dict["last_updated"].isoformat()
         obj_dict.pop("password", None)
-        obj_dict.pop("_sa_instance_state", None)
         obj_dict["__class__"] = self.__class__.__name__
-        obj_dict = self.get_enum_value(obj_dict)
         return obj_dict
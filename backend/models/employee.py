@@ -5,7 +5,7 @@ Employee model.
 """
 
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import String, Boolean
+from sqlalchemy import String, Boolean, DateTime, Integer
 
 from models.basemodel import Base, BaseModel
 
@@ -25,6 +25,9 @@ class Employee(BaseModel, Base):
     role = mapped_column(String(200), nullable=False)
     image_url = mapped_column(String(100), unique=True)
     is_admin = mapped_column(Boolean, default=False)
+    # consecutive wrong passwords, and the backoff they earned
+    failed_logins = mapped_column(Integer, nullable=False, default=0)
+    login_blocked_until = mapped_column(DateTime)
 
     employee_session = relationship(
         "EmployeeSession",
@@ -5,7 +5,7 @@ Employee session model.
 """
 
 
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import mapped_column, relationship
 
 from models.basemodel import BaseModel, Base
@@ -15,12 +15,25 @@ class EmployeeSession(BaseModel, Base):
     """Tracks active login sessions for employees."""
 
     __tablename__ = "employee_sessions"
+    __table_args__ = (
+        # the purge deletes by expiry; device lists and the session cap
+        # read one employee's sessions
+        Index("ix_employee_sessions_expires_at", "expires_at"),
+        Index(
+            "ix_employee_sessions_employee_id_expires_at",
+            "employee_id",
+            "expires_at",
+        ),
+    )
 
     employee_id = mapped_column(
         String(36),
         ForeignKey("employees.id"),
         nullable=False
     )
+    expires_at = mapped_column(DateTime, nullable=False)
+    user_agent = mapped_column(String(300))
+    ip_address = mapped_column(String(45))
 
     employee = relationship(
         "Employee",
@@ -4,10 +4,19 @@
 Database storage engine for managing all model interactions.
 """
 
-from datetime import date, datetime
-from sqlalchemy.orm import scoped_session, sessionmaker
-from sqlalchemy import create_engine, select, func, extract, desc, or_, and_
+from datetime import date, datetime, timedelta
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import (
+    load_only, make_transient_to_detached, noload, scoped_session,
+    selectinload, sessionmaker
+)
+from sqlalchemy.pool import QueuePool
+from sqlalchemy import (
+    create_engine, select, func, extract, desc, or_, and_, cast, delete,
+    inspect, update, true, tuple_, ColumnElement, Date, Float, String
+)
 from typing import Any, Sequence, Type, TypeVar
+from uuid import uuid4
 import logging
 
 from models.basemodel import Base, BaseModel
@@ -15,16 +24,21 @@ from models.brand import Brand
 from models.category import Category
 from models.employee import Employee
 from models.employee_session import EmployeeSession
+from models.engine.schema_upgrades import SCHEMA_LOCK_ID, upgrade_schema
+from models.job import Job, JobStatus
 from models.product import Product
 from models.purchase_order import PurchaseOrder
-from models.purchase import Purchase
+from models.purchase import Purchase, PurchaseItemStatus
 from models.sale_order import SaleOrder
-from models.sale import Sale
+from models.sale import Sale, SalePaymentStatus
+from models.sales_daily_rollup import SalesDailyRollup
+from models.session_revocation import SessionRevocation
 from models.stock_level import StockLevel
 
 
 logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=BaseModel)
+LoadFields = Sequence[str | tuple[str, ...]]
 
 
 class DBStorage:
@@ -35,14 +49,26 @@ class DBStorage:
         Category,
         Employee,
         EmployeeSession,
+        Job,
         Product,
         PurchaseOrder,
         Purchase,
         SaleOrder,
         Sale,
+        SalesDailyRollup,
+        SessionRevocation,
         StockLevel,
     ]
 
+    __report_dimensions: dict[str, tuple[Any, Any, Any]] = {
+        "product": (SalesDailyRollup.product_id, Product, Product.name),
+        "brand": (SalesDailyRollup.brand_id, Brand, Brand.name),
+        "category": (SalesDailyRollup.category_id, Category, Category.name),
+        "employee": (
+            SalesDailyRollup.employee_id, Employee, Employee.username
+        ),
+    }
+
     def __init__(self, database_url: str) -> None:
         """Initializes the database engine with the provided URL."""
         self.__engine = create_engine(database_url, pool_pre_ping=True)
@@ -52,7 +78,12 @@ class DBStorage:
             cls: Type[T],
             page_size: int | None = None,
             page_num: int | None = None,
-            date_time: str | None = None
+            date_time: str | None = None,
+            fields: LoadFields | None = None,
+            filters: dict[str, Any] | None = None,
+            created_from: datetime | None = None,
+            created_to: datetime | None = None,
+            order_by: Sequence[str] = (),
         ) -> Sequence[T]:
         """
         Return paginated records of a model, optionally filtered by creation date.
@@ -62,6 +93,11 @@ class DBStorage:
             page_size: Items per page (positive int).
             page_num: Page number (positive int).
             date_time: ISO datetime string to filter by date.
+            fields: Columns and relationship paths to load (default all).
+            filters: Column name to value equality filters.
+            created_from: Inclusive lower bound on created_at.
+            created_to: Exclusive upper bound on created_at.
+            order_by: Column names, "-" prefixed for descending order.
 
         Raises:
             TypeError, ValueError on invalid inputs.
@@ -88,11 +124,27 @@ class DBStorage:
             except ValueError:
                 raise ValueError("date_time must be a valid ISO datetime string")
 
-        stmt = select(cls)
+        stmt = select(cls).options(*self.__load_options(cls, fields))
 
         if date_time:
-            date_only: date = datetime.fromisoformat(date_time).date()
-            stmt = stmt.where(func.date(cls.created_at) == date_only)
+            # a half-open range on the raw column can use its index,
+            # unlike date(created_at) = ...
+            created_from = datetime.combine(
+                datetime.fromisoformat(date_time).date(), datetime.min.time()
+            )
+            created_to = created_from + timedelta(days=1)
+        if created_from:
+            stmt = stmt.where(cls.created_at >= created_from)
+        if created_to:
+            stmt = stmt.where(cls.created_at < created_to)
+        for key, value in (filters or {}).items():
+            stmt = stmt.where(getattr(cls, key) == value)
+        if order_by:
+            stmt = stmt.order_by(*(
+                desc(getattr(cls, key[1:])) if key.startswith("-")
+                else getattr(cls, key)
+                for key in order_by
+            ), cls.id)
         if page_size and page_num:
             stmt = stmt.offset((page_num - 1) * page_size).limit(page_size)
         
@@ -116,45 +168,529 @@ class DBStorage:
             count_all_objects[cls_name.__name__] = count_cls_obj
         return count_all_objects
 
+    def __order_totals(
+            self, cls: Type[SaleOrder] | Type[PurchaseOrder]
+        ) -> dict[str, Any]:
+        """
+        Correlated subqueries computing an order's denormalized totals
+        from its items, for use in an UPDATE of cls.
+        """
+        if cls is SaleOrder:
+            order_id, quantity, amount, payment_status = (
+                Sale.sale_order_id,
+                Sale.quantity,
+                Sale.total_selling_price,
+                Sale.payment_status,
+            )
+        elif cls is PurchaseOrder:
+            order_id, quantity, amount, payment_status = (
+                Purchase.purchase_order_id,
+                Purchase.quantity,
+                Purchase.total_cost_price,
+                Purchase.payment_status,
+            )
+        else:
+            raise TypeError("cls must be SaleOrder or PurchaseOrder")
+
+        def total(aggregate: Any) -> Any:
+            """Aggregate over the order's items, 0 when it has none."""
+            return (
+                select(func.coalesce(aggregate, 0))
+                .where(order_id == cls.id)
+                .scalar_subquery()
+            )
+
+        return {
+            "line_count": total(func.count()),
+            "total_quantity": total(func.sum(quantity)),
+            "total_amount": total(func.sum(amount)),
+            "paid_amount": total(
+                func.sum(amount).filter(payment_status == "paid")
+            ),
+        }
+
+    def refresh_order_totals(
+            self,
+            cls: Type[SaleOrder] | Type[PurchaseOrder],
+            order_ids: Sequence[str | None],
+        ) -> None:
+        """
+        Recompute line_count, total_quantity, total_amount and
+        paid_amount of the given orders from their items. Runs in the
+        caller's transaction, after pending item changes are flushed.
+        """
+        order_ids = [order_id for order_id in set(order_ids) if order_id]
+        if not order_ids:
+            return
+
+        self.__session.execute(
+            update(cls)
+            .where(cls.id.in_(order_ids))
+            .values(**self.__order_totals(cls)),
+            execution_options={"synchronize_session": "fetch"},
+        )
+
+    def attach(self, cls: Type[T], **values: Any) -> T:
+        """
+        Return a persistent cls instance holding only the given
+        values, without loading it. Other attributes load on first
+        access. For rows known to exist, e.g. the employee named by a
+        verified session token.
+        """
+        obj = cls.__mapper__.class_manager.new_instance()  # type: ignore
+        for key, value in values.items():
+            setattr(obj, key, value)
+        make_transient_to_detached(obj)
+        return self.__session.merge(obj, load=False)
+
+    def backfill_order_totals(
+            self,
+            cls: Type[SaleOrder] | Type[PurchaseOrder],
+            batch_size: int = 500,
+        ) -> int:
+        """
+        Fill the denormalized totals of every order of cls.
+
+        Walks the orders table by id in batches of batch_size,
+        committing after each batch. Returns the number of orders seen.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        orders_seen = 0
+        last_id = ""
+        while True:
+            order_ids = self.__session.scalars(
+                select(cls.id)
+                .where(cls.id > last_id)
+                .order_by(cls.id)
+                .limit(batch_size)
+            ).all()
+            if not order_ids:
+                break
+
+            self.refresh_order_totals(cls, order_ids)
+            self.__session.commit()
+            orders_seen += len(order_ids)
+            last_id = order_ids[-1]
+        return orders_seen
+
+    def backfill_product_activity(self, batch_size: int = 500) -> int:
+        """
+        Fill Product.last_sold_at and Product.last_received_at from
+        existing paid sales and supplied purchases.
+
+        Walks the products table by id in batches of batch_size,
+        committing after each batch. Returns the number of products seen.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        products_seen = 0
+        last_id = ""
+        while True:
+            product_ids = self.__session.scalars(
+                select(Product.id)
+                .where(Product.id > last_id)
+                .order_by(Product.id)
+                .limit(batch_size)
+            ).all()
+            if not product_ids:
+                break
+
+            last_sold = (
+                select(
+                    Sale.product_id,
+                    func.max(Sale.created_at).label("sold_at"),
+                )
+                .where(
+                    Sale.product_id.in_(product_ids),
+                    Sale.payment_status == SalePaymentStatus.paid,
+                )
+                .group_by(Sale.product_id)
+                .subquery()
+            )
+            self.__session.execute(
+                update(Product)
+                .where(Product.id == last_sold.c.product_id)
+                .values(last_sold_at=last_sold.c.sold_at)
+            )
+
+            last_received = (
+                select(
+                    Purchase.product_id,
+                    func.max(Purchase.last_updated).label("received_at"),
+                )
+                .where(
+                    Purchase.product_id.in_(product_ids),
+                    Purchase.item_status == PurchaseItemStatus.supplied,
+                )
+                .group_by(Purchase.product_id)
+                .subquery()
+            )
+            self.__session.execute(
+                update(Product)
+                .where(Product.id == last_received.c.product_id)
+                .values(last_received_at=last_received.c.received_at)
+            )
+            self.save()
+
+            products_seen += len(product_ids)
+            last_id = product_ids[-1]
+
+        return products_seen
+
+    def cap_employee_sessions(self, employee_id: str, keep: int) -> int:
+        """
+        Delete all but the keep newest sessions of an employee.
+        Returns the number of sessions deleted.
+        """
+        newest = (
+            select(EmployeeSession.id)
+            .where(EmployeeSession.employee_id == employee_id)
+            .order_by(EmployeeSession.expires_at.desc())
+            .limit(keep)
+        )
+        deleted = self.__session.execute(
+            delete(EmployeeSession)
+            .where(
+                EmployeeSession.employee_id == employee_id,
+                EmployeeSession.id.not_in(newest),
+            ),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        self.save()
+        return deleted
+
+    def claim_jobs(self, limit: int = 1) -> list[Job]:
+        """
+        Claim up to limit queued jobs, oldest first, marking them
+        running. SKIP LOCKED lets concurrent workers claim disjoint
+        jobs without waiting on each other's row locks.
+        """
+        jobs = self.__session.scalars(
+            select(Job)
+            .where(Job.status == JobStatus.queued)
+            .order_by(Job.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        now = datetime.now()
+        for job in jobs:
+            job.status = JobStatus.running
+            job.started_at = now
+            job.heartbeat_at = now
+            job.attempts += 1
+        self.save()
+        return list(jobs)
+
     def close(self):
         """Closes the current database session."""
         self.__session.close()
 
+    def count_low_stock_products(self, threshold: int) -> int:
+        """
+        Counts products at or below their reordering point.
+        Products without a reordering point fall back to the threshold.
+        """
+        low_stock_count = self.__session.scalar(
+            select(func.count())
+            .select_from(Product)
+            .where(
+                func.coalesce(Product.quantity_in_stock, 0)
+                <= func.coalesce(Product.reordering_point, threshold)
+            )
+        )
+        return low_stock_count or 0
+
+    def count_orders_by_status(
+            self,
+            cls: Type[PurchaseOrder] | Type[SaleOrder],
+            statuses: Sequence[Any]
+        ) -> int:
+        """Counts sale or purchase orders in any of the given statuses."""
+        order_count = self.__session.scalar(
+            select(func.count())
+            .select_from(cls)
+            .where(cls.status.in_(statuses))
+        )
+        return order_count or 0
+
+    def dead_stock_products(
+            self,
+            cutoff: datetime,
+            page_size: int,
+            page_num: int,
+            fields: LoadFields | None = None,
+        ) -> Sequence[Product]:
+        """
+        Returns in-stock products not sold since cutoff, longest idle first.
+        Products never sold count once they are older than cutoff.
+        """
+        stmt = (
+            select(Product)
+            .options(*self.__load_options(Product, fields))
+            .where(
+                Product.quantity_in_stock > 0,
+                or_(
+                    Product.last_sold_at < cutoff,
+                    and_(
+                        Product.last_sold_at.is_(None),
+                        Product.created_at < cutoff,
+                    ),
+                ),
+            )
+            .order_by(
+                Product.last_sold_at.asc().nulls_first(), Product.id
+            )
+            .offset((page_num - 1) * page_size)
+            .limit(page_size)
+        )
+        return self.__session.scalars(stmt).all()
+
     def delete(self, obj: BaseModel) -> None:
         """Deletes an object from the current session."""
         self.__session.delete(obj)
 
+    def __product_filters(
+            self,
+            brand_ids: Sequence[str] = (),
+            category_ids: Sequence[str] = (),
+            min_price: float | None = None,
+            max_price: float | None = None,
+            in_stock: bool | None = None,
+            below_reorder: bool | None = None,
+            created_from: date | None = None,
+            created_to: date | None = None,
+        ) -> tuple[ColumnElement[bool], ColumnElement[bool], list[Any]]:
+        """
+        Builds product filter conditions. Returns the brand condition,
+        the category condition and the remaining conditions separately
+        so facet counts can leave out their own dimension.
+        """
+        brand_cond = (
+            Product.brand_id.in_(brand_ids) if brand_ids else true()
+        )
+        category_cond = (
+            Product.category_id.in_(category_ids) if category_ids else true()
+        )
+
+        conditions: list[Any] = []
+        if min_price is not None:
+            conditions.append(Product.unit_selling_price >= min_price)
+        if max_price is not None:
+            conditions.append(Product.unit_selling_price <= max_price)
+        if in_stock is True:
+            conditions.append(Product.quantity_in_stock > 0)
+        elif in_stock is False:
+            conditions.append(or_(
+                Product.quantity_in_stock <= 0,
+                Product.quantity_in_stock.is_(None),
+            ))
+        if below_reorder is not None:
+            conditions.append(
+                Product.is_below_reorder.is_(True) if below_reorder
+                else Product.is_below_reorder.is_not(True)
+            )
+        if created_from:
+            conditions.append(Product.created_at >= created_from)
+        if created_to:
+            conditions.append(
+                Product.created_at < created_to + timedelta(days=1)
+            )
+        return brand_cond, category_cond, conditions
+
+    def employee_sessions(self, employee_id: str) -> list[EmployeeSession]:
+        """
+        Returns an employee's unexpired sessions, newest first.
+        """
+        return list(self.__session.scalars(
+            select(EmployeeSession)
+            .where(
+                EmployeeSession.employee_id == employee_id,
+                EmployeeSession.expires_at > datetime.now(),
+            )
+            .order_by(EmployeeSession.expires_at.desc())
+        ))
+
     def filter_products(
             self,
             page_size: int,
             page_num: int,
-            brand_id: str | None = None,
-            category_id: str | None = None,
-            filter_type: str | None = None) -> Sequence[Product]:
+            fields: LoadFields | None = None,
+            **filters: Any,
+        ) -> Sequence[Product]:
         """
-        Filter products by category or brand or both.
+        Filter products by brands, categories, price range, stock,
+        reorder status and creation date. See `__product_filters`.
         """
-        stmt = select(Product)
-        if filter_type == "brand" and brand_id:
-            stmt = stmt.where(Product.brand_id == brand_id)
-        elif filter_type == "category" and category_id:
-            stmt = stmt.where(Product.category_id == category_id)
-        else:
-            stmt = stmt.where(and_(
-                Product.brand_id == brand_id,
-                Product.category_id == category_id
+        brand_cond, category_cond, conditions = self.__product_filters(
+            **filters
+        )
+        stmt = (
+            select(Product)
+            .options(*self.__load_options(Product, fields))
+            .where(brand_cond, category_cond, *conditions)
+            .order_by(Product.name, Product.id)
+            .offset((page_num - 1) * page_size)
+            .limit(page_size)
+        )
+        return self.__session.scalars(stmt).all()
+
+    def product_facets(self, **filters: Any) -> dict[str, Any]:
+        """
+        Counts products matching the filters, per brand and per
+        category, in one GROUPING SETS query. Brand counts ignore the
+        brand filter and category counts the category filter, so a
+        sidebar can show how many products selecting another brand or
+        category would add.
+        """
+        brand_cond, category_cond, conditions = self.__product_filters(
+            **filters
+        )
+        stmt = (
+            select(
+                Product.brand_id,
+                Brand.name.label("brand_name"),
+                Product.category_id,
+                Category.name.label("category_name"),
+                func.grouping(
+                    Product.brand_id, Product.category_id
+                ).label("grouping"),
+                func.count().filter(
+                    and_(brand_cond, category_cond)
+                ).label("total"),
+                func.count().filter(category_cond).label("brand_count"),
+                func.count().filter(brand_cond).label("category_count"),
+            )
+            .outerjoin(Brand, Brand.id == Product.brand_id)
+            .outerjoin(Category, Category.id == Product.category_id)
+            .where(*conditions)
+            .group_by(func.grouping_sets(
+                tuple_(Product.brand_id, Brand.name),
+                tuple_(Product.category_id, Category.name),
+                tuple_(),
             ))
-        
-        stmt = stmt.offset((page_num - 1) * page_size).limit(page_size)
-        products = self.__session.scalars(stmt).all()
-        return products
+        )
+
+        facets: dict[str, Any] = {"total": 0, "brands": [], "categories": []}
+        for row in self.__session.execute(stmt):
+            # grouping() sets a bit for each column left out of the set
+            if row.grouping == 1 and row.brand_count:
+                facets["brands"].append({
+                    "id": row.brand_id,
+                    "name": row.brand_name,
+                    "count": row.brand_count,
+                })
+            elif row.grouping == 2 and row.category_count:
+                facets["categories"].append({
+                    "id": row.category_id,
+                    "name": row.category_name,
+                    "count": row.category_count,
+                })
+            elif row.grouping == 3:
+                facets["total"] = row.total
+
+        for key in ("brands", "categories"):
+            facets[key].sort(
+                key=lambda facet: (-facet["count"], facet["name"] or "")
+            )
+        return facets
 
-    def get_obj_by_id(self, cls: Type[T], id: str) -> T | None:
+    def finish_job(
+            self,
+            job_id: str,
+            attempt: int,
+            result: dict[str, Any] | None = None,
+            error: str | None = None,
+        ) -> bool:
+        """
+        Record the outcome of a running job: succeeded with result,
+        or failed with error. attempt is the job's attempts when it was
+        claimed; if the job has since been requeued or finished, the
+        outcome is dropped and False is returned.
+        """
+        finished = self.__session.execute(
+            update(Job)
+            .where(
+                Job.id == job_id,
+                Job.status == JobStatus.running,
+                Job.attempts == attempt,
+            )
+            .values(
+                status=JobStatus.failed if error else JobStatus.succeeded,
+                result=result,
+                error=error,
+                finished_at=datetime.now(),
+                last_updated=datetime.now(),
+            ),
+            execution_options={"synchronize_session": "fetch"},
+        ).rowcount
+        self.save()
+        return finished == 1
+
+    def get_many(
+            self,
+            cls: Type[T],
+            ids: Sequence[str],
+            fields: LoadFields | None = None,
+        ) -> list[T | None]:
+        """
+        Fetches many objects by id with a single `WHERE id IN (...)`.
+        Results follow the order of ids, with None for missing ids.
+        """
+        if not issubclass(cls, BaseModel):  # type: ignore
+            raise TypeError("Cls must inherit from BaseModel")
+        if not ids:
+            return []
+
+        objs = self.__session.scalars(
+            select(cls)
+            .where(cls.id.in_(ids))
+            .options(*self.__load_options(cls, fields))
+        ).all()
+        objs_by_id = {obj.id: obj for obj in objs}
+        return [objs_by_id.get(id) for id in ids]
+
+    def get_obj_by_id(
+            self, cls: Type[T], id: str, fields: LoadFields | None = None
+        ) -> T | None:
         """Fetches a single object by its ID."""
         if issubclass(cls, BaseModel):  # type: ignore
-            obj = self.__session.get(cls, id)
+            obj = self.__session.get(
+                cls, id, options=self.__load_options(cls, fields)
+            )
+            if obj is not None and not fields:
+                # an attached instance may hold only some columns
+                unloaded = inspect(obj).expired_attributes
+                if unloaded:
+                    self.__session.refresh(obj, unloaded)
             return obj
     
+    def get_sales_totals(
+            self, start: datetime, end: datetime
+        ) -> dict[str, Any]:
+        """
+        Returns revenue and number of paid sales created in [start, end).
+        """
+        result = self.__session.execute(
+            select(
+                func.coalesce(func.sum(Sale.total_selling_price), 0)
+                .label("revenue"),
+                func.count(Sale.id).label("sales_count"),
+            )
+            .where(
+                Sale.payment_status == SalePaymentStatus.paid,
+                Sale.created_at >= start,
+                Sale.created_at < end,
+            )
+        ).one()
+
+        return {
+            "revenue": float(result.revenue),
+            "sales_count": int(result.sales_count),
+        }
+
     def get_stock_obj(self, product_id: str) -> StockLevel | None:
         """Fetches a single stock level object by the given product id."""
         stock = self.__session.scalars(
@@ -162,18 +698,446 @@ class DBStorage:
         ).one_or_none()
         return stock
 
+    def heartbeat_jobs(self, job_ids: Sequence[str]) -> None:
+        """
+        Mark running jobs as still in progress, so requeue_stale_jobs
+        leaves them to the worker running them.
+        """
+        if not job_ids:
+            return
+        self.__session.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.status == JobStatus.running)
+            .values(heartbeat_at=datetime.now()),
+            execution_options={"synchronize_session": False},
+        )
+        self.save()
+
+    def job_queue_stats(self) -> tuple[dict[str, int], datetime | None]:
+        """
+        Returns the number of queued and running jobs by status, and
+        when the oldest queued job was created.
+        """
+        rows = self.__session.execute(
+            select(Job.status, func.count(), func.min(Job.created_at))
+            .where(Job.status.in_([JobStatus.queued, JobStatus.running]))
+            .group_by(Job.status)
+        ).all()
+        counts = {status.value: count for status, count, _ in rows}
+        oldest_queued = next(
+            (oldest for status, _, oldest in rows
+             if status == JobStatus.queued),
+            None,
+        )
+        return counts, oldest_queued
+
+    def last_modified(self, *classes: Type[BaseModel]) -> tuple[Any, ...]:
+        """
+        Returns (max(last_updated), row count) for each class in a single
+        round trip. Used as a cheap version probe for conditional GETs.
+        """
+        probes: list[Any] = []
+        for cls in classes:
+            if not issubclass(cls, BaseModel):  # type: ignore
+                raise TypeError("Cls must inherit from BaseModel")
+            probes.append(
+                select(func.max(cls.last_updated)).scalar_subquery()
+            )
+            probes.append(
+                select(func.count()).select_from(cls).scalar_subquery()
+            )
+
+        return tuple(self.__session.execute(select(*probes)).one())
+
     def new(self, obj: BaseModel):
         """Adds a new object to the current session."""
         self.__session.add(obj)
 
+    def pool_status(self) -> dict[str, int]:
+        """
+        Returns the connection pool's size and how many of its
+        connections are checked out, idle and in overflow.
+        """
+        pool = self.__engine.pool
+        if not isinstance(pool, QueuePool):
+            return {}
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        }
+
+    def product_index_records(
+            self,
+            updated_since: datetime | None = None,
+            velocity_days: int = 30,
+        ) -> list[dict[str, Any]]:
+        """
+        Returns compact product records for the in-memory product index,
+        optionally only those updated at or after updated_since.
+        `sales_velocity` is units sold per day over the last
+        velocity_days days, read from the daily rollup.
+        """
+        units_sold = (
+            select(
+                SalesDailyRollup.product_id,
+                func.sum(SalesDailyRollup.quantity).label("quantity"),
+            )
+            .where(
+                SalesDailyRollup.sale_date
+                >= date.today() - timedelta(days=velocity_days)
+            )
+            .group_by(SalesDailyRollup.product_id)
+            .subquery()
+        )
+        stmt = select(
+            Product.id,
+            Product.name,
+            Product.barcode,
+            Product.unit_selling_price,
+            Product.quantity_in_stock,
+            (
+                cast(func.coalesce(units_sold.c.quantity, 0), Float)
+                / velocity_days
+            ).label("sales_velocity"),
+        ).outerjoin(units_sold, units_sold.c.product_id == Product.id)
+        if updated_since:
+            stmt = stmt.where(Product.last_updated >= updated_since)
+
+        return [dict(row) for row in self.__session.execute(stmt).mappings()]
+
+    def product_movers(
+            self,
+            previous_start: date,
+            current_start: date,
+            end: date,
+            metric: str,
+            limit: int,
+            partition_by: str | None = None,
+        ) -> list[dict[str, Any]]:
+        """
+        Returns the products whose sales changed the most between
+        [previous_start, current_start) and [current_start, end).
+        """
+        metric_column = self.__ranking_metric(metric)
+        current_total = func.coalesce(func.sum(metric_column).filter(
+            SalesDailyRollup.sale_date >= current_start
+        ), 0)
+        previous_total = func.coalesce(func.sum(metric_column).filter(
+            SalesDailyRollup.sale_date < current_start
+        ), 0)
+        change = current_total - previous_total
+
+        return self.__rank_products(
+            [
+                current_total.label("current"),
+                previous_total.label("previous"),
+                change.label("change"),
+            ],
+            func.abs(change),
+            previous_start,
+            end,
+            limit,
+            partition_by,
+        )
+
+    def record_failed_login(
+            self,
+            employee_id: str,
+            free_attempts: int,
+            base_delay: float,
+            max_delay: float,
+        ) -> int:
+        """
+        Count a wrong password against an employee. Past free_attempts
+        consecutive failures, logins are blocked for base_delay seconds,
+        doubling with each further failure up to max_delay.
+        Returns the number of consecutive failures.
+        """
+        # incremented in SQL so concurrent failures are all counted
+        failures = self.__session.execute(
+            update(Employee)
+            .where(Employee.id == employee_id)
+            .values(failed_logins=Employee.failed_logins + 1)
+            .returning(Employee.failed_logins)
+        ).scalar_one()
+
+        if failures > free_attempts:
+            # capped so the power cannot overflow a float
+            doublings = min(failures - free_attempts - 1, 64)
+            delay = min(max_delay, base_delay * 2 ** doublings)
+            self.__session.execute(
+                update(Employee)
+                .where(Employee.id == employee_id)
+                .values(
+                    login_blocked_until=datetime.now() + timedelta(seconds=delay)
+                )
+            )
+        self.save()
+        return failures
+
     def reload(self):
-        """Creates all tables and initializes a scoped session."""
+        """
+        Creates missing tables, upgrades those of an earlier release and
+        initializes a scoped session. Processes starting together take
+        turns on an advisory lock.
+        """
         # Base.metadata.drop_all(self.__engine)
-        Base.metadata.create_all(self.__engine)
+        with self.__engine.begin() as connection:
+            connection.execute(
+                select(func.pg_advisory_xact_lock(SCHEMA_LOCK_ID))
+            )
+            tables = set(inspect(connection).get_table_names())
+            Base.metadata.create_all(connection)
+            upgrade_schema(connection, tables)
         self.__session = scoped_session(
             sessionmaker(bind=self.__engine, expire_on_commit=False)
         )
 
+    def purge_expired_sessions(self, batch_size: int = 1000) -> int:
+        """
+        Delete expired sessions, batch_size rows per transaction so the
+        purge never holds many locks at once. Returns the number deleted.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        purged = 0
+        now = datetime.now()
+        while True:
+            expired = (
+                select(EmployeeSession.id)
+                .where(EmployeeSession.expires_at <= now)
+                .limit(batch_size)
+            )
+            deleted = self.__session.execute(
+                delete(EmployeeSession).where(EmployeeSession.id.in_(expired)),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+            self.save()
+            purged += deleted
+            if deleted < batch_size:
+                return purged
+
+    def rebuild_sales_rollup(self, batch_days: int = 31) -> int:
+        """
+        Recompute the daily sales rollup from the sales table.
+
+        Works through the sales history one window of batch_days at a
+        time, committing after each window. Returns the number of windows.
+        """
+        if batch_days <= 0:
+            raise ValueError("batch_days must be a positive integer")
+
+        first_sale, last_sale = self.__session.execute(
+            select(func.min(Sale.created_at), func.max(Sale.created_at))
+            .where(Sale.payment_status == SalePaymentStatus.paid)
+        ).one()
+        if not first_sale or not last_sale:
+            return 0
+
+        rollup = SalesDailyRollup.__table__
+        sale_date = cast(Sale.created_at, Date)
+        windows = 0
+        window_start: date = first_sale.date()
+
+        while window_start <= last_sale.date():
+            window_end = window_start + timedelta(days=batch_days)
+            aggregated = (
+                select(
+                    cast(func.gen_random_uuid(), String),
+                    func.now(),
+                    func.now(),
+                    sale_date,
+                    Sale.product_id,
+                    Sale.brand_id,
+                    Sale.category_id,
+                    Sale.employee_id,
+                    func.sum(Sale.quantity),
+                    func.sum(Sale.total_selling_price),
+                    func.sum(func.coalesce(Sale.cost_of_goods, 0)),
+                )
+                .where(
+                    Sale.payment_status == SalePaymentStatus.paid,
+                    Sale.created_at >= window_start,
+                    Sale.created_at < window_end,
+                )
+                .group_by(
+                    sale_date,
+                    Sale.product_id,
+                    Sale.brand_id,
+                    Sale.category_id,
+                    Sale.employee_id,
+                )
+            )
+            stmt = pg_insert(rollup).from_select(
+                [
+                    "id", "created_at", "last_updated", "sale_date",
+                    "product_id", "brand_id", "category_id", "employee_id",
+                    "quantity", "revenue", "cost",
+                ],
+                aggregated,
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_sales_daily_rollup_dimensions",
+                set_={
+                    "quantity": stmt.excluded.quantity,
+                    "revenue": stmt.excluded.revenue,
+                    "cost": stmt.excluded.cost,
+                    "last_updated": stmt.excluded.last_updated,
+                },
+            )
+
+            self.__session.execute(
+                delete(SalesDailyRollup).where(
+                    SalesDailyRollup.sale_date >= window_start,
+                    SalesDailyRollup.sale_date < window_end,
+                )
+            )
+            self.__session.execute(stmt)
+            self.save()
+
+            windows += 1
+            logger.info(
+                f"Rebuilt sales rollup from {window_start} to {window_end}"
+            )
+            window_start = window_end
+
+        return windows
+
+    def requeue_stale_jobs(
+            self, older_than: timedelta, max_attempts: int = 3
+        ) -> int:
+        """
+        Return running jobs whose worker has not sent a heartbeat for
+        older_than, and so is assumed to have died, to the queue; those
+        already tried max_attempts times are failed instead. Returns
+        the number of jobs requeued.
+        """
+        stale = and_(
+            Job.status == JobStatus.running,
+            func.coalesce(Job.heartbeat_at, Job.started_at)
+            < datetime.now() - older_than,
+        )
+        self.__session.execute(
+            update(Job)
+            .where(stale, Job.attempts >= max_attempts)
+            .values(
+                status=JobStatus.failed,
+                error="Worker stopped before the job finished.",
+                finished_at=datetime.now(),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        requeued = self.__session.execute(
+            update(Job)
+            .where(stale)
+            .values(status=JobStatus.queued, started_at=None, heartbeat_at=None),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        self.save()
+        return requeued
+
+    def revocation_generations(self) -> dict[str, int]:
+        """
+        Returns the session revocation generation of every employee
+        who has one.
+        """
+        rows = self.__session.execute(
+            select(SessionRevocation.employee_id, SessionRevocation.generation)
+        )
+        return {employee_id: generation for employee_id, generation in rows}
+
+    def revoke_sessions(self, employee_id: str) -> int:
+        """
+        Bump an employee's revocation generation, invalidating their
+        signed session tokens. Runs in the caller's transaction.
+        Returns the new generation.
+        """
+        now = datetime.now()
+        revocations = SessionRevocation.__table__
+        stmt = pg_insert(revocations).values(
+            id=str(uuid4()),
+            created_at=now,
+            last_updated=now,
+            employee_id=employee_id,
+            generation=1,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_session_revocations_employee_id",
+            set_={
+                "generation": revocations.c.generation + 1,
+                "last_updated": stmt.excluded.last_updated,
+            },
+        ).returning(revocations.c.generation)
+        return self.__session.execute(stmt).scalar_one()
+
+    def sales_report(
+            self,
+            granularity: str | None,
+            group_by: Sequence[str] = (),
+            start_date: date | None = None,
+            end_date: date | None = None,
+        ) -> list[dict[str, Any]]:
+        """
+        Aggregate the daily sales rollup into day, week or month buckets,
+        or a single total when granularity is None, optionally grouped by
+        product, brand, category and/or employee.
+        The date range is half-open: [start_date, end_date).
+        """
+        if granularity not in (None, "day", "week", "month"):
+            raise ValueError("granularity must be one of day, week, month")
+
+        columns: list[Any] = []
+        group_columns: list[Any] = []
+        if granularity:
+            period = cast(
+                func.date_trunc(granularity, SalesDailyRollup.sale_date), Date
+            ).label("period")
+            columns.append(period)
+            group_columns.append(period)
+        stmt_joins: list[tuple[Any, Any]] = []
+
+        for dimension in group_by:
+            if dimension not in self.__report_dimensions:
+                raise ValueError(f"Cannot group sales by {dimension}")
+            id_column, model, name_column = self.__report_dimensions[dimension]
+            columns += [
+                id_column.label(f"{dimension}_id"),
+                name_column.label(f"{dimension}_name"),
+            ]
+            group_columns += [id_column, name_column]
+            stmt_joins.append((model, id_column == model.id))
+
+        columns += [
+            func.sum(SalesDailyRollup.quantity).label("quantity"),
+            func.sum(SalesDailyRollup.revenue).label("revenue"),
+            func.sum(SalesDailyRollup.cost).label("cost"),
+        ]
+        stmt = select(*columns).select_from(SalesDailyRollup)
+        for model, onclause in stmt_joins:
+            stmt = stmt.outerjoin(model, onclause)
+
+        if start_date:
+            stmt = stmt.where(SalesDailyRollup.sale_date >= start_date)
+        if end_date:
+            stmt = stmt.where(SalesDailyRollup.sale_date < end_date)
+
+        if group_columns:
+            stmt = stmt.group_by(*group_columns).order_by(*group_columns)
+
+        report: list[dict[str, Any]] = []
+        for row in self.__session.execute(stmt).mappings():
+            row_dict = dict(row)
+            if granularity:
+                row_dict["period"] = row_dict["period"].isoformat()
+            row_dict["quantity"] = int(row_dict["quantity"] or 0)
+            row_dict["revenue"] = float(row_dict["revenue"] or 0)
+            row_dict["cost"] = float(row_dict["cost"] or 0)
+            report.append(row_dict)
+        return report
+
     def save(self):
         """Commits all pending changes to the database."""
         try:
@@ -185,12 +1149,25 @@ class DBStorage:
                 logger.critical(f"Rollback failed: {rollback_error}")
             raise e
     
+    def session_employee_id(self, session_id: str) -> str | None:
+        """
+        Returns the employee id of an unexpired session, or None.
+        """
+        return self.__session.scalar(
+            select(EmployeeSession.employee_id)
+            .where(
+                EmployeeSession.id == session_id,
+                EmployeeSession.expires_at > datetime.now(),
+            )
+        )
+
     def search(
             self,
             cls: Type[T],
             search_term: str,
             page_size: int | None = None,
             page_num: int | None = None,
+            fields: LoadFields | None = None,
         ) -> Sequence[T]:
         """
         Search Brand, Category, Product for a match of the given search term.
@@ -219,7 +1196,11 @@ class DBStorage:
             raise TypeError("Page number must be a valid positive integer")
         
         
-        stmt = select(cls).where(cls.name.ilike(f"%{search_term}%")) # type: ignore
+        stmt = (
+            select(cls)
+            .where(cls.name.ilike(f"%{search_term}%"))  # type: ignore
+            .options(*self.__load_options(cls, fields))
+        )
 
         if page_size and page_num:
             stmt = stmt.limit(page_size).offset((page_num - 1) * page_size)
@@ -251,7 +1232,232 @@ class DBStorage:
             select(Product).where(Product.barcode == barcode)
         ).one_or_none()
         return product
+
+    def top_products(
+            self,
+            start: date,
+            end: date,
+            metric: str,
+            limit: int,
+            partition_by: str | None = None,
+        ) -> list[dict[str, Any]]:
+        """
+        Returns the top products by quantity or revenue in [start, end),
+        overall or per brand or category.
+        """
+        quantity = func.sum(SalesDailyRollup.quantity)
+        revenue = func.sum(SalesDailyRollup.revenue)
+
+        return self.__rank_products(
+            [quantity.label("quantity"), revenue.label("revenue")],
+            quantity if metric == "quantity" else revenue,
+            start,
+            end,
+            limit,
+            partition_by,
+        )
+
+    def top_selling_products(
+            self, start: datetime, end: datetime, limit: int
+        ) -> list[dict[str, Any]]:
+        """
+        Returns the products with the highest paid quantity sold
+        in [start, end).
+        """
+        total_quantity = func.sum(Sale.quantity).label("quantity")
+        rows = self.__session.execute(
+            select(
+                Product.id,
+                Product.name,
+                total_quantity,
+                func.sum(Sale.total_selling_price).label("revenue"),
+            )
+            .join(Sale, Sale.product_id == Product.id)
+            .where(
+                Sale.payment_status == SalePaymentStatus.paid,
+                Sale.created_at >= start,
+                Sale.created_at < end,
+            )
+            .group_by(Product.id, Product.name)
+            .order_by(desc(total_quantity))
+            .limit(limit)
+        ).all()
+
+        return [
+            {
+                "product_id": row.id,
+                "product_name": row.name,
+                "quantity": int(row.quantity),
+                "revenue": float(row.revenue),
+            }
+            for row in rows
+        ]
     
+    def __load_options(
+            self, cls: Type[BaseModel], fields: LoadFields | None
+        ) -> list[Any]:
+        """
+        Builds loader options restricting a query to the given columns
+        and relationship paths, e.g. ["name", ("brand", "name")].
+        Relationships not named are not loaded at all; named ones are
+        selectin-loaded with only the columns the path needs.
+        """
+        if fields is None:
+            return []
+
+        # relationship path -> attribute names to load at that hop
+        columns: dict[tuple[str, ...], set[str]] = {(): {"id", "last_updated"}}
+        for field in fields:
+            if isinstance(field, str):
+                columns[()].add(field)
+                continue
+
+            *relations, column = field
+            entity: Any = cls
+            for hop in range(len(relations)):
+                prop = getattr(entity, relations[hop]).property
+                # the parent needs its join columns to load the relation
+                columns.setdefault(tuple(relations[:hop]), set()).update(
+                    entity.__mapper__.get_property_by_column(local).key
+                    for local in prop.local_columns
+                )
+                entity = prop.mapper.class_
+            columns.setdefault(tuple(relations), set()).add(column)
+
+        options: list[Any] = [
+            noload("*"),
+            load_only(*(getattr(cls, key) for key in columns.pop(()))),
+        ]
+        for path, keys in columns.items():
+            entity, loader = cls, None
+            for name in path:
+                attr = getattr(entity, name)
+                loader = (
+                    selectinload(attr) if loader is None
+                    else loader.selectinload(attr)
+                )
+                entity = attr.property.mapper.class_
+            options.append(
+                loader.load_only(  # type: ignore
+                    *(getattr(entity, key) for key in keys)
+                )
+            )
+        return options
+
+    def __ranking_metric(self, metric: str) -> Any:
+        """Returns the rollup column products are ranked by."""
+        if metric == "quantity":
+            return SalesDailyRollup.quantity
+        if metric == "revenue":
+            return SalesDailyRollup.revenue
+        raise ValueError("metric must be one of quantity, revenue")
+
+    def __rank_products(
+            self,
+            columns: list[Any],
+            score: Any,
+            start: date,
+            end: date,
+            limit: int,
+            partition_by: str | None = None,
+        ) -> list[dict[str, Any]]:
+        """
+        Aggregates the rollup per product over [start, end) and keeps the
+        best `limit` products by score, overall or per partition.
+
+        Unpartitioned rankings use ORDER BY ... LIMIT, which PostgreSQL
+        runs as a bounded top-N heap sort instead of sorting every product.
+        Partitioned rankings use row_number() over each partition.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be a positive integer")
+
+        group_columns: list[Any] = [SalesDailyRollup.product_id]
+        if partition_by:
+            if partition_by not in ("brand", "category"):
+                raise ValueError("partition_by must be one of brand, category")
+            partition_column = self.__report_dimensions[partition_by][0]
+            group_columns.append(partition_column.label(f"{partition_by}_id"))
+
+        aggregated = (
+            select(*group_columns, *columns, score.label("score"))
+            .where(
+                SalesDailyRollup.sale_date >= start,
+                SalesDailyRollup.sale_date < end,
+            )
+            .group_by(*group_columns)
+        )
+
+        if partition_by:
+            ranked = aggregated.add_columns(
+                func.row_number().over(
+                    partition_by=group_columns[1],
+                    order_by=(desc(score), SalesDailyRollup.product_id),
+                ).label("rank")
+            ).subquery()
+            stmt = (
+                select(ranked, Product.name.label("product_name"))
+                .outerjoin(Product, ranked.c.product_id == Product.id)
+                .where(ranked.c.rank <= limit)
+                .order_by(ranked.c[f"{partition_by}_id"], ranked.c.rank)
+            )
+        else:
+            top = (
+                aggregated
+                .order_by(desc(score), SalesDailyRollup.product_id)
+                .limit(limit)
+                .subquery()
+            )
+            stmt = (
+                select(top, Product.name.label("product_name"))
+                .outerjoin(Product, top.c.product_id == Product.id)
+                .order_by(desc(top.c.score), top.c.product_id)
+            )
+
+        rankings: list[dict[str, Any]] = []
+        for position, row in enumerate(
+            self.__session.execute(stmt).mappings(), start=1
+        ):
+            row_dict = dict(row)
+            row_dict.pop("score", None)
+            row_dict.setdefault("rank", position)
+            rankings.append(row_dict)
+        return rankings
+
+    def update_sales_rollup(self, row: dict[str, Any], sign: int = 1) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) one sale's contribution to its
+        daily rollup row. Runs in the caller's transaction.
+        """
+        if sign not in (1, -1):
+            raise ValueError("sign must be 1 or -1")
+
+        now = datetime.now()
+        rollup = SalesDailyRollup.__table__
+        stmt = pg_insert(rollup).values(
+            id=str(uuid4()),
+            created_at=now,
+            last_updated=now,
+            sale_date=row["sale_date"],
+            product_id=row["product_id"],
+            brand_id=row["brand_id"],
+            category_id=row["category_id"],
+            employee_id=row["employee_id"],
+            quantity=sign * row["quantity"],
+            revenue=sign * row["revenue"],
+            cost=sign * row["cost"],
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_sales_daily_rollup_dimensions",
+            set_={
+                "quantity": rollup.c.quantity + stmt.excluded.quantity,
+                "revenue": rollup.c.revenue + stmt.excluded.revenue,
+                "cost": rollup.c.cost + stmt.excluded.cost,
+                "last_updated": stmt.excluded.last_updated,
+            },
+        )
+        self.__session.execute(stmt)
+
     # def record_stock(
     #     self,
     #     product_id: str,
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+
+"""
+Upgrades for databases created by an earlier release.
+
+`Base.metadata.create_all` creates missing tables but never alters a
+table that already exists, so columns and indexes added to existing
+models are listed here as idempotent SQL, oldest first. Each upgrade
+is skipped once its marker column or index exists, which is also the
+case on a database created from scratch. Tables added to an existing
+database are created by create_all; their upgrade is marked by the
+table name and runs when the table was missing beforehand.
+
+DBStorage.reload runs the missing upgrades at start-up, in the same
+transaction as create_all and under an advisory lock, so workers
+starting together take turns and nothing is committed half done. No
+manual step is needed: deploy the new release and it upgrades the
+database it finds. Upgrades whose new columns need data derived from
+existing rows queue a background job for it, run by the job worker
+(`flask --app api.v1.app jobs worker`).
+"""
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Connection
+from typing import NamedTuple
+from uuid import uuid4
+import logging
+import os
+
+from models.basemodel import Base
+from models.job import Job, JobStatus
+
+
+logger = logging.getLogger(__name__)
+
+# key of the advisory lock held while creating and upgrading tables
+SCHEMA_LOCK_ID = 7_201_435_001
+SESSION_DURATION = int(os.getenv("SESSION_DURATION", 0))
+
+
+class SchemaUpgrade(NamedTuple):
+    """
+    Statements bringing an existing table up to date. marker is the
+    "table.column", index or table the upgrade adds; backfill names a
+    job kind queued after the statements run.
+    """
+
+    marker: str
+    statements: tuple[str, ...]
+    backfill: str | None = None
+
+
+SCHEMA_UPGRADES: list[SchemaUpgrade] = [
+    SchemaUpgrade(
+        "products.last_sold_at",
+        (
+            "ALTER TABLE products"
+            " ADD COLUMN IF NOT EXISTS last_sold_at TIMESTAMP WITHOUT TIME ZONE,"
+            " ADD COLUMN IF NOT EXISTS last_received_at TIMESTAMP WITHOUT TIME ZONE",
+            "CREATE INDEX IF NOT EXISTS ix_products_last_sold_at"
+            " ON products (last_sold_at)",
+            "CREATE INDEX IF NOT EXISTS ix_products_last_received_at"
+            " ON products (last_received_at)",
+        ),
+        backfill="backfill_product_activity",
+    ),
+    # conditional reads compare max(last_updated)
+    SchemaUpgrade(
+        "ix_stock_levels_last_updated",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_brands_last_updated"
+            " ON brands (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_categories_last_updated"
+            " ON categories (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_employees_last_updated"
+            " ON employees (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_employee_sessions_last_updated"
+            " ON employee_sessions (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_products_last_updated"
+            " ON products (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_purchase_orders_last_updated"
+            " ON purchase_orders (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_purchases_last_updated"
+            " ON purchases (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_sale_orders_last_updated"
+            " ON sale_orders (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_sales_last_updated"
+            " ON sales (last_updated)",
+            "CREATE INDEX IF NOT EXISTS ix_stock_levels_last_updated"
+            " ON stock_levels (last_updated)",
+        ),
+    ),
+    # null costs fall back to the product's unit cost price when read
+    SchemaUpgrade(
+        "products.average_unit_cost",
+        (
+            "ALTER TABLE products"
+            " ADD COLUMN IF NOT EXISTS average_unit_cost FLOAT",
+        ),
+    ),
+    SchemaUpgrade(
+        "sales.cost_of_goods",
+        (
+            "ALTER TABLE sales"
+            " ADD COLUMN IF NOT EXISTS unit_cost FLOAT,"
+            " ADD COLUMN IF NOT EXISTS cost_of_goods FLOAT",
+        ),
+    ),
+    # barcode scans that miss the in-memory index
+    SchemaUpgrade(
+        "ix_products_barcode",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_products_barcode"
+            " ON products (barcode)",
+        ),
+    ),
+    SchemaUpgrade(
+        "ix_products_category_id",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_products_brand_id"
+            " ON products (brand_id)",
+            "CREATE INDEX IF NOT EXISTS ix_products_category_id"
+            " ON products (category_id)",
+        ),
+    ),
+    SchemaUpgrade(
+        "sale_orders.paid_amount",
+        (
+            "ALTER TABLE sale_orders"
+            " ADD COLUMN IF NOT EXISTS line_count INTEGER NOT NULL DEFAULT 0,"
+            " ADD COLUMN IF NOT EXISTS total_quantity INTEGER NOT NULL DEFAULT 0,"
+            " ADD COLUMN IF NOT EXISTS total_amount FLOAT NOT NULL DEFAULT 0,"
+            " ADD COLUMN IF NOT EXISTS paid_amount FLOAT NOT NULL DEFAULT 0",
+        ),
+        backfill="backfill_order_totals",
+    ),
+    SchemaUpgrade(
+        "purchase_orders.paid_amount",
+        (
+            "ALTER TABLE purchase_orders"
+            " ADD COLUMN IF NOT EXISTS line_count INTEGER NOT NULL DEFAULT 0,"
+            " ADD COLUMN IF NOT EXISTS total_quantity INTEGER NOT NULL DEFAULT 0,"
+            " ADD COLUMN IF NOT EXISTS total_amount FLOAT NOT NULL DEFAULT 0,"
+            " ADD COLUMN IF NOT EXISTS paid_amount FLOAT NOT NULL DEFAULT 0",
+        ),
+        backfill="backfill_order_totals",
+    ),
+    # transactional list filters and sort keys
+    SchemaUpgrade(
+        "ix_purchases_total_cost_price",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_sales_created_at"
+            " ON sales (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_sales_payment_status_created_at"
+            " ON sales (payment_status, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_sales_employee_id_created_at"
+            " ON sales (employee_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_sales_product_id_created_at"
+            " ON sales (product_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_sales_sale_order_id"
+            " ON sales (sale_order_id)",
+            "CREATE INDEX IF NOT EXISTS ix_sales_quantity"
+            " ON sales (quantity)",
+            "CREATE INDEX IF NOT EXISTS ix_sales_total_selling_price"
+            " ON sales (total_selling_price)",
+            "CREATE INDEX IF NOT EXISTS ix_purchases_created_at"
+            " ON purchases (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_purchases_item_status_created_at"
+            " ON purchases (item_status, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_purchases_payment_status_created_at"
+            " ON purchases (payment_status, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_purchases_product_id_created_at"
+            " ON purchases (product_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_purchases_purchase_order_id"
+            " ON purchases (purchase_order_id)",
+            "CREATE INDEX IF NOT EXISTS ix_purchases_quantity"
+            " ON purchases (quantity)",
+            "CREATE INDEX IF NOT EXISTS ix_purchases_total_cost_price"
+            " ON purchases (total_cost_price)",
+            "CREATE INDEX IF NOT EXISTS ix_sale_orders_created_at"
+            " ON sale_orders (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_sale_orders_status_created_at"
+            " ON sale_orders (status, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_sale_orders_employee_id_created_at"
+            " ON sale_orders (employee_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_purchase_orders_created_at"
+            " ON purchase_orders (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_purchase_orders_status_created_at"
+            " ON purchase_orders (status, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_purchase_orders_employee_id_created_at"
+            " ON purchase_orders (employee_id, created_at)",
+        ),
+    ),
+    # products stored before keep their image_filepath until re-uploaded
+    SchemaUpgrade(
+        "products.image_hash",
+        (
+            "ALTER TABLE products"
+            " ADD COLUMN IF NOT EXISTS image_hash VARCHAR(64)",
+            "CREATE INDEX IF NOT EXISTS ix_products_image_hash"
+            " ON products (image_hash)",
+        ),
+    ),
+    SchemaUpgrade(
+        "jobs.heartbeat_at",
+        (
+            "ALTER TABLE jobs"
+            " ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITHOUT TIME ZONE",
+        ),
+    ),
+    SchemaUpgrade(
+        "employees.failed_logins",
+        (
+            "ALTER TABLE employees"
+            " ADD COLUMN IF NOT EXISTS failed_logins INTEGER NOT NULL DEFAULT 0,"
+            " ADD COLUMN IF NOT EXISTS login_blocked_until TIMESTAMP WITHOUT TIME ZONE",
+        ),
+    ),
+    # sessions created before expires_at end SESSION_DURATION after login
+    SchemaUpgrade(
+        "employee_sessions.expires_at",
+        (
+            "ALTER TABLE employee_sessions"
+            " ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITHOUT TIME ZONE,"
+            " ADD COLUMN IF NOT EXISTS user_agent VARCHAR(300),"
+            " ADD COLUMN IF NOT EXISTS ip_address VARCHAR(45)",
+            "UPDATE employee_sessions SET expires_at ="
+            " coalesce(created_at, now())"
+            f" + interval '{SESSION_DURATION} seconds'"
+            " WHERE expires_at IS NULL",
+            "ALTER TABLE employee_sessions ALTER COLUMN expires_at SET NOT NULL",
+            "CREATE INDEX IF NOT EXISTS ix_employee_sessions_expires_at"
+            " ON employee_sessions (expires_at)",
+            "CREATE INDEX IF NOT EXISTS"
+            " ix_employee_sessions_employee_id_expires_at"
+            " ON employee_sessions (employee_id, expires_at)",
+        ),
+    ),
+    # filled from the sales made before the rollup existed
+    SchemaUpgrade(
+        "sales_daily_rollup",
+        (),
+        backfill="rebuild_sales_rollup",
+    ),
+    # sales made before the snapshot take their product's current brand
+    # and category, as the rollup rows they were counted in did
+    SchemaUpgrade(
+        "sales.category_id",
+        (
+            "ALTER TABLE sales"
+            " ADD COLUMN IF NOT EXISTS brand_id VARCHAR(36),"
+            " ADD COLUMN IF NOT EXISTS category_id VARCHAR(36)",
+            "UPDATE sales SET brand_id = products.brand_id,"
+            " category_id = products.category_id"
+            " FROM products WHERE products.id = sales.product_id",
+        ),
+    ),
+]
+
+
+def is_applied(
+    connection: Connection, marker: str, tables: set[str]
+) -> bool:
+    """
+    Whether the column ("table.column"), index or table named by
+    marker exists. Tables are looked up in tables, the names found
+    before create_all ran; a database with none is new and needs no
+    upgrade.
+    """
+    if marker in Base.metadata.tables:
+        return not tables or marker in tables
+
+    if "." not in marker:
+        return connection.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": marker}
+        ).scalar_one()
+
+    table, column = marker.split(".")
+    return connection.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.columns"
+            " WHERE table_schema = current_schema()"
+            " AND table_name = :table AND column_name = :column)"
+        ),
+        {"table": table, "column": column},
+    ).scalar_one()
+
+
+def upgrade_schema(connection: Connection, tables: set[str]) -> list[str]:
+    """
+    Runs the upgrades the database is missing, in order, and queues
+    their backfills. tables holds the table names that existed before
+    create_all. Returns the markers of the upgrades run.
+    """
+    applied = []
+    backfills: set[str] = set()
+    for upgrade in SCHEMA_UPGRADES:
+        if is_applied(connection, upgrade.marker, tables):
+            continue
+
+        logger.warning(f"Upgrading schema: {upgrade.marker}")
+        for statement in upgrade.statements:
+            connection.execute(text(statement))
+        if upgrade.backfill and upgrade.backfill not in backfills:
+            backfills.add(upgrade.backfill)
+            connection.execute(
+                insert(Job).values(
+                    id=str(uuid4()),
+                    kind=upgrade.backfill,
+                    status=JobStatus.queued,
+                    payload={},
+                    attempts=0,
+                )
+            )
+        applied.append(upgrade.marker)
+    return applied
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""
+Background job model.
+"""
+
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import mapped_column, relationship
+from sqlalchemy import (
+    DateTime, Enum, ForeignKey, Index, Integer, String, Text, text
+)
+import enum
+
+from models.basemodel import Base, BaseModel
+
+
+class JobStatus(str, enum.Enum):
+    """Lifecycle of a background job."""
+
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class Job(BaseModel, Base):
+    """
+    A unit of background work, claimed by workers with
+    SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # the dequeue scans only queued rows, oldest first
+        Index(
+            "ix_jobs_queued_created_at",
+            "created_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        Index("ix_jobs_status_started_at", "status", "started_at"),
+    )
+
+    kind = mapped_column(String(50), nullable=False)
+    status = mapped_column(
+        Enum(JobStatus, name="job_status", create_type=True),
+        nullable=False,
+        default=JobStatus.queued,
+    )
+    payload = mapped_column(JSONB, nullable=False, default=dict)
+    result = mapped_column(JSONB)
+    error = mapped_column(Text)
+    attempts = mapped_column(Integer, nullable=False, default=0)
+    started_at = mapped_column(DateTime)
+    # refreshed by the worker running the job
+    heartbeat_at = mapped_column(DateTime)
+    finished_at = mapped_column(DateTime)
+    employee_id = mapped_column(
+        String(36),
+        ForeignKey("employees.id", ondelete="SET NULL")
+    )
+
+    added_by = relationship("Employee", backref="jobs")
@@ -5,7 +5,7 @@ Product model.
 """
 
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Float, Integer, Boolean
+from sqlalchemy import ForeignKey, String, Float, Integer, Boolean, DateTime
 
 from models.basemodel import Base, BaseModel
 
@@ -15,16 +15,19 @@ class Product(BaseModel, Base):
 
     __tablename__ = "products"
 
-    barcode = mapped_column(String(20))
+    barcode = mapped_column(String(20), index=True)
     image_filepath = mapped_column(String(300), unique=True)
+    image_hash = mapped_column(String(64), index=True)
     name = mapped_column(String(500), nullable=False, unique=True)
     category_id = mapped_column(
         String(36),
-        ForeignKey("categories.id", ondelete="SET NULL")
+        ForeignKey("categories.id", ondelete="SET NULL"),
+        index=True,
     )
     brand_id = mapped_column(
         String(36),
-        ForeignKey("brands.id", ondelete="SET NULL")
+        ForeignKey("brands.id", ondelete="SET NULL"),
+        index=True,
     )
     quantity_in_stock = mapped_column(Integer, default=0)
     unit_cost_price = mapped_column(Float, default=0.00)
@@ -32,6 +35,7 @@ class Product(BaseModel, Base):
     ordering_cost = mapped_column(Float, default=0.00)
     lead_time = mapped_column(Integer)
     holding_cost_rate = mapped_column(Float, default=0.20)
+    average_unit_cost = mapped_column(Float)
     average_unit_cost_90d = mapped_column(Float)
     average_ordering_cost_90d = mapped_column(Float)
     average_daily_demand_90d = mapped_column(Float)
@@ -40,6 +44,8 @@ class Product(BaseModel, Base):
     economic_ordering_quantity = mapped_column(Integer)
     is_below_reorder = mapped_column(Boolean)
     is_below_safety_stock = mapped_column(Boolean)
+    last_sold_at = mapped_column(DateTime, index=True)
+    last_received_at = mapped_column(DateTime, index=True)
     employee_id = mapped_column(
         String(36),
         ForeignKey("employees.id", ondelete="SET NULL")
@@ -5,7 +5,7 @@ Purchase order item model and enums.
 """
 
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Integer, Float, Enum
+from sqlalchemy import ForeignKey, String, Integer, Float, Enum, Index
 import enum
 
 from models.basemodel import Base, BaseModel
@@ -31,6 +31,17 @@ class Purchase(BaseModel, Base):
     """Represents an individual item in a purchase order."""
 
     __tablename__ = "purchases"
+    # list filters: equality columns first, then the created_at range
+    __table_args__ = (
+        Index("ix_purchases_created_at", "created_at"),
+        Index("ix_purchases_item_status_created_at", "item_status", "created_at"),
+        Index("ix_purchases_payment_status_created_at", "payment_status", "created_at"),
+        Index("ix_purchases_product_id_created_at", "product_id", "created_at"),
+        Index("ix_purchases_purchase_order_id", "purchase_order_id"),
+        # the other sortable columns
+        Index("ix_purchases_quantity", "quantity"),
+        Index("ix_purchases_total_cost_price", "total_cost_price"),
+    )
 
     purchase_order_id = mapped_column(
         String(36),
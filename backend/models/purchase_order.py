@@ -5,7 +5,7 @@ Purchase order model.
 """
 
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Enum, Float
+from sqlalchemy import ForeignKey, String, Enum, Float, Index, Integer
 import enum
 
 from models.basemodel import Base, BaseModel
@@ -28,6 +28,12 @@ class PurchaseOrder(BaseModel, Base):
     """
 
     __tablename__ = "purchase_orders"
+    # list filters: equality columns first, then the created_at range
+    __table_args__ = (
+        Index("ix_purchase_orders_created_at", "created_at"),
+        Index("ix_purchase_orders_status_created_at", "status", "created_at"),
+        Index("ix_purchase_orders_employee_id_created_at", "employee_id", "created_at"),
+    )
 
     supplier_name = mapped_column(String(200), unique=True)
     status = mapped_column(
@@ -40,6 +46,12 @@ class PurchaseOrder(BaseModel, Base):
         String(36),
         ForeignKey("employees.id", ondelete="SET NULL")
     )
+    # denormalized from the order's items, kept in sync on every item
+    # write by DBStorage.refresh_order_totals
+    line_count = mapped_column(Integer, nullable=False, default=0)
+    total_quantity = mapped_column(Integer, nullable=False, default=0)
+    total_amount = mapped_column(Float, nullable=False, default=0.00)
+    paid_amount = mapped_column(Float, nullable=False, default=0.00)
 
     added_by = relationship("Employee", backref="purchase_orders_added")
     purchases = relationship(
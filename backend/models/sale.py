@@ -5,7 +5,7 @@ Sale model.
 """
 
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Integer, Float, Enum
+from sqlalchemy import ForeignKey, String, Integer, Float, Enum, Index
 import enum
 
 from models.basemodel import Base, BaseModel
@@ -23,6 +23,17 @@ class Sale(BaseModel, Base):
     """Represents a product sale record."""
 
     __tablename__ = "sales"
+    # list filters: equality columns first, then the created_at range
+    __table_args__ = (
+        Index("ix_sales_created_at", "created_at"),
+        Index("ix_sales_payment_status_created_at", "payment_status", "created_at"),
+        Index("ix_sales_employee_id_created_at", "employee_id", "created_at"),
+        Index("ix_sales_product_id_created_at", "product_id", "created_at"),
+        Index("ix_sales_sale_order_id", "sale_order_id"),
+        # the other sortable columns
+        Index("ix_sales_quantity", "quantity"),
+        Index("ix_sales_total_selling_price", "total_selling_price"),
+    )
 
     sale_order_id = mapped_column(
         String(36), ForeignKey("sale_orders.id", ondelete="SET NULL")
@@ -33,6 +44,11 @@ class Sale(BaseModel, Base):
     quantity = mapped_column(Integer, nullable=False)
     unit_selling_price = mapped_column(Float, nullable=False)
     total_selling_price = mapped_column(Float, nullable=False)
+    unit_cost = mapped_column(Float)
+    cost_of_goods = mapped_column(Float)
+    # the product's brand and category when sold, for the daily rollup
+    brand_id = mapped_column(String(36))
+    category_id = mapped_column(String(36))
     payment_status = mapped_column(
         Enum(SalePaymentStatus, name="sale_payment_status", create_type=True),
         nullable=False
@@ -5,7 +5,7 @@ Purchase order model.
 """
 
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Enum
+from sqlalchemy import ForeignKey, String, Enum, Float, Index, Integer
 import enum
 
 from models.basemodel import Base, BaseModel
@@ -23,6 +23,12 @@ class SaleOrder(BaseModel, Base):
     """Represents a sale order record."""
 
     __tablename__ = "sale_orders"
+    # list filters: equality columns first, then the created_at range
+    __table_args__ = (
+        Index("ix_sale_orders_created_at", "created_at"),
+        Index("ix_sale_orders_status_created_at", "status", "created_at"),
+        Index("ix_sale_orders_employee_id_created_at", "employee_id", "created_at"),
+    )
 
     status = mapped_column(
         Enum(SaleOrderStatus, name="sale_order_status", create_type=True),
@@ -32,6 +38,12 @@ class SaleOrder(BaseModel, Base):
         String(36),
         ForeignKey("employees.id", ondelete="SET NULL")
     )
+    # denormalized from the order's items, kept in sync on every item
+    # write by DBStorage.refresh_order_totals
+    line_count = mapped_column(Integer, nullable=False, default=0)
+    total_quantity = mapped_column(Integer, nullable=False, default=0)
+    total_amount = mapped_column(Float, nullable=False, default=0.00)
+    paid_amount = mapped_column(Float, nullable=False, default=0.00)
 
     added_by = relationship("Employee", backref="sale_orders_added")
     sales = relationship(
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+"""
+Daily sales rollup model.
+"""
+
+from sqlalchemy.orm import mapped_column
+from sqlalchemy import Date, Float, Integer, String, UniqueConstraint
+
+from models.basemodel import Base, BaseModel
+
+
+class SalesDailyRollup(BaseModel, Base):
+    """
+    Paid sales aggregated per day, product, brand, category and employee.
+    Kept in sync on every sale write so reports never scan `sales`.
+    """
+
+    __tablename__ = "sales_daily_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "sale_date",
+            "product_id",
+            "brand_id",
+            "category_id",
+            "employee_id",
+            name="uq_sales_daily_rollup_dimensions",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    sale_date = mapped_column(Date, nullable=False)
+    product_id = mapped_column(String(36))
+    brand_id = mapped_column(String(36))
+    category_id = mapped_column(String(36))
+    employee_id = mapped_column(String(36))
+    quantity = mapped_column(Integer, nullable=False, default=0)
+    revenue = mapped_column(Float, nullable=False, default=0.00)
+    cost = mapped_column(Float, nullable=False, default=0.00)
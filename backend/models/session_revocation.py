@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+"""
+Session revocation model.
+"""
+
+from sqlalchemy.orm import mapped_column
+from sqlalchemy import Integer, String, UniqueConstraint
+
+from models.basemodel import Base, BaseModel
+
+
+class SessionRevocation(BaseModel, Base):
+    """
+    Per-employee revocation generation for signed session tokens.
+    Tokens carry the generation they were issued at; bumping it
+    invalidates every token issued before. Only employees who have
+    logged out or been changed have a row, so the table stays small
+    enough for each worker to cache whole.
+    """
+
+    __tablename__ = "session_revocations"
+    __table_args__ = (
+        UniqueConstraint("employee_id", name="uq_session_revocations_employee_id"),
+    )
+
+    # no foreign key: a deleted employee's row must outlive them
+    employee_id = mapped_column(String(36), nullable=False)
+    generation = mapped_column(Integer, nullable=False, default=0)
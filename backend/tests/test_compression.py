@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for response compression.
+"""
+
+from flask import Flask, Response, jsonify
+import gzip
+import json
+import unittest
+
+from api.v1.utils.compression import COMPRESS_MIN_SIZE, compress_response
+
+
+class TestCompression(unittest.TestCase):
+    """
+    Tests the gzip/brotli after-request hook.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Sets up a bare app with large, small and streamed routes.
+        """
+        app = Flask(__name__)
+        app.after_request(compress_response)
+
+        @app.route("/large")
+        def large():  # type: ignore
+            return jsonify([{"name": "paracetamol 500mg"}] * 200)
+
+        @app.route("/small")
+        def small():  # type: ignore
+            return jsonify({"name": "paracetamol"})
+
+        @app.route("/stream")
+        def stream():  # type: ignore
+            rows = (f"paracetamol,{i}\n" for i in range(500))
+            return Response(rows, mimetype="text/csv")
+
+        @app.route("/image")
+        def image():  # type: ignore
+            return Response(b"\xff\xd8" * 1000, mimetype="image/jpeg")
+
+        cls.client = app.test_client()
+
+    def test_large_response_compressed(self):
+        """
+        Tests large JSON bodies are gzipped when the client accepts it.
+        """
+        response = self.client.get(
+            "/large", headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        self.assertIn("Accept-Encoding", response.headers.get("Vary"))
+        body = json.loads(gzip.decompress(response.get_data()))
+        self.assertEqual(len(body), 200)
+
+        response = self.client.get("/large")
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+
+    def test_small_and_binary_responses_untouched(self):
+        """
+        Tests bodies under the threshold and images are not compressed.
+        """
+        response = self.client.get(
+            "/small", headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertLess(len(response.get_data()), COMPRESS_MIN_SIZE)
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+
+        response = self.client.get(
+            "/image", headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+
+    def test_streamed_response_compressed(self):
+        """
+        Tests generator responses are compressed chunk by chunk.
+        """
+        response = self.client.get(
+            "/stream", headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        self.assertIsNone(response.headers.get("Content-Length"))
+        lines = gzip.decompress(response.get_data()).decode().splitlines()
+        self.assertEqual(len(lines), 500)
+        self.assertEqual(lines[-1], "paracetamol,499")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
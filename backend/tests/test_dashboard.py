@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the Dashboard API endpoints.
+"""
+
+from flask import Flask
+from flask.testing import FlaskClient
+from typing import Any
+import logging
+import unittest
+
+from api.v1.app import create_app
+from api.v1.views.dashboard import dashboard_cache
+from models.employee import Employee
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestDashboard(unittest.TestCase):
+    """
+    Tests the dashboard summary endpoint.
+
+    GET - "/api/v1/dashboard/summary"
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Sets up the test app and logs in an admin user.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+        cls.employee_data: dict[str, Any] = {
+            "first_name": "Range",
+            "last_name": "Rover",
+            "username": "RRover",
+            "email": "rangerover@gmail.com",
+            "password": "Ranger1234",
+            "home_address": "No. 1 sporty street",
+            "role": "Manager",
+            "is_admin": True,
+        }
+
+        cls.client.post(
+            "/api/v1/register",
+            json=cls.employee_data,
+        )
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={"email_or_username": "RRover", "password": "Ranger1234"},
+        )
+        cls.employee_id = response.get_json().get("employee_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = (
+                session_cookie.split(";", 1)[0].split("=", 1)
+            )
+            cls.client.set_cookie(cookie_name, session_id)
+
+    def setUp(self) -> None:
+        """
+        Clears the cached summary before each test.
+        """
+        dashboard_cache.invalidate()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the admin user created for the test class.
+        """
+        from api.v1.utils.utility import get_obj, DatabaseOp
+
+        db = DatabaseOp()
+
+        employee = get_obj(Employee, cls.employee_id)
+        if not employee:
+            raise ValueError("employee not found")
+        employee.delete()
+        db.commit()
+
+    def test_get_dashboard_summary(self):
+        """
+        Tests the summary contains every dashboard aggregate.
+        """
+        response = self.client.get("/api/v1/dashboard/summary")
+        self.assertEqual(response.status_code, 200)
+
+        summary = response.get_json()
+        for key in [
+            "today_revenue",
+            "today_sales_count",
+            "open_sale_orders",
+            "open_purchase_orders",
+            "low_stock_products",
+            "top_sellers",
+        ]:
+            self.assertIn(key, summary)
+        self.assertIsInstance(summary["top_sellers"], list)
+
+    def test_dashboard_summary_is_cached(self):
+        """
+        Tests repeated calls within the TTL reuse one computation.
+        """
+        first = self.client.get("/api/v1/dashboard/summary").get_json()
+        second = self.client.get("/api/v1/dashboard/summary").get_json()
+        self.assertEqual(first["generated_at"], second["generated_at"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for request instrumentation and the diagnostics endpoint.
+"""
+
+from flask import Flask
+from flask.testing import FlaskClient
+from typing import Any
+import unittest
+
+from api.v1.app import create_app
+from api.v1.utils import instrumentation
+from models import storage
+from models.employee import Employee
+
+
+class TestDiagnostics(unittest.TestCase):
+    """
+    Tests the Server-Timing header and the slow request buffer.
+
+    GET - "/api/v1/diagnostics/slow_requests"
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Sets up the test app and logs in an admin user.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+        cls.employee_data: dict[str, Any] = {
+            "first_name": "Slow",
+            "last_name": "Poke",
+            "username": "SPoke",
+            "email": "slowpoke@gmail.com",
+            "password": "Sloth1234",
+            "home_address": "No. 9 tortoise lane",
+            "role": "Manager",
+            "is_admin": True,
+        }
+        cls.client.post("/api/v1/register", json=cls.employee_data)
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={"email_or_username": "SPoke", "password": "Sloth1234"},
+        )
+        cls.employee_id = response.get_json().get("employee_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = (
+                session_cookie.split(";", 1)[0].split("=", 1)
+            )
+            cls.client.set_cookie(cookie_name, session_id)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the admin user created for the test class.
+        """
+        employee = storage.get_obj_by_id(Employee, cls.employee_id)
+        if employee:
+            storage.delete(employee)
+        storage.save()
+
+    def tearDown(self) -> None:
+        """
+        Restores the slow request threshold and empties the buffer.
+        """
+        instrumentation.SLOW_REQUEST_MS = 500
+        instrumentation.slow_requests.clear()
+
+    def get_timings(self, header: str) -> dict[str, str]:
+        """
+        Maps each Server-Timing metric name to its parameters.
+        """
+        return dict(
+            metric.strip().split(";", 1) for metric in header.split(",")
+        )
+
+    def test_server_timing(self):
+        """
+        Tests responses carry database, serialization and total times.
+        """
+        response = self.client.get(
+            f"/api/v1/employees?ids={self.employee_id}"
+        )
+        self.assertEqual(response.status_code, 200)
+        timings = self.get_timings(response.headers["Server-Timing"])
+        self.assertIn("db", timings)
+        self.assertIn("serialize", timings)
+        self.assertIn("total", timings)
+        self.assertNotIn('desc="0 statements"', timings["db"])
+
+        response = self.app.test_client().get("/api/v1/employees/10/1")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("total", response.headers["Server-Timing"])
+
+    def test_slow_requests(self):
+        """
+        Tests requests over the threshold are kept with their SQL.
+        """
+        self.client.get(f"/api/v1/employees?ids={self.employee_id}")
+        response = self.client.get("/api/v1/diagnostics/slow_requests")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["requests"], [])
+
+        instrumentation.SLOW_REQUEST_MS = 0
+        self.client.get(f"/api/v1/employees?ids={self.employee_id}")
+        self.client.get("/api/v1/employees/10/1")
+        response = self.client.get(
+            "/api/v1/diagnostics/slow_requests?limit=1"
+        )
+        self.assertEqual(response.status_code, 200)
+        requests = response.get_json()["requests"]
+        self.assertEqual(len(requests), 1)
+        self.assertTrue(requests[0]["path"].startswith("/api/v1/employees"))
+        self.assertEqual(requests[0]["status"], 200)
+        self.assertEqual(len(requests[0]["sql"]), requests[0]["statements"])
+        self.assertIn("SELECT", requests[0]["sql"][0]["statement"])
+
+        response = self.app.test_client().get(
+            "/api/v1/diagnostics/slow_requests"
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@
 Unit tests for the Employee API endpoints.
 """
 
+from datetime import datetime, timedelta
 from flask import Flask
 from flask.testing import FlaskClient
 from typing import Any
@@ -11,6 +12,8 @@ import logging
 import unittest
 
 from api.v1.app import create_app
+from api.v1.auth.passwords import BCRYPT_LOG_ROUNDS
+from models import storage
 from models.employee import Employee
 
 
@@ -120,6 +123,24 @@ class TestEmployees(unittest.TestCase):
         self.assertEqual(self.response.status_code, 201)
         self.assertNotIn("employee_session", self.response.get_json())
 
+    def test_register_employee_weak_password(self):
+        """
+        Tests a password failing the complexity check is a 400, not a 500.
+        """
+        response = self.client.post(
+            "/api/v1/register",
+            json={
+                **self.employee_data,
+                "username": "WPassword",
+                "email": "weakpassword@gmail.com",
+                "password": "weakpass1",
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(
+            "Must contain an uppercase", response.get_data(as_text=True)
+        )
+
     def test_get_all_employees(self):
         """
         Tests retrieval of all employees with pagination.
@@ -198,6 +219,71 @@ class TestEmployees(unittest.TestCase):
         employee = get_obj(Employee, employee_id)
         self.assertIsNone(employee)
 
+    def login(self, password: str):
+        """
+        Logs in the employee created for the test from a fresh client.
+        """
+        return self.app.test_client().post(
+            "/api/v1/auth_session/login",
+            json={"email_or_username": "FWheels", "password": password},
+        )
+
+    def test_login_backoff(self):
+        """
+        Tests repeated wrong passwords block the account for a while,
+        and a successful login clears the count.
+        """
+        for _ in range(4):
+            self.assertEqual(self.login("Wrong1234").status_code, 401)
+
+        response = self.login(self.employee_data["password"])
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+
+        employee = storage.get_obj_by_id(Employee, self.employee_id)
+        self.assertEqual(employee.failed_logins, 4)
+
+        # the delay stays capped however long the failures run
+        employee.failed_logins = 5000
+        storage.save()
+        storage.record_failed_login(self.employee_id, 3, 1.0, 300.0)
+        storage.close()
+        employee = storage.get_obj_by_id(Employee, self.employee_id)
+        self.assertLessEqual(
+            employee.login_blocked_until,
+            datetime.now() + timedelta(seconds=300),
+        )
+        employee.login_blocked_until = None  # skip waiting it out
+        storage.save()
+
+        response = self.login(self.employee_data["password"])
+        self.assertEqual(response.status_code, 201)
+        storage.close()
+        employee = storage.get_obj_by_id(Employee, self.employee_id)
+        self.assertEqual(employee.failed_logins, 0)
+
+    def test_login_rehash(self):
+        """
+        Tests a password hashed at another bcrypt cost is rehashed at
+        the configured one on login.
+        """
+        import bcrypt
+
+        employee = storage.get_obj_by_id(Employee, self.employee_id)
+        employee.password = bcrypt.hashpw(
+            self.employee_data["password"].encode(), bcrypt.gensalt(4)
+        ).decode()
+        storage.save()
+
+        response = self.login(self.employee_data["password"])
+        self.assertEqual(response.status_code, 201)
+        storage.close()
+        employee = storage.get_obj_by_id(Employee, self.employee_id)
+        self.assertTrue(
+            employee.password.startswith(f"$2b${BCRYPT_LOG_ROUNDS:02d}$")
+        )
+        self.assertEqual(self.login(self.employee_data["password"]).status_code, 201)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -29,6 +29,7 @@ class TestFilterProducts(unittest.TestCase):
     GET - "/api/v1/categories/<category_id>/products/<int:page_size>/<int:page_num>"
     GET - "/api/v1/categories/<category_id>/brands/<brand_id>/products"
             "/<int:page_size>/<int:page_num>"
+    GET - "/api/v1/products/filter"
     """
 
     @classmethod
@@ -177,6 +178,45 @@ class TestFilterProducts(unittest.TestCase):
             self.assertEqual(product["category_name"], self.category["name"].lower())
             self.assertEqual(product["brand_name"], self.brand["name"].lower())
 
+    def test_filter_products(self):
+        """
+        Tests combined filters and facet counts per brand and category.
+        """
+        response = self.client.get(
+            "/api/v1/products/filter"
+            f"?brand_ids={self.brand_id}&category_ids={self.category_id}"
+            "&min_price=500&max_price=700&fields=name"
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(
+            [product["name"] for product in data["results"]],
+            ["ibuprofen", "panadol", "panadol extra"],
+        )
+        self.assertEqual(data["facets"]["total"], 3)
+
+        brand_facet = [
+            facet for facet in data["facets"]["brands"]
+            if facet["id"] == self.brand_id
+        ]
+        self.assertEqual(
+            brand_facet,
+            [{"id": self.brand_id, "name": "emzor", "count": 3}],
+        )
+        category_ids = [facet["id"] for facet in data["facets"]["categories"]]
+        self.assertIn(self.category_id, category_ids)
+
+        response = self.client.get(
+            f"/api/v1/products/filter?brand_ids={self.brand_id}"
+            "&in_stock=true&facets=false"
+        )
+        self.assertEqual(response.get_json(), {"results": []})
+
+        response = self.client.get(
+            "/api/v1/products/filter?min_price=700&max_price=500"
+        )
+        self.assertEqual(response.status_code, 400)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the background job endpoints and runner.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from flask import Flask
+from flask.testing import FlaskClient
+from io import BytesIO
+from PIL import Image
+from typing import Any
+import os
+import unittest
+
+from api.v1.app import create_app
+from api.v1.utils.jobs import run_pending_jobs
+from models import storage
+from models.employee import Employee
+from models.job import Job
+
+
+class TestJobs(unittest.TestCase):
+    """
+    Tests queueing jobs, running them and polling their status.
+
+    POST - "/api/v1/jobs"
+    GET - "/api/v1/jobs/<job_id>"
+    PUT - "/api/v1/products/<product_id>/image"
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Sets up the test app and logs in an admin user.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+        cls.employee_data: dict[str, Any] = {
+            "first_name": "Job",
+            "last_name": "Runner",
+            "username": "JRunner",
+            "email": "jobrunner@gmail.com",
+            "password": "Runner1234",
+            "home_address": "No. 3 queue street",
+            "role": "Manager",
+            "is_admin": True,
+        }
+        cls.client.post("/api/v1/register", json=cls.employee_data)
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={"email_or_username": "JRunner", "password": "Runner1234"},
+        )
+        cls.employee_id = response.get_json().get("employee_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = (
+                session_cookie.split(";", 1)[0].split("=", 1)
+            )
+            cls.client.set_cookie(cookie_name, session_id)
+
+        cls.executor = ThreadPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the jobs and admin user created for the test class.
+        """
+        cls.executor.shutdown()
+        for job in storage.all(Job, filters={"employee_id": cls.employee_id}):
+            storage.delete(job)
+        employee = storage.get_obj_by_id(Employee, cls.employee_id)
+        if employee:
+            storage.delete(employee)
+        storage.save()
+
+    def run_jobs(self) -> None:
+        """
+        Runs every queued job on threads, as a worker would.
+        """
+        while run_pending_jobs(self.executor):
+            pass
+
+    def test_maintenance_job(self):
+        """
+        Tests a queued maintenance job runs and reports its result.
+        """
+        response = self.client.post(
+            "/api/v1/jobs",
+            json={"kind": "backfill_order_totals", "batch_size": 100},
+        )
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()
+        self.assertEqual(job["status"], "queued")
+        self.assertEqual(job["payload"], {"batch_size": 100})
+        self.assertEqual(response.headers["Location"], job["status_url"])
+
+        response = self.client.get(job["status_url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+        self.run_jobs()
+        response = self.client.get(job["status_url"])
+        self.assertEqual(response.get_json()["status"], "succeeded")
+        self.assertEqual(response.get_json()["attempts"], 1)
+        self.assertIn("sale_orders", response.get_json()["result"])
+
+        response = self.client.post("/api/v1/jobs", json={"kind": "reindex"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            "/api/v1/jobs",
+            json={"kind": "rebuild_sales_rollup", "batch_days": 0},
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/v1/jobs/not-a-job")
+        self.assertEqual(response.status_code, 404)
+
+    def test_requeue_stale_jobs(self):
+        """
+        Tests only jobs without a recent heartbeat are requeued, and the
+        outcome of a run that was requeued is dropped.
+        """
+        response = self.client.post(
+            "/api/v1/jobs", json={"kind": "backfill_order_totals"}
+        )
+        job_id = response.get_json()["id"]
+        self.assertEqual([job.id for job in storage.claim_jobs(1)], [job_id])
+
+        storage.heartbeat_jobs([job_id])
+        self.assertEqual(storage.requeue_stale_jobs(timedelta(minutes=5)), 0)
+        self.assertEqual(storage.requeue_stale_jobs(timedelta(0)), 1)
+        self.assertFalse(storage.finish_job(job_id, 1, result={}))
+
+        self.run_jobs()
+        job = self.client.get(response.get_json()["status_url"]).get_json()
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["attempts"], 2)
+
+    def test_product_image_job(self):
+        """
+        Tests a product image is stored by a job, and a bad upload
+        fails the job.
+        """
+        brand_id = self.client.post(
+            "/api/v1/brands", json={"name": "Jobbrand"}
+        ).get_json()["id"]
+        category_id = self.client.post(
+            "/api/v1/categories", json={"name": "jobcategory"}
+        ).get_json()["id"]
+        product_id = self.client.post("/api/v1/products", json={
+            "name": "Queued image",
+            "brand_id": brand_id,
+            "category_id": category_id,
+            "unit_cost_price": 100,
+            "unit_selling_price": 150,
+        }).get_json()["id"]
+
+        try:
+            image_bytes = BytesIO()
+            Image.effect_noise((800, 600), 64).save(image_bytes, format="PNG")
+            png_bytes = image_bytes.getvalue()
+            response = self.client.put(
+                f"/api/v1/products/{product_id}/image",
+                data={"image": (BytesIO(png_bytes), "noise.png")},
+                content_type="multipart/form-data",
+            )
+            self.assertEqual(response.status_code, 202)
+            job = response.get_json()
+            staged_path = job["payload"]["staged_path"]
+            self.assertTrue(os.path.isfile(staged_path))
+
+            self.run_jobs()
+            job = self.client.get(job["status_url"]).get_json()
+            self.assertEqual(job["status"], "succeeded", job["error"])
+            self.assertFalse(os.path.exists(staged_path))
+
+            product = self.client.get(f"/api/v1/products/{product_id}").get_json()
+            self.assertEqual(product["image_hash"], job["result"]["image_hash"])
+
+            # a truncated PNG passes the mime check but does not decode
+            truncated = BytesIO(png_bytes[:len(png_bytes) // 2])
+            response = self.client.put(
+                f"/api/v1/products/{product_id}/image",
+                data={"image": (truncated, "bad.png")},
+                content_type="multipart/form-data",
+            )
+            self.assertEqual(response.status_code, 202)
+            self.run_jobs()
+            job = self.client.get(response.get_json()["status_url"]).get_json()
+            self.assertEqual(job["status"], "failed")
+            self.assertEqual(job["error"], "Uploaded file is not a valid image.")
+        finally:
+            self.client.delete(f"/api/v1/products/{product_id}")
+            self.client.delete(f"/api/v1/brands/{brand_id}")
+            self.client.delete(f"/api/v1/categories/{category_id}")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the fast JSON provider.
+"""
+
+from datetime import date, datetime
+from flask import Flask
+from unittest.mock import patch
+import unittest
+
+from api.v1.utils import json_provider
+from api.v1.utils.json_provider import FastJSONProvider
+from models.sale import SalePaymentStatus
+
+
+class TestFastJSONProvider(unittest.TestCase):
+    """
+    Tests datetimes and enums encode the same with and without orjson.
+    """
+
+    def setUp(self) -> None:
+        """
+        Sets up an app using the fast provider.
+        """
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+        self.data = {
+            "created_at": datetime(2026, 1, 2, 3, 4, 5, 600),
+            "sale_date": date(2026, 1, 2),
+            "payment_status": SalePaymentStatus.paid,
+            "quantity": 3,
+        }
+        self.expected = {
+            "created_at": "2026-01-02T03:04:05.000600",
+            "sale_date": "2026-01-02",
+            "payment_status": "paid",
+            "quantity": 3,
+        }
+
+    def check_round_trip(self) -> None:
+        """
+        Encodes the data through a response and decodes it again.
+        """
+        with self.app.app_context():
+            response = self.app.json.response(self.data)
+            self.assertEqual(response.mimetype, "application/json")
+            self.assertEqual(
+                self.app.json.loads(response.get_data()), self.expected
+            )
+            self.assertEqual(
+                self.app.json.loads(self.app.json.dumps(self.data)),
+                self.expected,
+            )
+
+    def test_orjson_encoding(self):
+        """
+        Tests encoding with orjson when it is installed.
+        """
+        if json_provider.orjson is None:
+            self.skipTest("orjson is not installed")
+        self.check_round_trip()
+
+    def test_stdlib_fallback(self):
+        """
+        Tests encoding falls back to the stdlib json module.
+        """
+        with patch.object(json_provider, "orjson", None):
+            self.check_round_trip()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the Prometheus metrics endpoint.
+"""
+
+from flask import Flask
+from flask.testing import FlaskClient
+from typing import Any
+import unittest
+
+from api.v1.app import create_app
+from api.v1.utils import metrics
+from models import storage
+from models.employee import Employee
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Tests request, cache, pool and job queue metrics.
+
+    GET - "/metrics"
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Sets up the test app and logs in an admin user.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+        cls.employee_data: dict[str, Any] = {
+            "first_name": "Prom",
+            "last_name": "Etheus",
+            "username": "PEtheus",
+            "email": "prometheus@gmail.com",
+            "password": "Scrape1234",
+            "home_address": "No. 15 exporter road",
+            "role": "Manager",
+            "is_admin": True,
+        }
+        cls.client.post("/api/v1/register", json=cls.employee_data)
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={"email_or_username": "PEtheus", "password": "Scrape1234"},
+        )
+        cls.employee_id = response.get_json().get("employee_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = (
+                session_cookie.split(";", 1)[0].split("=", 1)
+            )
+            cls.client.set_cookie(cookie_name, session_id)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the admin user created for the test class.
+        """
+        employee = storage.get_obj_by_id(Employee, cls.employee_id)
+        if employee:
+            storage.delete(employee)
+        storage.save()
+
+    def tearDown(self) -> None:
+        """
+        Leaves /metrics open again.
+        """
+        metrics.METRICS_TOKEN = None
+        metrics.METRICS_OPEN = True
+
+    def scrape(self) -> str:
+        """
+        Returns the metrics page, fetched without a session.
+        """
+        response = self.app.test_client().get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        return response.get_data(as_text=True)
+
+    def test_request_metrics(self):
+        """
+        Tests latency and status are recorded per endpoint.
+        """
+        self.client.get("/api/v1/dashboard/summary")
+        self.client.get("/api/v1/jobs/not-a-job")
+        body = self.scrape()
+
+        self.assertIn(
+            'pharmacy_http_requests_total{endpoint='
+            '"app_views.get_dashboard_summary",method="GET",status="200"}',
+            body,
+        )
+        self.assertIn(
+            'pharmacy_http_requests_total{endpoint="app_views.get_job",'
+            'method="GET",status="404"}',
+            body,
+        )
+        self.assertIn(
+            'pharmacy_http_request_duration_seconds_bucket{endpoint='
+            '"app_views.get_dashboard_summary",le="0.1",method="GET"}',
+            body,
+        )
+        self.assertIn("pharmacy_db_pool_size ", body)
+        self.assertIn(
+            'pharmacy_db_pool_connections{state="checked_out"}', body
+        )
+
+    def test_cache_and_queue_metrics(self):
+        """
+        Tests cache hits and misses and the job queue depth.
+        """
+        self.client.get("/api/v1/dashboard/summary")
+        self.client.get("/api/v1/dashboard/summary")
+        body = self.scrape()
+
+        self.assertIn(
+            'pharmacy_cache_lookups_total{cache="dashboard",result="hit"}',
+            body,
+        )
+        self.assertIn('pharmacy_jobs{status="queued"}', body)
+        self.assertIn('pharmacy_jobs{status="running"}', body)
+        self.assertIn("pharmacy_jobs_oldest_queued_age_seconds", body)
+
+    def test_metrics_token(self):
+        """
+        Tests METRICS_TOKEN makes scrapes send a bearer token.
+        """
+        metrics.METRICS_TOKEN = "scrape-secret"
+        client = self.app.test_client()
+        self.assertEqual(client.get("/metrics").status_code, 401)
+        response = client.get(
+            "/metrics", headers={"Authorization": "Bearer wrong"}
+        )
+        self.assertEqual(response.status_code, 401)
+        response = client.get(
+            "/metrics", headers={"Authorization": "Bearer scrape-secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_off_without_token(self):
+        """
+        Tests /metrics is not served without METRICS_TOKEN outside tests.
+        """
+        metrics.METRICS_OPEN = False
+        response = self.app.test_client().get("/metrics")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@
 Unit tests for the Product API endpoints.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask
 from flask.testing import FlaskClient
 from PIL import Image
@@ -13,7 +14,10 @@ import logging
 import unittest
 
 from api.v1.app import create_app
+from api.v1.utils.jobs import run_pending_jobs
+from models import storage
 from models.employee import Employee
+from models.job import Job
 from models.product import Product
 from models.brand import Brand
 from models.category import Category
@@ -29,6 +33,7 @@ class TestProducts(unittest.TestCase):
     POST - "/api/v1/products"
     GET - "/api/v1/products/<int:page_size>/<int:page_num>"
     GET - "/api/v1/products/<product_id>"
+    GET - "/api/v1/products/dead_stock"
     PUT - "/api/v1/products/<product_id>"
     DELETE - "/api/v1/products/<product_id>"
     """
@@ -128,6 +133,7 @@ class TestProducts(unittest.TestCase):
         """
         from api.v1.utils.utility import get_obj, DatabaseOp
 
+        self.run_jobs()
         self.client.delete(f"/api/v1/products/{self.product_id}")
 
         category = get_obj(Category, self.category_id)
@@ -152,12 +158,22 @@ class TestProducts(unittest.TestCase):
 
         db = DatabaseOp()
 
+        for job in storage.all(Job, filters={"employee_id": cls.employee_id}):
+            job.delete()
         employee = get_obj(Employee, cls.employee_id)
         if not employee:
             raise ValueError("employee not found")
         employee.delete()
         db.commit()
 
+    def run_jobs(self) -> None:
+        """
+        Runs every queued job, such as image uploads, as a worker would.
+        """
+        with ThreadPoolExecutor(1) as executor:
+            while run_pending_jobs(executor):
+                pass
+
     def test_register_products(self):
         """
         Tests successful product registration.
@@ -177,6 +193,87 @@ class TestProducts(unittest.TestCase):
             self.response.get_json().get("added_by"),
         )
 
+    def test_register_product_too_large(self):
+        """
+        Tests uploads over MAX_CONTENT_LENGTH are refused with 413.
+        """
+        max_content_length = self.app.config["MAX_CONTENT_LENGTH"]
+        self.app.config["MAX_CONTENT_LENGTH"] = 1024
+        try:
+            response = self.client.post(
+                "/api/v1/products",
+                data={"image": (io.BytesIO(b"\0" * 4096), "big.jpg")},
+                content_type="multipart/form-data",
+            )
+        finally:
+            self.app.config["MAX_CONTENT_LENGTH"] = max_content_length
+        self.assertEqual(response.status_code, 413)
+
+    def test_compress_large_image(self):
+        """
+        Tests large JPEGs are downscaled and compressed under the limit.
+        """
+        from api.v1.utils.utility import FileManager
+
+        noise = [Image.effect_noise((2400, 1800), 80) for _ in range(3)]
+        buf = io.BytesIO()
+        Image.merge("RGB", noise).save(buf, format="JPEG", quality=95)
+        file_bytes = buf.getvalue()
+
+        file_manager = FileManager()
+        self.assertGreater(len(file_bytes), file_manager.max_image_size)
+        _, image = file_manager.validate_file(file_bytes)
+        encoded = file_manager.encode_variants(image)
+
+        for variant, max_dimension in file_manager.variants.items():
+            img_bytes = encoded[f"{variant}.jpg"]
+            self.assertLessEqual(
+                img_bytes.getbuffer().nbytes, file_manager.max_image_size
+            )
+            compressed = Image.open(img_bytes)
+            self.assertEqual(compressed.format, "JPEG")
+            self.assertLessEqual(max(compressed.size), max_dimension)
+
+    def test_get_product_image(self):
+        """
+        Tests uploaded images are stored by a job and served as
+        cacheable variants.
+        """
+        job = self.response.get_json().get("image_job")
+        self.assertEqual(job["status"], "queued")
+        self.assertIsNone(self.response.get_json().get("image_hash"))
+
+        self.run_jobs()
+        job = self.client.get(job["status_url"]).get_json()
+        self.assertEqual(job["status"], "succeeded", job["error"])
+        image_hash = self.client.get(
+            f"/api/v1/products/{self.product_id}"
+        ).get_json().get("image_hash")
+        self.assertEqual(image_hash, job["result"]["image_hash"])
+
+        url = f"/api/v1/images/{image_hash}/thumb"
+        response = self.client.get(url, headers={"Accept": "image/jpeg"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "image/jpeg")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertLessEqual(max(Image.open(io.BytesIO(response.data)).size), 160)
+
+        etag = response.headers["ETag"]
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        from api.v1.utils.utility import FileManager
+        if FileManager.webp_enabled:
+            response = self.client.get(
+                url, headers={"Accept": "image/webp,image/*;q=0.8"}
+            )
+            self.assertEqual(response.mimetype, "image/webp")
+
+        response = self.client.get(f"/api/v1/images/{image_hash}/huge")
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get("/api/v1/images/../thumb")
+        self.assertEqual(response.status_code, 404)
+
     def test_get_all_products(self):
         """
         Tests retrieval of all products with pagination.
@@ -198,7 +295,187 @@ class TestProducts(unittest.TestCase):
             response.get_json().get("name"),
             self.product_data["name"].lower(),
         )
-        self.assertEqual(len(response.get_json()), 25)
+        self.assertEqual(len(response.get_json()), 29)
+
+    def test_get_product_not_modified(self):
+        """
+        Tests unchanged products are answered with 304 Not Modified.
+        """
+        url = f"/api/v1/products/{self.product_id}"
+        response = self.client.get(url)
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag)
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b"")
+
+        list_url = f"/api/v1/products/{5}/{1}"
+        list_etag = self.client.get(list_url).headers.get("ETag")
+        response = self.client.get(
+            list_url, headers={"If-None-Match": list_etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.client.put(url, json={"unit_selling_price": 400.00})
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers.get("ETag"), etag)
+
+        response = self.client.get(
+            list_url, headers={"If-None-Match": list_etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_product_sparse_fields(self):
+        """
+        Tests ?fields= limits the keys returned.
+        """
+        response = self.client.get(
+            f"/api/v1/products/{self.product_id}"
+            "?fields=name,quantity_in_stock,brand_name"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.get_json()),
+            {"id", "name", "quantity_in_stock", "brand_name"},
+        )
+
+        response = self.client.get(f"/api/v1/products/{5}/{1}?fields=name")
+        self.assertEqual(response.status_code, 200)
+        for product in response.get_json():
+            self.assertEqual(set(product), {"id", "name"})
+
+        response = self.client.get(
+            f"/api/v1/products/{self.product_id}?fields=image_filepath"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_many_products(self):
+        """
+        Tests fetching several products by id in request order.
+        """
+        response = self.client.get(
+            f"/api/v1/products?ids=missing-id,{self.product_id}&fields=name"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {
+            "results": [
+                {"id": self.product_id, "name": self.product_data["name"].lower()}
+            ],
+            "missing": ["missing-id"],
+        })
+
+        response = self.client.post(
+            "/api/v1/products/batch_get",
+            json={"ids": [self.product_id, self.product_id]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["results"]), 1)
+        self.assertEqual(response.get_json()["missing"], [])
+
+        response = self.client.get("/api/v1/products?ids=")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            "/api/v1/products/batch_get", json={"ids": [["a"], {"b": 1}]}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_product_by_barcode(self):
+        """
+        Tests barcode scans are answered from the product index,
+        including changes made after the index was built.
+        """
+        response = self.client.get("/api/v1/products/barcode/5012345678900")
+        self.assertEqual(response.status_code, 404)
+
+        self.client.put(
+            f"/api/v1/products/{self.product_id}",
+            json={"barcode": "5012345678900"},
+        )
+        response = self.client.get("/api/v1/products/barcode/5012345678900")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {
+            "id": self.product_id,
+            "name": self.product_data["name"].lower(),
+            "barcode": "5012345678900",
+            "unit_selling_price": self.product_data["unit_selling_price"],
+            "quantity_in_stock": 0,
+        })
+
+        response = self.client.post(
+            "/api/v1/products/barcode/batch_get",
+            json={"barcodes": ["5012345678900", "0000000000000"]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json()["results"][0]["id"], self.product_id
+        )
+        self.assertEqual(response.get_json()["missing"], ["0000000000000"])
+
+    def test_suggest_products(self):
+        """
+        Tests autocomplete matches name word prefixes and barcodes.
+        """
+        response = self.client.get("/api/v1/products/suggest?q=PARAC")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            self.product_id, [product["id"] for product in response.get_json()]
+        )
+
+        self.client.put(
+            f"/api/v1/products/{self.product_id}",
+            json={"name": "Emzor Paracetamol", "barcode": "5012345678911"},
+        )
+        for q in ("parac", "emzor para", "50123456789"):
+            response = self.client.get(f"/api/v1/products/suggest?q={q}")
+            self.assertIn(
+                self.product_id,
+                [product["id"] for product in response.get_json()],
+            )
+
+        response = self.client.get("/api/v1/products/suggest?q=cetamol")
+        self.assertNotIn(
+            self.product_id, [product["id"] for product in response.get_json()]
+        )
+
+        response = self.client.get("/api/v1/products/suggest?q=para&limit=0")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/v1/products/suggest")
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_dead_stock(self):
+        """
+        Tests idle in-stock products are reported as dead stock.
+        """
+        from datetime import datetime, timedelta
+        from models import storage
+
+        product = storage.get_obj_by_id(Product, self.product_id)
+        if not product:
+            raise ValueError("Product not found")
+        product.quantity_in_stock = 5
+        product.created_at = datetime.now() - timedelta(days=200)
+        product.last_sold_at = datetime.now() - timedelta(days=100)
+        storage.save()
+
+        response = self.client.get("/api/v1/products/dead_stock?days=90")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            self.product_id,
+            [product["id"] for product in response.get_json()]
+        )
+
+        response = self.client.get(
+            "/api/v1/products/dead_stock/50/1?days=180"
+        )
+        self.assertNotIn(
+            self.product_id,
+            [product["id"] for product in response.get_json() or []]
+        )
+
+        response = self.client.get("/api/v1/products/dead_stock?days=0")
+        self.assertEqual(response.status_code, 400)
 
     def test_update_product(self):
         """
@@ -236,6 +513,10 @@ class TestProducts(unittest.TestCase):
 
         )
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json()["image_job"]["payload"]["product_id"],
+            self.product_id
+        )
 
     def test_delete_product(self):
         """
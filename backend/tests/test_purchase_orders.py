@@ -121,7 +121,7 @@ class TestPurchaseOrders(unittest.TestCase):
             self.response.get_json().get("added_by"),
             self.employee_data["username"].lower(),
         )
-        self.assertEqual(len(self.response.get_json()), 9)
+        self.assertEqual(len(self.response.get_json()), 13)
 
     def test_get_all_orders(self):
         """
@@ -145,7 +145,7 @@ class TestPurchaseOrders(unittest.TestCase):
             response.get_json().get("added_by"),
             self.employee_data["username"].lower()
         )
-        self.assertEqual(len(response.get_json()), 11)
+        self.assertEqual(len(response.get_json()), 15)
         import json
         logger.debug(json.dumps(response.get_json(), indent=4))
 
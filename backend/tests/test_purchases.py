@@ -248,6 +248,17 @@ class TestPurchases(unittest.TestCase):
         self.assertIn("item_status", self.response.get_json())
         self.assertEqual(len(self.response.get_json()), 13)
 
+    def test_register_purchase_rejects_non_positive_quantity(self):
+        """
+        Tests that a purchase of zero or fewer items is rejected.
+        """
+        for quantity in (0, -3):
+            response = self.client.post(
+                "/api/v1/purchases",
+                json={**self.purchase, "quantity": quantity},
+            )
+            self.assertEqual(response.status_code, 400)
+
     def test_get_all_purchases(self):
         """
         Tests retrieval of all purchases with pagination.
@@ -298,6 +309,22 @@ class TestPurchases(unittest.TestCase):
         import json
         logger.debug(json.dumps(self.response.get_json(), indent=4))
 
+    def test_get_purchase_sparse_fields(self):
+        """
+        Tests ?fields= follows nested relationship paths.
+        """
+        response = self.client.get(
+            f"/api/v1/purchases/{self.purchase_id}"
+            "?fields=quantity,product,added_by"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {
+            "id": self.purchase_id,
+            "quantity": self.purchase["quantity"],
+            "product": self.product_data["name"].lower(),
+            "added_by": self.employee_data["username"].lower(),
+        })
+
     def test_update_purchase(self):
         """
         Tests updating purchase details.
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the Reports API endpoints.
+"""
+
+from flask import Flask
+from flask.testing import FlaskClient
+from typing import Any
+import logging
+import unittest
+
+from api.v1.app import create_app
+from models import storage
+from models.brand import Brand
+from models.category import Category
+from models.employee import Employee
+from models.product import Product
+from models.purchase_order import PurchaseOrder
+from models.sale_order import SaleOrder
+from models.sales_daily_rollup import SalesDailyRollup
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestReports(unittest.TestCase):
+    """
+    Tests the sales report endpoints.
+
+    GET - "/api/v1/reports/sales"
+    GET - "/api/v1/reports/margin"
+    GET - "/api/v1/reports/top_products"
+    GET - "/api/v1/reports/movers"
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Sets up the test app and logs in an admin user.
+        """
+        cls.app: Flask = create_app()
+        cls.client: FlaskClient = cls.app.test_client()
+
+        cls.employee_data: dict[str, Any] = {
+            "first_name": "Range",
+            "last_name": "Rover",
+            "username": "RRover",
+            "email": "rangerover@gmail.com",
+            "password": "Ranger1234",
+            "home_address": "No. 1 sporty street",
+            "role": "Manager",
+            "is_admin": True,
+        }
+
+        cls.client.post(
+            "/api/v1/register",
+            json=cls.employee_data,
+        )
+        response = cls.client.post(
+            "/api/v1/auth_session/login",
+            json={"email_or_username": "RRover", "password": "Ranger1234"},
+        )
+        cls.employee_id = response.get_json().get("employee_id")
+
+        session_cookie = response.headers.get("Set-Cookie")
+        if session_cookie:
+            cookie_name, session_id = (
+                session_cookie.split(";", 1)[0].split("=", 1)
+            )
+            cls.client.set_cookie(cookie_name, session_id)
+
+    def setUp(self) -> None:
+        """
+        Stocks a product and records a paid sale before each test.
+        """
+        brand_response = self.client.post(
+            "/api/v1/brands", json={"name": "Emzor"}
+        )
+        self.brand_id: str = brand_response.get_json().get("id")
+
+        category_response = self.client.post(
+            "/api/v1/categories", json={"name": "pain killers"}
+        )
+        self.category_id: str = category_response.get_json().get("id")
+
+        product_response = self.client.post(
+            "/api/v1/products",
+            json={
+                "name": "Paracetamol",
+                "brand_id": self.brand_id,
+                "category_id": self.category_id,
+                "unit_cost_price": 200,
+                "unit_selling_price": 350,
+            },
+        )
+        self.product_id: str = product_response.get_json().get("id")
+
+        purchase_order_response = self.client.post(
+            "/api/v1/purchase_orders", json={"ordering_cost": 3000}
+        )
+        self.purchase_order_id: str = (
+            purchase_order_response.get_json().get("id")
+        )
+        purchase_response = self.client.post(
+            "/api/v1/purchases",
+            json={
+                "product_id": self.product_id,
+                "purchase_order_id": self.purchase_order_id,
+                "quantity": 10,
+                "unit_cost_price": 200,
+                "total_cost_price": 2000,
+                "item_status": "supplied",
+                "payment_status": "paid",
+            },
+        )
+        self.purchase_id: str = purchase_response.get_json().get("id")
+
+        sale_order_response = self.client.post("/api/v1/sale_orders", json={})
+        self.sale_order_id: str = sale_order_response.get_json().get("id")
+
+        self.sale_data: dict[str, Any] = {
+            "product_id": self.product_id,
+            "sale_order_id": self.sale_order_id,
+            "quantity": 3,
+            "unit_selling_price": 350,
+            "total_selling_price": 1050,
+            "payment_status": "paid",
+        }
+        sale_response = self.client.post("/api/v1/sales", json=self.sale_data)
+        self.sale_id: str = sale_response.get_json().get("id")
+
+    def tearDown(self) -> None:
+        """
+        Deletes every record created for each test.
+        """
+        self.client.delete(f"/api/v1/sales/{self.sale_id}")
+        self.client.delete(f"/api/v1/purchases/{self.purchase_id}")
+
+        stock = storage.get_stock_obj(self.product_id)
+        if stock:
+            storage.delete(stock)
+
+        for rollup in storage.all(SalesDailyRollup):
+            if rollup.product_id == self.product_id:
+                storage.delete(rollup)
+
+        for cls, obj_id in [
+            (Product, self.product_id),
+            (Brand, self.brand_id),
+            (Category, self.category_id),
+            (SaleOrder, self.sale_order_id),
+            (PurchaseOrder, self.purchase_order_id),
+        ]:
+            obj = storage.get_obj_by_id(cls, obj_id)
+            if not obj:
+                raise ValueError(f"{cls.__name__} not found")
+            storage.delete(obj)
+        storage.save()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the admin user created for the test class.
+        """
+        from api.v1.utils.utility import get_obj, DatabaseOp
+
+        db = DatabaseOp()
+
+        employee = get_obj(Employee, cls.employee_id)
+        if not employee:
+            raise ValueError("employee not found")
+        employee.delete()
+        db.commit()
+
+    def get_product_row(self, response_json: dict[str, Any]) -> dict[str, Any]:
+        """
+        Returns the report row for the test product.
+        """
+        rows = [
+            row for row in response_json["results"]
+            if row["product_id"] == self.product_id
+        ]
+        self.assertEqual(len(rows), 1)
+        return rows[0]
+
+    def test_sales_report_by_product(self):
+        """
+        Tests a paid sale is reflected in the report.
+        """
+        response = self.client.get(
+            "/api/v1/reports/sales?granularity=month&group_by=product,brand"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        row = self.get_product_row(response.get_json())
+        self.assertEqual(row["quantity"], self.sale_data["quantity"])
+        self.assertEqual(row["revenue"], self.sale_data["total_selling_price"])
+        self.assertEqual(row["cost"], 3 * 200)
+        self.assertEqual(row["product_name"], "paracetamol")
+        self.assertEqual(row["brand_id"], self.brand_id)
+
+    def test_sales_report_tracks_updates(self):
+        """
+        Tests updating and deleting a sale adjusts the rollup.
+        """
+        self.client.put(
+            f"/api/v1/sales/{self.sale_id}",
+            json={"payment_status": "unpaid"},
+        )
+        response = self.client.get("/api/v1/reports/sales?group_by=product")
+        row = self.get_product_row(response.get_json())
+        self.assertEqual(row["quantity"], 0)
+        self.assertEqual(row["revenue"], 0)
+
+    def test_sales_rollup_keeps_sold_category(self):
+        """
+        Tests a sale stays in the category it was sold under after its
+        product moves to another category.
+        """
+        other_category_id = self.client.post(
+            "/api/v1/categories", json={"name": "antibiotics"}
+        ).get_json()["id"]
+        try:
+            self.client.put(
+                f"/api/v1/products/{self.product_id}",
+                json={"category_id": other_category_id},
+            )
+            self.client.put(
+                f"/api/v1/sales/{self.sale_id}",
+                json={"payment_status": "unpaid"},
+            )
+            response = self.client.get("/api/v1/reports/sales?group_by=category")
+            rows = {
+                row["category_id"]: row
+                for row in response.get_json()["results"]
+            }
+            self.assertEqual(rows[self.category_id]["quantity"], 0)
+            self.assertNotIn(other_category_id, rows)
+        finally:
+            self.client.put(
+                f"/api/v1/products/{self.product_id}",
+                json={"category_id": self.category_id},
+            )
+            self.client.delete(f"/api/v1/categories/{other_category_id}")
+
+    def test_product_activity_timestamps(self):
+        """
+        Tests sales and supplied purchases stamp the product.
+        """
+        product = storage.get_obj_by_id(Product, self.product_id)
+        if not product:
+            raise ValueError("Product not found")
+        storage.close()
+
+        product = storage.get_obj_by_id(Product, self.product_id)
+        self.assertIsNotNone(product.last_sold_at)
+        self.assertIsNotNone(product.last_received_at)
+
+    def test_margin_report(self):
+        """
+        Tests gross profit uses the cost stamped on the sale.
+        """
+        product = storage.get_obj_by_id(Product, self.product_id)
+        if not product:
+            raise ValueError("Product not found")
+        self.assertEqual(product.average_unit_cost, 200)
+
+        response = self.client.get(
+            "/api/v1/reports/margin?group_by=category"
+        )
+        self.assertEqual(response.status_code, 200)
+        rows = [
+            row for row in response.get_json()["results"]
+            if row["category_id"] == self.category_id
+        ]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["cost"], 3 * 200)
+        self.assertEqual(rows[0]["gross_profit"], 1050 - 600)
+
+    def test_average_unit_cost_on_receipt(self):
+        """
+        Tests a supplied purchase moves the weighted average unit cost.
+        """
+        response = self.client.post(
+            "/api/v1/purchases",
+            json={
+                "product_id": self.product_id,
+                "purchase_order_id": self.purchase_order_id,
+                "quantity": 10,
+                "unit_cost_price": 300,
+                "total_cost_price": 3000,
+                "item_status": "supplied",
+                "payment_status": "paid",
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.client.delete(f"/api/v1/purchases/{response.get_json()['id']}")
+
+        product = storage.get_obj_by_id(Product, self.product_id)
+        if not product:
+            raise ValueError("Product not found")
+        # 7 units left at 200 plus 10 new units at 300
+        self.assertAlmostEqual(
+            product.average_unit_cost, (7 * 200 + 10 * 300) / 17
+        )
+
+    def test_sales_report_invalid_query(self):
+        """
+        Tests invalid report parameters are rejected.
+        """
+        response = self.client.get("/api/v1/reports/sales?granularity=year")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get("/api/v1/reports/sales?group_by=supplier")
+        self.assertEqual(response.status_code, 400)
+
+    def test_top_products(self):
+        """
+        Tests the sold product is ranked this week, overall and per category.
+        """
+        from api.v1.views.reports import ranking_cache
+        ranking_cache.invalidate()
+
+        response = self.client.get(
+            "/api/v1/reports/top_products?window=week&metric=revenue&limit=50"
+        )
+        self.assertEqual(response.status_code, 200)
+        row = self.get_product_row(response.get_json())
+        self.assertEqual(row["revenue"], self.sale_data["total_selling_price"])
+        self.assertEqual(row["quantity"], self.sale_data["quantity"])
+
+        response = self.client.get(
+            "/api/v1/reports/top_products?partition_by=category&limit=1"
+        )
+        self.assertEqual(response.status_code, 200)
+        row = self.get_product_row(response.get_json())
+        self.assertEqual(row["category_id"], self.category_id)
+        self.assertEqual(row["rank"], 1)
+
+        response = self.client.get("/api/v1/reports/top_products?limit=500")
+        self.assertEqual(response.status_code, 400)
+
+    def test_product_movers(self):
+        """
+        Tests a new sale shows up as a week over week mover.
+        """
+        from api.v1.views.reports import ranking_cache
+        ranking_cache.invalidate()
+
+        response = self.client.get("/api/v1/reports/movers?window=week")
+        self.assertEqual(response.status_code, 200)
+        row = self.get_product_row(response.get_json())
+        self.assertEqual(row["current"], self.sale_data["quantity"])
+        self.assertEqual(row["previous"], 0)
+        self.assertEqual(row["change"], self.sale_data["quantity"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
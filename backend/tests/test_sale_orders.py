@@ -117,7 +117,7 @@ class TestSaleOrders(unittest.TestCase):
             self.response.get_json().get("added_by"),
             self.employee_data["username"].lower(),
         )
-        self.assertEqual(len(self.response.get_json()), 6)
+        self.assertEqual(len(self.response.get_json()), 10)
 
         import json
         logger.debug(f"In register sale: {json.dumps(self.response.get_json(), indent=4)}")
@@ -149,7 +149,7 @@ class TestSaleOrders(unittest.TestCase):
             response.get_json().get("added_by"),
             self.employee_data["username"].lower()
         )
-        self.assertEqual(len(response.get_json()), 8)
+        self.assertEqual(len(response.get_json()), 12)
 
         import json
         logger.debug(f"In get sale: {json.dumps(response.get_json(), indent=4)}")
@@ -17,6 +17,7 @@ from models.category import Category
 from models.employee import Employee
 from models.product import Product
 from models.sale_order import SaleOrder
+from models.stock_level import StockLevel
 
 
 logger = logging.getLogger(__name__)
@@ -27,6 +28,7 @@ class TestSale(unittest.TestCase):
     Tests the Sale CRUD and authentication endpoints.
 
     POST - "/api/v1/sales"
+    POST - "/api/v1/sales/bulk"
     GET - "/api/v1/sales/<int:page_size>/<int:page_num>"
     GET - "/api/v1/sales/<sale_id>"
     PUT - "/api/v1/sales/<sale_id>"
@@ -228,9 +230,128 @@ class TestSale(unittest.TestCase):
             self.response.get_json().get("added_by"),
             self.employee_data["username"].lower(),
         )
-        self.assertEqual(len(self.response.get_json()), 13)
+        self.assertEqual(len(self.response.get_json()), 17)
 
 
+    def test_add_sales_bulk(self):
+        """
+        Tests creating several sales from one JSON array.
+        """
+        items = [
+            {**self.sale_data, "quantity": quantity,
+             "total_selling_price": quantity * 200}
+            for quantity in (2, 3)
+        ]
+        response = self.client.post("/api/v1/sales/bulk", json=items)
+        self.assertEqual(response.status_code, 201)
+        sales = response.get_json()
+        self.assertEqual([sale["quantity"] for sale in sales], [2, 3])
+        self.assertEqual(sales[0]["product_name"], "paracetamol")
+
+        response = self.client.get(
+            f"/api/v1/sale_orders/{self.sale_order_id}?fields=line_count"
+        )
+        self.assertEqual(response.get_json()["line_count"], 3)
+        for sale in sales:
+            self.client.delete(f"/api/v1/sales/{sale['id']}")
+
+        response = self.client.post("/api/v1/sales/bulk", json=[])
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            "/api/v1/sales/bulk", json=[items[0], {"quantity": 2}]
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            "/api/v1/sales/bulk", json=[{**items[0], "product_id": "0" * 36}]
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(
+            "/api/v1/sales/bulk", json=[{**items[0], "payment_status": "paid"}]
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_add_sales_bulk_is_atomic(self):
+        """
+        Tests a rejected basket saves none of its sales or stock moves,
+        and an accepted one moves stock in the same commit.
+        """
+        StockLevel(product_id=self.product_id, quantity_in_stock=10)
+        storage.save()
+
+        def paid(quantity: int) -> dict[str, Any]:
+            return {
+                **self.sale_data, "quantity": quantity,
+                "total_selling_price": quantity * 200,
+                "payment_status": "paid",
+            }
+
+        def get_line_count() -> int:
+            response = self.client.get(
+                f"/api/v1/sale_orders/{self.sale_order_id}?fields=line_count"
+            )
+            return response.get_json()["line_count"]
+
+        def get_stock() -> int:
+            storage.close()
+            return storage.get_stock_obj(self.product_id).quantity_in_stock
+
+        try:
+            response = self.client.post(
+                "/api/v1/sales/bulk", json=[paid(2), paid(-3)]
+            )
+            self.assertEqual(response.status_code, 400)
+            response = self.client.post(
+                "/api/v1/sales/bulk", json=[paid(6), paid(5)]
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(get_line_count(), 1)
+            self.assertEqual(get_stock(), 10)
+
+            response = self.client.post(
+                "/api/v1/sales/bulk", json=[paid(2), paid(3)]
+            )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(get_line_count(), 3)
+            self.assertEqual(get_stock(), 5)
+            for sale in response.get_json():
+                self.client.delete(f"/api/v1/sales/{sale['id']}")
+        finally:
+            stock = storage.get_stock_obj(self.product_id)
+            storage.delete(stock)
+            storage.save()
+
+    def test_add_sales_bulk_changes_products_etag(self):
+        """
+        Tests a bulk sale moving stock invalidates the products ETag.
+        """
+        StockLevel(product_id=self.product_id, quantity_in_stock=10)
+        storage.save()
+
+        try:
+            response = self.client.get(f"/api/v1/products/{5}/{1}")
+            etag = response.headers.get("ETag")
+            self.assertIsNotNone(etag)
+
+            response = self.client.post("/api/v1/sales/bulk", json=[{
+                **self.sale_data, "quantity": 2,
+                "total_selling_price": 400, "payment_status": "paid",
+            }])
+            self.assertEqual(response.status_code, 201)
+            sale_ids = [sale["id"] for sale in response.get_json()]
+
+            response = self.client.get(
+                f"/api/v1/products/{5}/{1}",
+                headers={"If-None-Match": etag},
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers.get("ETag"), etag)
+            for sale_id in sale_ids:
+                self.client.delete(f"/api/v1/sales/{sale_id}")
+        finally:
+            stock = storage.get_stock_obj(self.product_id)
+            storage.delete(stock)
+            storage.save()
+
     def test_get_all_sales(self):
         """
         Tests retrieval of all sales with pagination.
@@ -243,7 +364,85 @@ class TestSale(unittest.TestCase):
         logger.debug(
             f"In get all sales: {json.dumps(self.response.get_json(), indent=4)}"
         )
-    
+
+    def test_get_all_sales_filtered(self):
+        """
+        Tests filtering and ordering the sales list.
+        """
+        created_at = self.response.get_json()["created_at"]
+        response = self.client.get(
+            f"/api/v1/sales/{50}/{1}",
+            query_string={
+                "payment_status": "unpaid",
+                "product_id": self.product_id,
+                "created_from": created_at,
+                "order_by": "-created_at,quantity",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [sale["id"] for sale in response.get_json()], [self.sale_id]
+        )
+
+        response = self.client.get(
+            f"/api/v1/sales/{50}/{1}",
+            query_string={"payment_status": "paid", "product_id": self.product_id},
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            f"/api/v1/sales/{50}/{1}",
+            query_string={"date_time": created_at},
+        )
+        self.assertIn(self.sale_id, [sale["id"] for sale in response.get_json()])
+
+        response = self.client.get(
+            f"/api/v1/sales/{50}/{1}",
+            query_string={"date_time": created_at, "created_from": created_at},
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(f"/api/v1/sales/{50}/{1}?order_by=unit_cost")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f"/api/v1/sales/{50}/{1}?payment_status=owed")
+        self.assertEqual(response.status_code, 400)
+
+    def test_sale_order_totals(self):
+        """
+        Tests sale order totals follow sale writes and list pages
+        render them without items.
+        """
+        def get_totals() -> dict[str, Any]:
+            response = self.client.get(
+                f"/api/v1/sale_orders/{self.sale_order_id}"
+                "?fields=line_count,total_quantity,total_amount,paid_amount"
+            )
+            totals = response.get_json()
+            totals.pop("id")
+            return totals
+
+        self.assertEqual(get_totals(), {
+            "line_count": 1,
+            "total_quantity": 50,
+            "total_amount": 10000,
+            "paid_amount": 0,
+        })
+
+        self.client.put(
+            f"/api/v1/sales/{self.sale_id}",
+            json={"quantity": 10, "total_selling_price": 2000},
+        )
+        self.assertEqual(get_totals()["total_amount"], 2000)
+
+        response = self.client.get(f"/api/v1/sale_orders/{50}/{1}")
+        self.assertEqual(response.status_code, 200)
+        for sale_order in response.get_json():
+            self.assertIn("total_amount", sale_order)
+            self.assertNotIn("sale_order_items", sale_order)
+
+        self.client.delete(f"/api/v1/sales/{self.sale_id}")
+        self.assertEqual(get_totals()["line_count"], 0)
+
 
     def test_get_sale(self):
         """
@@ -275,7 +474,7 @@ class TestSale(unittest.TestCase):
             self.response.get_json().get("added_by"),
             self.employee_data["username"].lower(),
         )
-        self.assertEqual(len(self.response.get_json()), 13)
+        self.assertEqual(len(self.response.get_json()), 17)
         import json
         logger.debug(
             f"In get sales: {json.dumps(self.response.get_json(), indent=4)}"
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for session login, logout and device management.
+"""
+
+from datetime import datetime, timedelta
+from flask import Flask
+from flask.testing import FlaskClient
+from typing import Any
+import os
+import unittest
+
+from api.v1.app import auth, create_app
+from api.v1.auth import session_db_auth
+from api.v1.auth.session_tokens import SessionTokens
+from models import storage
+from models.employee import Employee
+from models.employee_session import EmployeeSession
+
+
+class TestSessionTokens(unittest.TestCase):
+    """
+    Tests signed session tokens.
+
+    POST - "/api/v1/auth_session/login"
+    DELETE - "/api/v1/auth_session/logout"
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Switches the app to token mode and registers an admin user.
+        """
+        cls.app: Flask = create_app()
+        cls.auth_mode, cls.tokens = auth.auth_mode, auth.tokens
+        auth.auth_mode = "token"
+        auth.tokens = SessionTokens("test-secret", auth.session_duration)
+
+        cls.employee_data: dict[str, Any] = {
+            "first_name": "Tolu",
+            "last_name": "Kenny",
+            "username": "TKenny",
+            "email": "tolukenny@gmail.com",
+            "password": "Tolu1234",
+            "home_address": "No. 7 token street",
+            "role": "Manager",
+            "is_admin": True,
+        }
+        response = cls.app.test_client().post(
+            "/api/v1/register", json=cls.employee_data
+        )
+        cls.employee_id = response.get_json().get("id")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Restores the auth mode and deletes the admin user.
+        """
+        auth.auth_mode, auth.tokens = cls.auth_mode, cls.tokens
+        employee = storage.get_obj_by_id(Employee, cls.employee_id)
+        if employee:
+            storage.delete(employee)
+            storage.save()
+
+    def login(self) -> FlaskClient:
+        """
+        Returns a client logged in as the admin user.
+        """
+        client = self.app.test_client()
+        response = client.post(
+            "/api/v1/auth_session/login",
+            json={"email_or_username": "TKenny", "password": "Tolu1234"},
+        )
+        self.assertEqual(response.status_code, 201)
+        cookie_name, token = (
+            response.headers["Set-Cookie"].split(";", 1)[0].split("=", 1)
+        )
+        client.set_cookie(cookie_name, token)
+        return client
+
+    def test_token_login(self):
+        """
+        Tests a token authenticates requests without a session row.
+        """
+        client = self.login()
+        response = client.get(f"/api/v1/employees/{self.employee_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["username"], "tkenny")
+        self.assertEqual(response.get_json()["role"], "manager")
+
+        response = client.post("/api/v1/brands", json={"name": "Tokenbrand"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["added_by"], "tkenny")
+        client.delete(f"/api/v1/brands/{response.get_json()['id']}")
+
+        self.assertFalse(storage.all(
+            EmployeeSession, filters={"employee_id": self.employee_id}
+        ))
+
+        cookie = client.get_cookie(os.environ["SESSION_NAME"])
+        client.set_cookie(cookie.key, cookie.value[:-2] + "xx")
+        self.assertEqual(client.get("/api/v1/brands").status_code, 401)
+
+    def test_token_logout(self):
+        """
+        Tests logout revokes the employee's tokens and a new login
+        works straight away.
+        """
+        client = self.login()
+        other_device = self.login()
+        self.assertEqual(
+            client.delete("/api/v1/auth_session/logout").status_code, 200
+        )
+        self.assertEqual(client.get("/api/v1/brands").status_code, 401)
+        self.assertEqual(other_device.get("/api/v1/brands").status_code, 401)
+
+        client = self.login()
+        self.assertNotEqual(client.get("/api/v1/brands").status_code, 401)
+
+        # demoting the employee revokes the token carrying the admin flag
+        response = client.put(
+            f"/api/v1/employees/{self.employee_id}", json={"is_admin": False}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get("/api/v1/brands").status_code, 401)
+        employee = storage.get_obj_by_id(Employee, self.employee_id)
+        employee.is_admin = True
+        storage.save()
+
+
+class TestDevices(unittest.TestCase):
+    """
+    Tests stored sessions across devices.
+
+    GET - "/api/v1/auth_session/devices"
+    DELETE - "/api/v1/auth_session/devices"
+    DELETE - "/api/v1/auth_session/devices/<device_id>"
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Registers an employee.
+        """
+        cls.app: Flask = create_app()
+        response = cls.app.test_client().post("/api/v1/register", json={
+            "first_name": "Dami",
+            "last_name": "Vices",
+            "username": "DVices",
+            "email": "damivices@gmail.com",
+            "password": "Dami1234",
+            "home_address": "No. 9 device street",
+            "role": "salesperson",
+        })
+        cls.employee_id = response.get_json().get("id")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Deletes the employee and their sessions.
+        """
+        employee = storage.get_obj_by_id(Employee, cls.employee_id)
+        if employee:
+            storage.delete(employee)
+            storage.save()
+
+    def login(self, device: str, client: FlaskClient | None = None) -> FlaskClient:
+        """
+        Returns a client logged in from the named device.
+        """
+        client = client or self.app.test_client()
+        response = client.post(
+            "/api/v1/auth_session/login",
+            json={"email_or_username": "DVices", "password": "Dami1234"},
+            headers={"User-Agent": device},
+        )
+        self.assertEqual(response.status_code, 201)
+        cookie_name, session_id = (
+            response.headers["Set-Cookie"].split(";", 1)[0].split("=", 1)
+        )
+        client.set_cookie(cookie_name, session_id)
+        return client
+
+    def test_devices(self):
+        """
+        Tests listing and ending sessions on other devices.
+        """
+        laptop = self.login("laptop")
+        phone = self.login("phone")
+        tablet = self.login("tablet")
+        # logging in again on a device keeps its session
+        session_id = laptop.get_cookie(os.environ["SESSION_NAME"]).value
+        self.login("laptop", laptop)
+        self.assertEqual(
+            laptop.get_cookie(os.environ["SESSION_NAME"]).value, session_id
+        )
+
+        devices = laptop.get("/api/v1/auth_session/devices").get_json()
+        self.assertEqual(
+            [device["user_agent"] for device in devices],
+            ["tablet", "phone", "laptop"],
+        )
+        self.assertEqual(
+            [device["current"] for device in devices], [False, False, True]
+        )
+        self.assertNotIn(session_id, str(devices))
+
+        response = laptop.delete(
+            f"/api/v1/auth_session/devices/{devices[1]['device_id']}"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            phone.get("/api/v1/auth_session/devices").status_code, 401
+        )
+
+        response = laptop.delete("/api/v1/auth_session/devices")
+        self.assertEqual(response.get_json(), {"ended": 1})
+        self.assertEqual(
+            tablet.get("/api/v1/auth_session/devices").status_code, 401
+        )
+        self.assertEqual(
+            len(laptop.get("/api/v1/auth_session/devices").get_json()), 1
+        )
+        laptop.delete("/api/v1/auth_session/logout")
+
+    def test_session_cap_and_purge(self):
+        """
+        Tests the oldest session ends past the cap and expired ones
+        are purged.
+        """
+        max_sessions = session_db_auth.MAX_SESSIONS_PER_EMPLOYEE
+        session_db_auth.MAX_SESSIONS_PER_EMPLOYEE = 2
+        try:
+            first = self.login("first")
+            self.login("second")
+            third = self.login("third")
+        finally:
+            session_db_auth.MAX_SESSIONS_PER_EMPLOYEE = max_sessions
+        self.assertEqual(
+            first.get("/api/v1/auth_session/devices").status_code, 401
+        )
+        self.assertEqual(
+            len(third.get("/api/v1/auth_session/devices").get_json()), 2
+        )
+
+        for employee_session in storage.employee_sessions(self.employee_id):
+            employee_session.expires_at = datetime.now() - timedelta(seconds=1)
+        storage.save()
+        self.assertEqual(
+            third.get("/api/v1/auth_session/devices").status_code, 401
+        )
+        self.assertGreaterEqual(storage.purge_expired_sessions(batch_size=1), 2)
+        self.assertFalse(storage.all(
+            EmployeeSession, filters={"employee_id": self.employee_id}
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)